@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 from pydantic import (
     AnyUrl,
     PostgresDsn,
@@ -28,6 +28,74 @@ class AppConfig(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
+    # * Optional streaming replica for read-only endpoints (same db/credentials as the primary).
+    # * Reads fall back to the primary while the replica lags by more than
+    # * DB_REPLICA_MAX_LAG_SECONDS (probed every DB_REPLICA_LAG_CHECK_INTERVAL in the background),
+    # * and for DB_READ_YOUR_WRITES_SECONDS after a client commits (a cookie/header on the client)
+    POSTGRES_REPLICA_SERVER: Optional[str] = None
+    POSTGRES_REPLICA_PORT: Optional[int] = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 1.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 10.0
+
+    # * Connection pool per engine (primary and replica). DB_POOL_TIMEOUT is the checkout wait
+    # * before a 503. Pre-ping costs a round trip per checkout; with DB_POOL_RECYCLE below
+    # * the server/proxy idle timeout it can be turned off
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 5.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # * Server-side limits sent as startup parameters (0 disables); with pgbouncer,
+    # * set them on the role instead or add them to ignore_startup_parameters
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 30000
+    # * SQLAlchemy compiled-statement cache and asyncpg prepared statements per
+    # * connection; set DB_PREPARED_STATEMENT_CACHE_SIZE=0 behind pgbouncer (transaction mode)
+    DB_QUERY_CACHE_SIZE: int = 1200
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+
+    # * "memory" for a single worker / tests, "postgres" to fan out via LISTEN/NOTIFY
+    WEBSOCKET_BROKER: Literal["memory", "postgres"] = "memory"
+    WEBSOCKET_BROKER_CHANNEL: str = "hourz_chat"
+    # * Per-connection outbound buffer; a full buffer sheds typing events, then
+    # * disconnects ("drop_typing"), or disconnects straight away ("disconnect")
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 64
+    WEBSOCKET_SEND_TIMEOUT: float = 10.0
+    WEBSOCKET_OVERFLOW_POLICY: Literal["drop_typing", "disconnect"] = "drop_typing"
+    # * WebSocket chat messages are group-committed by size or after a few milliseconds
+    CHAT_WRITE_BATCH_SIZE: int = 100
+    CHAT_WRITE_FLUSH_MS: float = 5.0
+    # * Sender/buddy profile cache per worker; TTL bounds staleness across workers
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 60.0
+    # * Authenticated user per (user id, token iat); kept short, profile updates invalidate it
+    AUTH_USER_CACHE_TTL: float = 10.0
+    # * bcrypt runs on a thread pool; beyond workers + queue, logins get 503 + Retry-After.
+    # * Raising BCRYPT_ROUNDS rehashes stored passwords on their next successful login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    # * Nearby pending gigs cached per geohash cell; filters and paging run in memory.
+    # * Precision 5 cells are ~4.9 km wide; larger candidate sets fall back to PostGIS
+    GIG_TILE_CACHE_PRECISION: int = 5
+    GIG_TILE_CACHE_TTL: float = 30.0
+    GIG_TILE_CACHE_SIZE: int = 2048
+    GIG_TILE_MAX_CANDIDATES: int = 2000
+    # * Image variants: ?w= snaps up to the nearest width; WebP when the client accepts it.
+    # * Rendered on a process pool, cached beside the upload; common widths right after upload
+    IMAGE_VARIANT_WORKERS: int = 2
+    IMAGE_VARIANT_WIDTHS: list[int] = [64, 160, 320, 640, 1280]
+    IMAGE_PREGENERATE_WIDTHS: list[int] = [160, 640]
+    # * Variants that failed to render (e.g. not really an image) serve the original meanwhile
+    IMAGE_VARIANT_FAILURE_TTL: float = 600.0
+    # * serve_file keeps hot files open (descriptor + stat) in a per-worker LRU; keep the
+    # * size well under the process fd limit. The TTL bounds how long a file replaced out
+    # * of band is still served from its old descriptor
+    OPEN_FILE_CACHE_SIZE: int = 256
+    OPEN_FILE_CACHE_TTL: float = 60.0
+    # * Hand whole-file bodies to the server (ASGI pathsend, sendfile) when it supports it
+    MEDIA_PATHSEND: bool = True
 
     @computed_field
     @property
@@ -46,5 +114,17 @@ class AppConfig(BaseSettings):
         )
         return PostgresDsn(uri)
 
+    @computed_field
+    @property
+    def SQLALCHEMY_REPLICA_DATABASE_URI(self) -> Optional[PostgresDsn]:
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        uri = (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_REPLICA_SERVER}:{self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT}"
+            f"/{self.POSTGRES_DB}"
+        )
+        return PostgresDsn(uri)
+
 
 app_config = AppConfig()  # type: ignore[call-arg]
@@ -6,7 +6,7 @@ from typing import List, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_
+from sqlalchemy import Row, and_
 from sqlmodel import select, col
 
 from app.models import BuddyList, User
@@ -27,7 +27,6 @@ class BuddyCRUD:
         )
         db.add(buddy_entry)
         await db.commit()
-        await db.refresh(buddy_entry)
         return buddy_entry
 
     async def remove_buddy(
@@ -51,24 +50,25 @@ class BuddyCRUD:
 
     async def get_buddy_list(
         self, db: AsyncSession, current_user_id: UUID, skip: int = 0, limit: int = 50
-    ) -> List[BuddyList]:
-        """Get current user's buddy list with user details."""
+    ) -> List[Row]:
+        """Get current user's buddy list as (BuddyList, is_available, reputation_score) rows."""
         stmt = (
-            select(BuddyList)
+            select(BuddyList, col(User.is_available), col(User.reputation_score))
+            .join(User, col(User.id) == col(BuddyList.buddy_id))
             .where(col(BuddyList.user_id) == current_user_id)
             .offset(skip)
             .limit(limit)
             .order_by(col(BuddyList.created_at).desc())
         )
         result = await db.execute(stmt)
-        return list(result.scalars().all())
+        return list(result.all())
 
     async def get_available_buddies(
         self, db: AsyncSession, current_user_id: UUID, skip: int = 0, limit: int = 50
-    ) -> List[BuddyList]:
-        """Get buddies who are currently available (is_available=True)."""
+    ) -> List[Row]:
+        """Get buddies who are currently available, as rows like get_buddy_list."""
         stmt = (
-            select(BuddyList)
+            select(BuddyList, col(User.is_available), col(User.reputation_score))
             .join(User, col(User.id) == col(BuddyList.buddy_id))
             .where(
                 and_(
@@ -81,7 +81,7 @@ class BuddyCRUD:
             .order_by(col(BuddyList.created_at).desc())
         )
         result = await db.execute(stmt)
-        return list(result.scalars().all())
+        return list(result.all())
 
     async def is_buddy(
         self, db: AsyncSession, user_id: UUID, potential_buddy_id: UUID
@@ -3,11 +3,13 @@ Async CRUD operations for Chat system
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, lambda_stmt, true, tuple_, update
 from sqlmodel import select, desc, and_
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime
 from app.models import ChatRoom, Message, ChatParticipant, User, Gig
+from app.modules.users.user_cache import full_name_expression, get_user_summaries, get_user_summary
 from app.schemas.chat_schema import MessageCreate, ChatRoomCreate
 
 
@@ -54,8 +56,7 @@ class ChatCRUD:
         chat_room = ChatRoom(gig_id=chat_data.gig_id, is_active=chat_data.is_active)
 
         db.add(chat_room)
-        await db.commit()
-        await db.refresh(chat_room)
+        await db.flush()
 
         # Add participants
         for user_id in participant_user_ids:
@@ -93,97 +94,165 @@ class ChatCRUD:
         """
         offset = (page - 1) * per_page
 
-        # First get participant records for user
-        participant_stmt = select(ChatParticipant).where(ChatParticipant.user_id == user_id)
-        participant_result = await db.execute(participant_stmt)
-        participants = participant_result.scalars().all()
-
-        # Get room IDs
-        room_ids = [p.chat_room_id for p in participants]
-
-        if not room_ids:
-            return [], 0
-
-        # Get room data manually for each room (with active filter)
-        rooms_data = []
-        total_count = 0
-
-        for room_id in room_ids:
-            # Get room if active
-            room_stmt = select(ChatRoom).where(and_(ChatRoom.id == room_id, ChatRoom.is_active))
-            room_result = await db.execute(room_stmt)
-            room = room_result.scalar_one_or_none()
-
-            if room:
-                total_count += 1
-                # Apply pagination
-                if len(rooms_data) >= offset and len(rooms_data) < offset + per_page:
-                    room_data = await ChatCRUD._get_room_with_details(db, room.id, user_id)
-                    if room_data:
-                        rooms_data.append(room_data)
+        # Count active rooms the user participates in
+        count_stmt = (
+            select(func.count(ChatRoom.id))
+            .join(ChatParticipant, ChatParticipant.chat_room_id == ChatRoom.id)
+            .where(and_(ChatParticipant.user_id == user_id, ChatRoom.is_active))
+        )
+        count_result = await db.execute(count_stmt)
+        total = count_result.scalar() or 0
 
-        total = total_count
+        if total == 0 or offset >= total:
+            return [], total
 
+        rooms_data = await ChatCRUD._get_room_summaries(
+            db, user_id, offset=offset, limit=per_page
+        )
         return rooms_data, total
 
     @staticmethod
-    async def _get_room_with_details(
-        db: AsyncSession, room_id: UUID, user_id: UUID
-    ) -> Optional[Dict[str, Any]]:
+    async def _get_room_summaries(
+        db: AsyncSession,
+        user_id: UUID,
+        room_id: Optional[UUID] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
         """
-        Helper method to get room with all details
-        """
-        # Get room
-        room_result = await db.execute(select(ChatRoom).where(ChatRoom.id == room_id))
-        room = room_result.scalar_one_or_none()
-        if not room:
-            return None
+        Helper method to get rooms with all details in a fixed number of queries.
 
-        # Get gig info
-        gig_result = await db.execute(select(Gig).where(Gig.id == room.gig_id))
-        gig = gig_result.scalar_one_or_none()
+        One query returns the page of rooms joined with the gig title, the latest
+        message (LATERAL lookup) and the participant's unread counter; a second
+        query loads the participants of every room on the page.
+        """
+        # Page of rooms the user participates in, paginated in SQL
+        page_stmt = (
+            select(
+                ChatRoom.id,
+                ChatRoom.gig_id,
+                ChatRoom.created_at,
+                ChatRoom.updated_at,
+                ChatRoom.is_active,
+                ChatParticipant.unread_count,
+            )
+            .join(ChatParticipant, ChatParticipant.chat_room_id == ChatRoom.id)
+            .where(ChatParticipant.user_id == user_id)
+        )
+        if room_id is not None:
+            page_stmt = page_stmt.where(ChatRoom.id == room_id)
+        else:
+            page_stmt = page_stmt.where(ChatRoom.is_active)
+
+        page_stmt = page_stmt.order_by(desc(ChatRoom.updated_at), ChatRoom.id).offset(offset)
+        if limit is not None:
+            page_stmt = page_stmt.limit(limit)
+        room_page = page_stmt.cte("room_page")
+
+        # Latest message per room with its sender
+        latest = (
+            select(
+                Message.id.label("message_id"),
+                Message.content,
+                Message.message_type,
+                Message.image_url,
+                Message.timestamp,
+                Message.is_read,
+                Message.sender_id,
+                full_name_expression().label("sender_name"),
+                User.profile_image_url.label("sender_image_url"),
+            )
+            .join(User, User.id == Message.sender_id)
+            .where(Message.chat_room_id == room_page.c.id)
+            .order_by(desc(Message.timestamp), desc(Message.id))
+            .limit(1)
+            .lateral("latest_message")
+        )
 
-        # Get participants
-        participant_stmt = select(ChatParticipant).where(ChatParticipant.chat_room_id == room_id)
+        stmt = (
+            select(
+                room_page,
+                Gig.title.label("gig_title"),
+                latest,
+            )
+            .select_from(room_page)
+            .outerjoin(Gig, Gig.id == room_page.c.gig_id)
+            .outerjoin(latest, true())
+            .order_by(desc(room_page.c.updated_at), room_page.c.id)
+        )
+        result = await db.execute(stmt)
+        rows = result.all()
+        if not rows:
+            return []
+
+        # Participants with user details for every room on the page
+        room_ids = [row.id for row in rows]
+        participant_stmt = (
+            select(
+                ChatParticipant.id,
+                ChatParticipant.chat_room_id,
+                ChatParticipant.joined_at,
+                ChatParticipant.last_read_at,
+                User.id.label("user_id"),
+                full_name_expression().label("full_name"),
+                User.profile_image_url,
+            )
+            .join(User, User.id == ChatParticipant.user_id)
+            .where(ChatParticipant.chat_room_id.in_(room_ids))
+            .order_by(ChatParticipant.joined_at)
+        )
         participant_result = await db.execute(participant_stmt)
-        participants = participant_result.scalars().all()
-
-        # Get participant user details
-        participant_details = []
-        for participant in participants:
-            user_result = await db.execute(select(User).where(User.id == participant.user_id))
-            user = user_result.scalar_one_or_none()
-            if user:
-                participant_details.append(
-                    {
-                        "id": participant.id,
-                        "joined_at": participant.joined_at,
-                        "last_read_at": participant.last_read_at,
-                        "user": {
-                            "id": user.id,
-                            "full_name": user.full_name,
-                            "profile_image_url": user.profile_image_url,
-                        },
-                    }
-                )
 
-        # Get latest message
-        latest_message = await ChatCRUD.get_latest_message(db, room_id)
+        participants_by_room: Dict[Any, List[Dict[str, Any]]] = {rid: [] for rid in room_ids}
+        for participant in participant_result.all():
+            participants_by_room[participant.chat_room_id].append(
+                {
+                    "id": participant.id,
+                    "joined_at": participant.joined_at,
+                    "last_read_at": participant.last_read_at,
+                    "user": {
+                        "id": participant.user_id,
+                        "full_name": participant.full_name,
+                        "profile_image_url": participant.profile_image_url,
+                    },
+                }
+            )
 
-        # Calculate unread count
-        unread_count = await ChatCRUD.get_unread_message_count(db, room_id, user_id)
+        rooms_data = []
+        for row in rows:
+            latest_message = None
+            if row.message_id is not None:
+                latest_message = {
+                    "id": row.message_id,
+                    "content": row.content,
+                    "message_type": row.message_type,
+                    "image_url": row.image_url,
+                    "timestamp": row.timestamp,
+                    "is_read": row.is_read,
+                    "sender_id": row.sender_id,
+                    "chat_room_id": row.id,
+                    "sender": {
+                        "id": row.sender_id,
+                        "full_name": row.sender_name,
+                        "profile_image_url": row.sender_image_url,
+                    },
+                }
+
+            rooms_data.append(
+                {
+                    "id": row.id,
+                    "gig_id": row.gig_id,
+                    "gig_title": row.gig_title or "Unknown Gig",
+                    "created_at": row.created_at,
+                    "updated_at": row.updated_at,
+                    "is_active": row.is_active,
+                    "participants": participants_by_room[row.id],
+                    "latest_message": latest_message,
+                    "unread_count": row.unread_count,
+                }
+            )
 
-        return {
-            "id": room.id,
-            "gig_id": room.gig_id,
-            "gig_title": gig.title if gig else "Unknown Gig",
-            "created_at": room.created_at,
-            "updated_at": room.updated_at,
-            "is_active": room.is_active,
-            "participants": participant_details,
-            "latest_message": latest_message,
-            "unread_count": unread_count,
-        }
+        return rooms_data
 
     @staticmethod
     async def get_chat_room_by_id(
@@ -192,16 +261,9 @@ class ChatCRUD:
         """
         Get chat room by ID if user is participant - returns dict data
         """
-        # Check if user is participant
-        participant_check = select(ChatParticipant).where(
-            and_(ChatParticipant.chat_room_id == room_id, ChatParticipant.user_id == user_id)
-        )
-
-        check_result = await db.execute(participant_check)
-        if not check_result.scalar_one_or_none():
-            return None
-
-        return await ChatCRUD._get_room_with_details(db, room_id, user_id)
+        # Joining on the user's participant row doubles as the access check
+        rooms_data = await ChatCRUD._get_room_summaries(db, user_id, room_id=room_id)
+        return rooms_data[0] if rooms_data else None
 
     @staticmethod
     async def create_message(
@@ -221,18 +283,15 @@ class ChatCRUD:
         db.add(message)
 
         # Update chat room timestamp
-        room_result = await db.execute(select(ChatRoom).where(ChatRoom.id == chat_room_id))
-        chat_room = room_result.scalar_one_or_none()
-        if chat_room:
-            chat_room.updated_at = datetime.now()
+        await db.execute(
+            update(ChatRoom).where(ChatRoom.id == chat_room_id).values(updated_at=datetime.utcnow())
+        )
 
-        await db.commit()
-        await db.refresh(message)
+        await ChatCRUD.increment_unread_counts(db, chat_room_id, sender_id)
 
-        # Get sender info
-        sender_result = await db.execute(select(User).where(User.id == sender_id))
-        sender = sender_result.scalar_one_or_none()
+        await db.commit()
 
+        sender = await get_user_summary(db, sender_id)
         if not sender:
             return None
 
@@ -246,7 +305,7 @@ class ChatCRUD:
             "sender_id": message.sender_id,
             "chat_room_id": message.chat_room_id,
             "sender": {
-                "id": sender.id,
+                "id": message.sender_id,
                 "full_name": sender.full_name,
                 "profile_image_url": sender.profile_image_url,
             },
@@ -260,9 +319,9 @@ class ChatCRUD:
         Get messages for chat room with pagination (newest first) - returns dict data
         """
         # Verify user is participant
-        participant_check = select(ChatParticipant).where(
+        participant_check = lambda_stmt(lambda: select(ChatParticipant).where(
             and_(ChatParticipant.chat_room_id == chat_room_id, ChatParticipant.user_id == user_id)
-        )
+        ))
 
         check_result = await db.execute(participant_check)
         if not check_result.scalar_one_or_none():
@@ -282,11 +341,12 @@ class ChatCRUD:
         message_result = await db.execute(stmt)
         raw_messages = message_result.scalars().all()
 
-        # Get message details with sender info
+        # One cached lookup for every sender on the page
+        senders = await get_user_summaries(db, {message.sender_id for message in raw_messages})
+
         messages = []
         for message in raw_messages:
-            sender_result = await db.execute(select(User).where(User.id == message.sender_id))
-            sender = sender_result.scalar_one_or_none()
+            sender = senders.get(str(message.sender_id))
             if sender:
                 messages.append(
                     {
@@ -299,24 +359,131 @@ class ChatCRUD:
                         "sender_id": message.sender_id,
                         "chat_room_id": message.chat_room_id,
                         "sender": {
-                            "id": sender.id,
+                            "id": message.sender_id,
                             "full_name": sender.full_name,
                             "profile_image_url": sender.profile_image_url,
                         },
                     }
                 )
 
-        # Get total count by counting messages
-        count_stmt = select(Message).where(Message.chat_room_id == chat_room_id)
-        count_result = await db.execute(count_stmt)
-        total = len(count_result.scalars().all())
+        total = await ChatCRUD.count_room_messages(db, chat_room_id)
 
         return messages, total
 
     @staticmethod
-    async def get_unread_message_count(db: AsyncSession, chat_room_id: UUID, user_id: UUID) -> int:
+    async def get_chat_messages_keyset(
+        db: AsyncSession,
+        chat_room_id: UUID,
+        user_id: UUID,
+        before: Optional[Tuple[datetime, UUID]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        since_last_read: bool = False,
+        limit: int = 50,
+    ) -> Optional[Tuple[List[Dict[str, Any]], bool, bool]]:
         """
-        Get count of unread messages for user in room
+        Get messages for chat room with keyset pagination on (timestamp, id).
+
+        ``before`` pages back through older history, ``after`` fetches messages newer
+        than the given key and ``since_last_read`` uses the participant's last read
+        time as the lower bound. Messages are always returned newest first, together
+        with a flag telling whether more rows exist in the direction of travel and
+        one telling whether messages older than the page exist.
+        Returns None if user is not a participant.
+        """
+        # Verify user is participant (and fetch last read time for delta mode)
+        participant_stmt = select(ChatParticipant.last_read_at).where(
+            and_(ChatParticipant.chat_room_id == chat_room_id, ChatParticipant.user_id == user_id)
+        )
+        participant_result = await db.execute(participant_stmt)
+        participant_row = participant_result.first()
+        if participant_row is None:
+            return None
+
+        sort_key = tuple_(Message.timestamp, Message.id)
+        stmt = (
+            select(Message, full_name_expression(), User.profile_image_url)
+            .join(User, User.id == Message.sender_id)
+            .where(Message.chat_room_id == chat_room_id)
+        )
+
+        forward = after is not None or since_last_read
+        if after is not None:
+            stmt = stmt.where(sort_key > tuple_(*after))
+        elif since_last_read and participant_row.last_read_at is not None:
+            stmt = stmt.where(Message.timestamp > participant_row.last_read_at)
+        if before is not None:
+            stmt = stmt.where(sort_key < tuple_(*before))
+
+        # Walk the composite index towards the cursor; fetch one extra row to detect more
+        if forward:
+            stmt = stmt.order_by(Message.timestamp, Message.id)
+        else:
+            stmt = stmt.order_by(desc(Message.timestamp), desc(Message.id))
+        stmt = stmt.limit(limit + 1)
+
+        result = await db.execute(stmt)
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if forward:
+            rows.reverse()
+
+        if not forward:
+            has_older = has_more
+        elif after is not None:
+            # The cursor's own message is older than the page
+            has_older = True
+        else:
+            # since_last_read: same question, asked below the page (or the read mark)
+            older_stmt = select(Message.id).where(Message.chat_room_id == chat_room_id)
+            if rows:
+                oldest = rows[-1][0]
+                older_stmt = older_stmt.where(sort_key < tuple_(oldest.timestamp, oldest.id))
+            elif participant_row.last_read_at is not None:
+                older_stmt = older_stmt.where(Message.timestamp <= participant_row.last_read_at)
+            else:
+                older_stmt = None
+            has_older = older_stmt is not None and (
+                await db.execute(older_stmt.limit(1))
+            ).first() is not None
+
+        messages = [
+            {
+                "id": message.id,
+                "content": message.content,
+                "message_type": message.message_type,
+                "image_url": message.image_url,
+                "timestamp": message.timestamp,
+                "is_read": message.is_read,
+                "sender_id": message.sender_id,
+                "chat_room_id": message.chat_room_id,
+                "sender": {
+                    "id": message.sender_id,
+                    "full_name": full_name,
+                    "profile_image_url": profile_image_url,
+                },
+            }
+            for message, full_name, profile_image_url in rows
+        ]
+
+        return messages, has_more, has_older
+
+    @staticmethod
+    async def count_room_messages(db: AsyncSession, chat_room_id: UUID) -> int:
+        """
+        Count messages in room using an aggregate query
+        """
+        stmt = select(func.count(Message.id)).where(Message.chat_room_id == chat_room_id)
+        count_result = await db.execute(stmt)
+        return count_result.scalar() or 0
+
+    @staticmethod
+    async def count_unread_messages(db: AsyncSession, chat_room_id: UUID, user_id: UUID) -> int:
+        """
+        Count unread messages for user in room from the message table.
+
+        This is the source of truth for ChatParticipant.unread_count and is used by
+        recalculate_unread_count; hot paths should read the counter instead.
         """
         # Get user's last read time
         participant_stmt = select(ChatParticipant.last_read_at).where(
@@ -326,38 +493,89 @@ class ChatCRUD:
         participant_result = await db.execute(participant_stmt)
         last_read = participant_result.scalar_one_or_none()
 
-        if not last_read:
-            # If no last read time, count all messages not from user
-            stmt = select(Message).where(
-                and_(Message.chat_room_id == chat_room_id, Message.sender_id != user_id)
-            )
-        else:
+        conditions = [Message.chat_room_id == chat_room_id, Message.sender_id != user_id]
+        if last_read:
             # Count messages after last read time, not from user
-            stmt = select(Message).where(
+            conditions.append(Message.timestamp > last_read)
+
+        stmt = select(func.count(Message.id)).where(and_(*conditions))
+        count_result = await db.execute(stmt)
+        return count_result.scalar() or 0
+
+    @staticmethod
+    async def increment_unread_counts(
+        db: AsyncSession, chat_room_id: UUID, sender_id: UUID, amount: int = 1
+    ) -> None:
+        """
+        Bump the unread counter of every participant except the sender.
+
+        Runs inside the caller's transaction so the counter commits together with
+        the message insert.
+        """
+        stmt = (
+            update(ChatParticipant)
+            .where(
                 and_(
-                    Message.chat_room_id == chat_room_id,
-                    Message.sender_id != user_id,
-                    Message.timestamp > last_read,
+                    ChatParticipant.chat_room_id == chat_room_id,
+                    ChatParticipant.user_id != sender_id,
                 )
             )
+            .values(unread_count=ChatParticipant.unread_count + amount)
+        )
+        await db.execute(stmt)
 
-        count_result = await db.execute(stmt)
-        return len(count_result.scalars().all())
+    @staticmethod
+    async def recalculate_unread_count(db: AsyncSession, chat_room_id: UUID, user_id: UUID) -> int:
+        """
+        Rebuild the denormalized unread counter for user in room from the messages
+        """
+        unread_count = await ChatCRUD.count_unread_messages(db, chat_room_id, user_id)
+        stmt = (
+            update(ChatParticipant)
+            .where(
+                and_(
+                    ChatParticipant.chat_room_id == chat_room_id,
+                    ChatParticipant.user_id == user_id,
+                )
+            )
+            .values(unread_count=unread_count)
+        )
+        await db.execute(stmt)
+        await db.commit()
+        return unread_count
+
+    @staticmethod
+    async def get_unread_message_count(db: AsyncSession, chat_room_id: UUID, user_id: UUID) -> int:
+        """
+        Get count of unread messages for user in room
+        """
+        # Read the denormalized counter maintained on message insert / mark as read
+        stmt = select(ChatParticipant.unread_count).where(
+            and_(ChatParticipant.chat_room_id == chat_room_id, ChatParticipant.user_id == user_id)
+        )
+
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none() or 0
 
     @staticmethod
     async def mark_messages_as_read(db: AsyncSession, chat_room_id: UUID, user_id: UUID) -> bool:
         """
         Mark all messages as read for user in room
         """
-        # Update participant's last read time
-        stmt = select(ChatParticipant).where(
-            and_(ChatParticipant.chat_room_id == chat_room_id, ChatParticipant.user_id == user_id)
+        # Update participant's last read time and reset the unread counter
+        stmt = (
+            update(ChatParticipant)
+            .where(
+                and_(
+                    ChatParticipant.chat_room_id == chat_room_id,
+                    ChatParticipant.user_id == user_id,
+                )
+            )
+            .values(last_read_at=datetime.utcnow(), unread_count=0)
         )
 
         result = await db.execute(stmt)
-        participant = result.scalar_one_or_none()
-        if participant:
-            participant.last_read_at = datetime.now()
+        if result.rowcount:
             await db.commit()
             return True
 
@@ -380,9 +598,7 @@ class ChatCRUD:
         if not message:
             return None
 
-        # Get sender separately
-        sender_result = await db.execute(select(User).where(User.id == message.sender_id))
-        sender = sender_result.scalar_one_or_none()
+        sender = await get_user_summary(db, message.sender_id)
         if not sender:
             return None
 
@@ -396,7 +612,7 @@ class ChatCRUD:
             "sender_id": message.sender_id,
             "chat_room_id": message.chat_room_id,
             "sender": {
-                "id": sender.id,
+                "id": message.sender_id,
                 "full_name": sender.full_name,
                 "profile_image_url": sender.profile_image_url,
             },
@@ -408,9 +624,9 @@ class ChatCRUD:
         Deactivate chat room (soft delete)
         """
         # Verify user is participant
-        participant_check = select(ChatParticipant).where(
+        participant_check = lambda_stmt(lambda: select(ChatParticipant).where(
             and_(ChatParticipant.chat_room_id == room_id, ChatParticipant.user_id == user_id)
-        )
+        ))
 
         check_result = await db.execute(participant_check)
         if not check_result.scalar_one_or_none():
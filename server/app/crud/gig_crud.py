@@ -3,16 +3,60 @@ CRUD operations for Gig model.
 Handles database operations for gig management including geospatial queries.
 """
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple, Sequence
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Sequence
 from uuid import UUID
 
-from sqlalchemy import and_, func, or_, text
+from geoalchemy2.functions import ST_X, ST_Y
+from sqlalchemy import Row, and_, func, lambda_stmt, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, col
-from geoalchemy2.functions import ST_DWithin, ST_Distance, ST_MakePoint, ST_SetSRID
 
+from app.crud.gig_tile_cache import gig_tile_cache
 from app.models import Gig, GigStatus, User
 from app.schemas.gig_schema import GigCreateSchema, GigUpdateSchema, GigSearchSchema
+from app.utils.geo import distance_m, within_radius
+from app.utils.pagination import encode_cursor
+from app.utils.returning import update_returning
+
+
+# Columns for list responses: plain row tuples, no ORM hydration, with the
+# point unpacked to latitude/longitude instead of shipping the EWKB
+GIG_ROW_COLUMNS = [
+    col(Gig.id),
+    col(Gig.title),
+    col(Gig.description),
+    col(Gig.duration_hours),
+    col(Gig.budget),
+    col(Gig.address_text),
+    col(Gig.status),
+    col(Gig.image_urls),
+    col(Gig.created_at),
+    col(Gig.updated_at),
+    col(Gig.starts_at),
+    col(Gig.completed_at),
+    col(Gig.seeker_id),
+    col(Gig.helper_id),
+    ST_Y(col(Gig.location)).label("latitude"),
+    ST_X(col(Gig.location)).label("longitude"),
+]
+
+# Allowed status changes: current status -> statuses it may move to.
+# Every transition is one conditional UPDATE, so concurrent requests can't
+# both move a gig out of the same status.
+GIG_TRANSITIONS: Dict[GigStatus, FrozenSet[GigStatus]] = {
+    GigStatus.PENDING: frozenset({GigStatus.ACCEPTED, GigStatus.CANCELLED}),
+    GigStatus.ACCEPTED: frozenset(
+        {GigStatus.PENDING, GigStatus.IN_PROGRESS, GigStatus.COMPLETED, GigStatus.CANCELLED}
+    ),
+    GigStatus.IN_PROGRESS: frozenset({GigStatus.COMPLETED, GigStatus.CANCELLED}),
+    GigStatus.COMPLETED: frozenset(),
+    GigStatus.CANCELLED: frozenset(),
+}
+
+
+def allowed_sources(new_status: GigStatus) -> List[GigStatus]:
+    """Statuses a gig may move to new_status from"""
+    return [status for status, targets in GIG_TRANSITIONS.items() if new_status in targets]
 
 
 class GigCRUD:
@@ -51,13 +95,17 @@ class GigCRUD:
         
         session.add(gig)
         await session.commit()
-        await session.refresh(gig)
+
+        if gig_data.location:
+            gig_tile_cache.invalidate(
+                gig.id, gig_data.location.latitude, gig_data.location.longitude
+            )
         return gig
     
     @staticmethod
     async def get_gig_by_id(session: AsyncSession, gig_id: UUID) -> Optional[Gig]:
         """Get gig by ID with seeker and helper information"""
-        statement = select(Gig).where(Gig.id == gig_id)
+        statement = lambda_stmt(lambda: select(Gig).where(Gig.id == gig_id))
         result = await session.execute(statement)
         return result.scalar_one_or_none()
     
@@ -69,49 +117,53 @@ class GigCRUD:
         user_id: UUID
     ) -> Optional[Gig]:
         """Update gig (only by seeker who created it)"""
-        statement = select(Gig).where(
-            and_(col(Gig.id) == gig_id, col(Gig.seeker_id) == user_id)
-        )
-        result = await session.execute(statement)
-        gig = result.scalar_one_or_none()
-        
-        if not gig:
-            return None
-        
         # Update fields if provided
         update_data = gig_data.dict(exclude_unset=True)
         
         # Handle location update
+        location_data = None
         if "location" in update_data and update_data["location"]:
             from geoalchemy2 import WKTElement
             location_data = update_data["location"]
-            gig.location = WKTElement(
+            update_data["location"] = WKTElement(
                 f"POINT({location_data['longitude']} {location_data['latitude']})",
                 srid=4326
             )
-            del update_data["location"]
         
-        # Update other fields
-        for field, value in update_data.items():
-            if hasattr(gig, field):
-                setattr(gig, field, value)
+        values = {field: value for field, value in update_data.items() if hasattr(Gig, field)}
+        values["updated_at"] = datetime.now(timezone.utc)
+        gig = await update_returning(
+            session,
+            Gig,
+            [col(Gig.id) == gig_id, col(Gig.seeker_id) == user_id],
+            values,
+        )
+        
+        if not gig:
+            return None
         
-        gig.updated_at = datetime.now(timezone.utc)
         await session.commit()
-        await session.refresh(gig)
+
+        # Old position: tiles holding the gig; new position: tiles covering it
+        if location_data:
+            gig_tile_cache.invalidate(
+                gig.id, location_data["latitude"], location_data["longitude"]
+            )
+        else:
+            gig_tile_cache.invalidate(gig.id)
         return gig
     
     @staticmethod
     async def delete_gig(session: AsyncSession, gig_id: UUID, user_id: UUID) -> bool:
         """Delete gig (only by seeker who created it, and only if not accepted)"""
-        statement = select(Gig).where(
+        statement = lambda_stmt(lambda: select(Gig).where(
             and_(
                 col(Gig.id) == gig_id,
                 col(Gig.seeker_id) == user_id,
                 col(Gig.helper_id).is_(None),  # Can't delete if helper assigned
                 col(Gig.status) == GigStatus.PENDING
             )
-        )
+        ))
         result = await session.execute(statement)
         gig = result.scalar_one_or_none()
         
@@ -120,6 +172,7 @@ class GigCRUD:
         
         await session.delete(gig)
         await session.commit()
+        gig_tile_cache.invalidate(gig_id)
         return True
     
     @staticmethod
@@ -127,28 +180,22 @@ class GigCRUD:
         session: AsyncSession, 
         gig_id: UUID, 
         helper_id: UUID
-    ) -> Optional[Gig]:
-        """Helper accepts a gig"""
-        statement = select(Gig).where(
-            and_(
-                col(Gig.id) == gig_id,
-                col(Gig.status) == GigStatus.PENDING,
-                col(Gig.helper_id).is_(None)
-            )
+    ) -> Tuple[Optional[Gig], Optional[GigStatus]]:
+        """Helper accepts a gig; of concurrent accepts exactly one wins. See transition()"""
+        gig, current_status = await GigCRUD.transition(
+            session,
+            gig_id,
+            GigStatus.ACCEPTED,
+            criteria=[col(Gig.helper_id).is_(None)],
+            values={"helper_id": helper_id},
         )
-        result = await session.execute(statement)
-        gig = result.scalar_one_or_none()
         
         if not gig:
-            return None
-        
-        gig.helper_id = helper_id
-        gig.status = GigStatus.ACCEPTED
-        gig.updated_at = datetime.now(timezone.utc)
+            return None, current_status
         
         await session.commit()
-        await session.refresh(gig)
-        return gig
+        gig_tile_cache.invalidate(gig.id)
+        return gig, None
     
     @staticmethod
     async def update_gig_status(
@@ -156,106 +203,192 @@ class GigCRUD:
         gig_id: UUID, 
         new_status: GigStatus,
         user_id: UUID
-    ) -> Optional[Gig]:
-        """Update gig status (by seeker or helper involved)"""
-        statement = select(Gig).where(
-            and_(
-                col(Gig.id) == gig_id,
-                or_(col(Gig.seeker_id) == user_id, col(Gig.helper_id) == user_id)
-            )
+    ) -> Tuple[Optional[Gig], Optional[GigStatus]]:
+        """Update gig status (by seeker or helper involved). See transition()"""
+        # Helpers take a gig through accept_gig, which also assigns them
+        if new_status == GigStatus.ACCEPTED:
+            return None, None
+        
+        gig, current_status = await GigCRUD.transition(
+            session,
+            gig_id,
+            new_status,
+            scope=[or_(col(Gig.seeker_id) == user_id, col(Gig.helper_id) == user_id)],
         )
-        result = await session.execute(statement)
-        gig = result.scalar_one_or_none()
         
         if not gig:
-            return None
+            return None, current_status
         
-        gig.status = new_status
-        gig.updated_at = datetime.now(timezone.utc)
+        await session.commit()
+
+        if new_status == GigStatus.PENDING:
+            # Back in the feed: it may belong to tiles that never held it
+            gig_tile_cache.clear()
+        else:
+            gig_tile_cache.invalidate(gig.id)
+        return gig, None
+    
+    @staticmethod
+    async def transition(
+        session: AsyncSession,
+        gig_id: UUID,
+        new_status: GigStatus,
+        scope: Iterable = (),
+        criteria: Iterable = (),
+        values: Optional[dict] = None
+    ) -> Tuple[Optional[Gig], Optional[GigStatus]]:
+        """
+        Move a gig to new_status if GIG_TRANSITIONS allows it from its current status.
+
+        Runs as a single UPDATE ... WHERE id = :id AND <scope> AND status IN
+        (allowed sources) AND <criteria> RETURNING gig. scope limits which gigs
+        the caller may see at all; criteria are extra preconditions on the move.
+
+        Returns (gig, None) on success. When no row matched, the gig is locked
+        and re-checked in the same transaction, so the reason reflects the state
+        that blocked the move: (None, None) if the gig is missing or outside
+        scope, (None, current_status) if its status or criteria don't allow it.
+        Does not commit.
+        """
+        scope, criteria = list(scope), list(criteria)
+        sources = allowed_sources(new_status)
         
-        # Set completion time if marked as completed
+        now = datetime.now(timezone.utc)
+        transition_values = {"status": new_status, "updated_at": now}
         if new_status == GigStatus.COMPLETED:
-            gig.completed_at = datetime.now(timezone.utc)
+            transition_values["completed_at"] = now
+        elif new_status == GigStatus.PENDING:
+            # Released back to the feed: open the helper slot, or accept_gig
+            # (helper_id IS NULL) and delete_gig could never match it again
+            transition_values["helper_id"] = None
+        transition_values.update(values or {})
+        conditions = [col(Gig.id) == gig_id, *scope, col(Gig.status).in_(sources), *criteria]
         
-        await session.commit()
-        await session.refresh(gig)
-        return gig
+        if sources:
+            gig = await update_returning(session, Gig, conditions, transition_values)
+            if gig:
+                return gig, None
+        
+        # Failure path only: lock the row, then report (or apply) what its state allows
+        locked = (await session.execute(
+            select(col(Gig.status), and_(col(Gig.status).in_(sources), *criteria).label("allowed"))
+            .where(col(Gig.id) == gig_id, *scope)
+            .with_for_update()
+        )).first()
+        if locked is None:
+            return None, None
+        if locked.allowed:
+            # Moved into an allowed state after the first UPDATE; it can't fail under the lock
+            return await update_returning(session, Gig, conditions, transition_values), None
+        return None, GigStatus(locked.status)
     
     @staticmethod
     async def search_gigs(
         session: AsyncSession, 
         search_params: GigSearchSchema,
         user_location: Optional[Tuple[float, float]] = None
-    ) -> Tuple[List[Gig], int]:
-        """Search gigs with geospatial and other filters"""
-        
-        # Base query
-        query = select(Gig).where(col(Gig.status) == search_params.status)
-        count_query = select(func.count(col(Gig.id))).where(col(Gig.status) == search_params.status)
-        
+    ) -> Tuple[List[Row], Optional[int], Optional[str]]:
+        """
+        Search gigs with geospatial and other filters.
+
+        Returns read-only rows of GIG_ROW_COLUMNS, plus distance (metres) for
+        location searches. Pending-gig searches near a location go through
+        gig_tile_cache first and only fall back to this query when it can't
+        serve them.
+
+        Pages by keyset on (distance, id) around a location, otherwise on
+        (created_at, id) newest first. Pass the returned cursor back as
+        search_params.cursor for the next page. The total comes from a window
+        count on the first page only, so each page evaluates the spatial
+        filter once; cursor pages return None for it.
+        """
+        # Nearby pending gigs are usually served from the geohash tile cache
+        if search_params.is_nearby:
+            cached = await gig_tile_cache.search(session, search_params, GIG_ROW_COLUMNS)
+            if cached is not None:
+                return cached
+
+        filters = [col(Gig.status) == search_params.status]
+        distance = None
+
         # Geospatial filter - search around specified location
-        if search_params.latitude and search_params.longitude:
-            # Create search point with correct SRID (4326 for WGS84/GPS coordinates)
-            search_point = ST_SetSRID(
-                ST_MakePoint(search_params.longitude, search_params.latitude),
-                4326
-            )
-            
-            # Filter by distance
-            distance_filter = ST_DWithin(
+        if search_params.is_nearby:
+            # Geography comparison: radius and distance in metres, backed by the
+            # GiST index on geography(location)
+            radius_m = (search_params.radius_km or 10.0) * 1000
+            filters.append(within_radius(
                 col(Gig.location),
-                search_point,
-                (search_params.radius_km or 10.0) * 1000  # Convert km to meters
+                search_params.latitude,
+                search_params.longitude,
+                radius_m
+            ))
+            distance = distance_m(
+                col(Gig.location), search_params.latitude, search_params.longitude
             )
-            
-            query = query.where(distance_filter)
-            count_query = count_query.where(distance_filter)
-            
-            # Add distance calculation for sorting
-            query = query.add_columns(
-                ST_Distance(col(Gig.location), search_point).label('distance')
-            ).order_by(text('distance'))
         
         # Budget filters
         if search_params.min_budget is not None:
-            budget_filter = col(Gig.budget) >= search_params.min_budget
-            query = query.where(budget_filter)
-            count_query = count_query.where(budget_filter)
+            filters.append(col(Gig.budget) >= search_params.min_budget)
             
         if search_params.max_budget is not None:
-            budget_filter = col(Gig.budget) <= search_params.max_budget
-            query = query.where(budget_filter)
-            count_query = count_query.where(budget_filter)
+            filters.append(col(Gig.budget) <= search_params.max_budget)
         
         # Duration filter
         if search_params.max_duration is not None:
-            duration_filter = col(Gig.duration_hours) <= search_params.max_duration
-            query = query.where(duration_filter)
-            count_query = count_query.where(duration_filter)
-        
-        # Add default ordering if no geospatial search
-        if not (search_params.latitude and search_params.longitude):
-            query = query.order_by(col(Gig.created_at).desc())
-        
-        # Pagination
-        query = query.offset(search_params.offset).limit(search_params.limit)
-        
-        # Execute queries
-        result = await session.execute(query)
-        count_result = await session.execute(count_query)
+            filters.append(col(Gig.duration_hours) <= search_params.max_duration)
         
-        # Handle results based on whether we have distance calculation
-        if search_params.latitude and search_params.longitude:
-            # Results include distance column
-            rows = result.all()
-            gigs = [row[0] for row in rows]  # Extract gig objects
-            # TODO: Add distance to gig objects for response
+        # Nearest first around a location, newest first otherwise
+        if distance is not None:
+            sort_key = tuple_(distance, col(Gig.id))
+            order_by = [distance, col(Gig.id)]
         else:
-            gigs = result.scalars().all()
-        
-        total_count = count_result.scalar() or 0
-        
-        return list(gigs), total_count
+            sort_key = tuple_(col(Gig.created_at), col(Gig.id))
+            order_by = [col(Gig.created_at).desc(), col(Gig.id).desc()]
+
+        last_key = search_params.cursor_key()
+        if last_key is not None:
+            if distance is not None:
+                filters.append(sort_key > tuple_(*last_key))
+            else:
+                filters.append(sort_key < tuple_(*last_key))
+
+        columns = list(GIG_ROW_COLUMNS)
+        if distance is not None:
+            columns.append(distance.label("distance"))
+        with_total = not search_params.cursor
+        if with_total:
+            # Counted over the filtered rows before LIMIT, in the same scan
+            columns.append(func.count().over().label("total_count"))
+
+        query = (
+            select(*columns)
+            .where(*filters)
+            .order_by(*order_by)
+            .limit(search_params.limit + 1)
+        )
+        if not search_params.cursor:
+            query = query.offset(search_params.offset)
+
+        result = await session.execute(query)
+        rows = result.all()
+
+        has_more = len(rows) > search_params.limit
+        rows = rows[: search_params.limit]
+
+        total_count = None
+        if with_total:
+            if rows:
+                total_count = rows[0].total_count
+            elif search_params.offset == 0:
+                total_count = 0
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            sort_value = last.distance if distance is not None else last.created_at
+            next_cursor = encode_cursor(sort_value, last.id)
+
+        return rows, total_count, next_cursor
     
     @staticmethod
     async def get_user_gigs(
@@ -264,14 +397,14 @@ class GigCRUD:
         as_seeker: bool = True,
         limit: int = 20,
         offset: int = 0
-    ) -> Tuple[List[Gig], int]:
-        """Get gigs created by user (as seeker) or accepted by user (as helper)"""
+    ) -> Tuple[List[Row], int]:
+        """Get gigs created by user (as seeker) or accepted by user (as helper) as read-only rows"""
         
         if as_seeker:
-            query = select(Gig).where(col(Gig.seeker_id) == user_id)
+            query = select(*GIG_ROW_COLUMNS).where(col(Gig.seeker_id) == user_id)
             count_query = select(func.count(col(Gig.id))).where(col(Gig.seeker_id) == user_id)
         else:
-            query = select(Gig).where(col(Gig.helper_id) == user_id)
+            query = select(*GIG_ROW_COLUMNS).where(col(Gig.helper_id) == user_id)
             count_query = select(func.count(col(Gig.id))).where(col(Gig.helper_id) == user_id)
         
         # Order by most recent
@@ -280,7 +413,7 @@ class GigCRUD:
         result = await session.execute(query)
         count_result = await session.execute(count_query)
         
-        gigs = result.scalars().all()
+        gigs = result.all()
         total_count = count_result.scalar() or 0
         
         return list(gigs), total_count
\ No newline at end of file
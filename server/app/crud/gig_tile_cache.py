@@ -0,0 +1,158 @@
+"""
+In-process geohash tile cache for nearby pending gig searches.
+
+Search centres are snapped to a geohash cell and the radius to a bucket. The
+cache holds every pending gig within that bucket of the cell, widened by the
+cell's half-diagonal, so any centre inside the cell is covered. Exact distance,
+budget and duration filters, ordering and keyset paging then run in memory.
+Gig writes drop every tile that holds the gig or covers its new location,
+and tiles load from the primary; other workers catch up when their tiles expire.
+Tiles too dense to filter in memory are remembered as such for the same TTL,
+so those searches go straight to PostGIS.
+"""
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, col
+
+from app.configs.app_config import app_config
+from app.database.session import PRIMARY_BIND
+from app.models import Gig, GigStatus
+from app.schemas.gig_schema import GigSearchSchema
+from app.utils.cache import AsyncLRUCache
+from app.utils.geo import geohash_cell, haversine_m, round_distance, within_radius
+from app.utils.pagination import encode_cursor
+
+RADIUS_BUCKETS_KM = (1, 2, 5, 10, 20, 50, 100)
+
+
+@dataclass(frozen=True)
+class GigTile:
+    latitude: float
+    longitude: float
+    coverage_m: float
+    rows: Tuple[Any, ...]
+    gig_ids: frozenset
+    # More candidates than max_candidates: served by the SQL query instead
+    too_dense: bool = False
+
+
+class GigTileCache:
+    """Pending-gig candidates per (geohash cell, radius bucket)"""
+
+    def __init__(
+        self,
+        precision: int = app_config.GIG_TILE_CACHE_PRECISION,
+        ttl: float = app_config.GIG_TILE_CACHE_TTL,
+        max_tiles: int = app_config.GIG_TILE_CACHE_SIZE,
+        max_candidates: int = app_config.GIG_TILE_MAX_CANDIDATES,
+    ):
+        self.precision = precision
+        self.max_candidates = max_candidates
+        self._tiles: AsyncLRUCache[GigTile] = AsyncLRUCache(max_size=max_tiles, ttl=ttl)
+
+    async def search(
+        self, session: AsyncSession, search_params: GigSearchSchema, row_columns: list
+    ) -> Optional[Tuple[List[Any], Optional[int], Optional[str]]]:
+        """Same contract as GigCRUD.search_gigs, or None when the tile can't serve it"""
+        if search_params.status != GigStatus.PENDING:
+            return None
+
+        radius_m = (search_params.radius_km or 10.0) * 1000
+        bucket_km = next((km for km in RADIUS_BUCKETS_KM if km * 1000 >= radius_m), None)
+        if bucket_km is None:
+            return None
+
+        cell, cell_lat, cell_lon, half_diagonal = geohash_cell(
+            search_params.latitude, search_params.longitude, self.precision
+        )
+        coverage_m = bucket_km * 1000 + half_diagonal
+
+        async def load() -> GigTile:
+            query = (
+                select(*row_columns)
+                .where(
+                    col(Gig.status) == GigStatus.PENDING,
+                    within_radius(col(Gig.location), cell_lat, cell_lon, coverage_m),
+                )
+                .limit(self.max_candidates + 1)
+            )
+            # Tiles outlive the request; never fill one from a lagging replica
+            rows = (await session.execute(query, bind_arguments=PRIMARY_BIND)).all()
+            if len(rows) > self.max_candidates:
+                # Cached too, or every search here would run this query and then PostGIS's
+                return GigTile(
+                    latitude=cell_lat,
+                    longitude=cell_lon,
+                    coverage_m=coverage_m,
+                    rows=(),
+                    gig_ids=frozenset(),
+                    too_dense=True,
+                )
+            return GigTile(
+                latitude=cell_lat,
+                longitude=cell_lon,
+                coverage_m=coverage_m,
+                rows=tuple(rows),
+                gig_ids=frozenset(str(row.id) for row in rows),
+            )
+
+        tile = await self._tiles.get_or_load((cell, bucket_km), load)
+        if tile is None or tile.too_dense:
+            return None
+        return self._page(tile, search_params, radius_m)
+
+    @staticmethod
+    def _page(tile: GigTile, search_params: GigSearchSchema, radius_m: float):
+        matches = []
+        for row in tile.rows:
+            if search_params.min_budget is not None and row.budget < search_params.min_budget:
+                continue
+            if search_params.max_budget is not None and row.budget > search_params.max_budget:
+                continue
+            if search_params.max_duration is not None and row.duration_hours > search_params.max_duration:
+                continue
+            distance = haversine_m(
+                search_params.latitude, search_params.longitude, row.latitude, row.longitude
+            )
+            if distance <= radius_m:
+                matches.append(SimpleNamespace(**row._asdict(), distance=round_distance(distance)))
+
+        matches.sort(key=lambda match: (match.distance, str(match.id)))
+
+        total_count = None
+        last_key = search_params.cursor_key()
+        if last_key is not None:
+            matches = [match for match in matches if (match.distance, str(match.id)) > last_key]
+        else:
+            total_count = len(matches)
+            matches = matches[search_params.offset:]
+
+        page = matches[: search_params.limit]
+        next_cursor = None
+        if len(matches) > search_params.limit:
+            next_cursor = encode_cursor(page[-1].distance, page[-1].id)
+
+        return page, total_count, next_cursor
+
+    def invalidate(
+        self, gig_id, latitude: Optional[float] = None, longitude: Optional[float] = None
+    ) -> None:
+        """Drop tiles holding the gig, or covering (latitude, longitude) if given"""
+        gig_key = str(gig_id)
+        for key, tile in self._tiles.items():
+            covers_point = latitude is not None and longitude is not None and haversine_m(
+                tile.latitude, tile.longitude, latitude, longitude
+            ) <= tile.coverage_m
+            if gig_key in tile.gig_ids or covers_point:
+                self._tiles.invalidate(key)
+        # A tile loading right now may have read the gig's old state
+        self._tiles.discard_inflight()
+
+    def clear(self) -> None:
+        self._tiles.clear()
+
+
+gig_tile_cache = GigTileCache()
@@ -6,15 +6,43 @@ from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timezone
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, and_, desc, text as sa_text
+from sqlalchemy.orm import aliased
+from sqlalchemy import Row, func, and_, desc, text as sa_text
 from sqlmodel import select, col
 
 from app.models import Review, User, Gig, GigStatus
+from app.modules.users.user_cache import full_name_expression, invalidate_user_caches
 from app.schemas.review_schema import (
     ReviewCreateSchema,
+    ReviewResponseSchema,
     ReviewUpdateSchema,
     ReviewStatsSchema
 )
+from app.utils.projection import schema_columns
+
+# Columns for list responses, returned as read-only rows, with the names and
+# gig title the responses show joined in (see _review_rows)
+REVIEW_ROW_COLUMNS = schema_columns(Review, ReviewResponseSchema)
+Reviewer = aliased(User, name="reviewer")
+Reviewee = aliased(User, name="reviewee")
+REVIEW_LIST_COLUMNS = [
+    *REVIEW_ROW_COLUMNS,
+    full_name_expression(Reviewer).label("reviewer_name"),
+    full_name_expression(Reviewee).label("reviewee_name"),
+    col(Gig.title).label("gig_title"),
+]
+
+
+def _review_rows(*criteria):
+    """SELECT of REVIEW_LIST_COLUMNS; names and title come from outer joins, not per-row lookups"""
+    return (
+        select(*REVIEW_LIST_COLUMNS)
+        .select_from(Review)
+        .outerjoin(Reviewer, col(Reviewer.id) == col(Review.reviewer_id))
+        .outerjoin(Reviewee, col(Reviewee.id) == col(Review.reviewee_id))
+        .outerjoin(Gig, col(Gig.id) == col(Review.gig_id))
+        .where(*criteria)
+    )
 
 
 class ReviewCRUD:
@@ -78,7 +106,6 @@ class ReviewCRUD:
         
         session.add(review)
         await session.commit()
-        await session.refresh(review)
         
         # Update reviewee's reputation score
         await ReviewCRUD._update_user_reputation(session, review_data.reviewee_id)
@@ -110,8 +137,8 @@ class ReviewCRUD:
         skip: int = 0,
         limit: int = 20,
         as_reviewee: bool = True
-    ) -> Tuple[List[Review], int]:
-        """Get reviews for a user (as reviewee by default, or as reviewer)"""
+    ) -> Tuple[List[Row], int]:
+        """Get reviews for a user (as reviewee by default, or as reviewer) as read-only rows of REVIEW_LIST_COLUMNS"""
         
         if as_reviewee:
             filter_condition = col(Review.reviewee_id) == user_id
@@ -125,15 +152,14 @@ class ReviewCRUD:
         
         # Get paginated reviews
         query = (
-            select(Review)
-            .where(filter_condition)
+            _review_rows(filter_condition)
             .order_by(desc(col(Review.created_at)))
             .offset(skip)
             .limit(limit)
         )
         
         result = await session.execute(query)
-        reviews = result.scalars().all()
+        reviews = result.all()
         
         return list(reviews), total
 
@@ -141,16 +167,15 @@ class ReviewCRUD:
     async def get_gig_reviews(
         session: AsyncSession,
         gig_id: UUID
-    ) -> List[Review]:
-        """Get all reviews for a specific gig"""
+    ) -> List[Row]:
+        """Get all reviews for a specific gig as read-only rows of REVIEW_LIST_COLUMNS"""
         query = (
-            select(Review)
-            .where(col(Review.gig_id) == gig_id)
+            _review_rows(col(Review.gig_id) == gig_id)
             .order_by(desc(col(Review.created_at)))
         )
         
         result = await session.execute(query)
-        return list(result.scalars().all())
+        return list(result.all())
 
     @staticmethod
     async def get_user_written_reviews(
@@ -158,8 +183,8 @@ class ReviewCRUD:
         user_id: UUID,
         skip: int = 0,
         limit: int = 20
-    ) -> Tuple[List[Review], int]:
-        """Get reviews written by a user"""
+    ) -> Tuple[List[Row], int]:
+        """Get reviews written by a user as read-only rows of REVIEW_LIST_COLUMNS"""
         return await ReviewCRUD.get_user_reviews(
             session, user_id, skip, limit, as_reviewee=False
         )
@@ -189,7 +214,6 @@ class ReviewCRUD:
             review.comment = review_data.comment
             
         await session.commit()
-        await session.refresh(review)
         
         # Update reviewee's reputation score if rating changed
         if review_data.rating is not None:
@@ -279,6 +303,8 @@ class ReviewCRUD:
             {"reputation": round(float(avg_rating), 2), "user_id": str(user_id)}
         )
         await session.commit()
+        # Cached principals carry reputation_score
+        invalidate_user_caches(user_id)
 
     @staticmethod
     async def can_user_review_gig(
@@ -5,17 +5,36 @@ Transaction CRUD operations for Mock Payment System
 from typing import List, Optional, Tuple
 from uuid import UUID, uuid4
 from datetime import datetime
+from sqlalchemy import Row, lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from sqlmodel import select, func, and_, or_, col
 
+from app.crud.gig_crud import GigCRUD, allowed_sources
 from app.models import Transaction, TransactionStatus, User, Gig, GigStatus
+from app.modules.users.user_cache import full_name_expression
 from app.schemas.transaction_schema import (
     TransactionCreateSchema,
     TransactionUpdateSchema,
     EscrowCreateSchema,
     ServiceFeeCalculationSchema,
-    PaymentSummarySchema
+    PaymentSummarySchema,
+    TransactionResponseSchema
 )
+from app.utils.projection import schema_columns
+from app.utils.returning import update_returning
+
+# Columns for list responses, returned as read-only rows, with the gig title
+# and party names the responses show joined in
+TRANSACTION_ROW_COLUMNS = schema_columns(Transaction, TransactionResponseSchema)
+Payer = aliased(User, name="payer")
+Payee = aliased(User, name="payee")
+TRANSACTION_LIST_COLUMNS = [
+    *TRANSACTION_ROW_COLUMNS,
+    col(Gig.title).label("gig_title"),
+    full_name_expression(Payer).label("payer_name"),
+    full_name_expression(Payee).label("payee_name"),
+]
 
 
 class TransactionCRUD:
@@ -60,7 +79,7 @@ class TransactionCRUD:
             return None
         
         # Check if transaction already exists
-        existing_stmt = select(Transaction).where(col(Transaction.gig_id) == gig_id)
+        existing_stmt = lambda_stmt(lambda: select(Transaction).where(col(Transaction.gig_id) == gig_id))
         existing_result = await session.execute(existing_stmt)
         existing_transaction = existing_result.scalar_one_or_none()
         
@@ -85,7 +104,6 @@ class TransactionCRUD:
         
         session.add(transaction)
         await session.commit()
-        await session.refresh(transaction)
         
         return transaction
     
@@ -97,41 +115,38 @@ class TransactionCRUD:
     ) -> Optional[Transaction]:
         """Release payment from escrow (complete transaction)"""
         
-        # Get transaction
-        stmt = select(Transaction).where(col(Transaction.id) == transaction_id)
-        result = await session.execute(stmt)
-        transaction = result.scalar_one_or_none()
+        # Only a pending transaction, released by the seeker (payer) or helper (payee),
+        # for a gig that exists and has been taken on (or is already completed)
+        gig_releasable = (
+            select(col(Gig.id))
+            .where(
+                col(Gig.id) == col(Transaction.gig_id),
+                col(Gig.status).in_([*allowed_sources(GigStatus.COMPLETED), GigStatus.COMPLETED]),
+            )
+            .exists()
+        )
+        transaction = await update_returning(
+            session,
+            Transaction,
+            [
+                col(Transaction.id) == transaction_id,
+                col(Transaction.status) == TransactionStatus.PENDING,
+                or_(col(Transaction.payer_id) == user_id, col(Transaction.payee_id) == user_id),
+                gig_releasable,
+            ],
+            {"status": TransactionStatus.COMPLETED, "completed_at": datetime.utcnow()},
+        )
         
         if not transaction:
             return None
         
-        # Verify transaction is in pending status
-        if transaction.status != TransactionStatus.PENDING:
+        # Complete the gig too; if it was cancelled meanwhile, release nothing
+        gig, current_status = await GigCRUD.transition(session, transaction.gig_id, GigStatus.COMPLETED)
+        if not gig and current_status != GigStatus.COMPLETED:
+            await session.rollback()
             return None
         
-        # Get gig to verify authorization
-        gig_stmt = select(Gig).where(col(Gig.id) == transaction.gig_id)
-        gig_result = await session.execute(gig_stmt)
-        gig = gig_result.scalar_one_or_none()
-        
-        if not gig:
-            return None
-        
-        # Only seeker (payer) or helper (payee) can release payment
-        if user_id not in (transaction.payer_id, transaction.payee_id):
-            return None
-        
-        # Update transaction status
-        transaction.status = TransactionStatus.COMPLETED
-        transaction.completed_at = datetime.utcnow()
-        
-        # Update gig status to completed if not already
-        if gig.status != GigStatus.COMPLETED:
-            gig.status = GigStatus.COMPLETED
-            gig.completed_at = datetime.utcnow()
-        
         await session.commit()
-        await session.refresh(transaction)
         
         return transaction
     
@@ -143,27 +158,22 @@ class TransactionCRUD:
     ) -> Optional[Transaction]:
         """Cancel a pending transaction"""
         
-        # Get transaction
-        stmt = select(Transaction).where(col(Transaction.id) == transaction_id)
-        result = await session.execute(stmt)
-        transaction = result.scalar_one_or_none()
+        # Only the payer can cancel, and only while pending
+        transaction = await update_returning(
+            session,
+            Transaction,
+            [
+                col(Transaction.id) == transaction_id,
+                col(Transaction.status) == TransactionStatus.PENDING,
+                col(Transaction.payer_id) == user_id,
+            ],
+            {"status": TransactionStatus.CANCELLED},
+        )
         
         if not transaction:
             return None
         
-        # Verify transaction is in pending status
-        if transaction.status != TransactionStatus.PENDING:
-            return None
-        
-        # Only payer can cancel
-        if transaction.payer_id != user_id:
-            return None
-        
-        # Update transaction status
-        transaction.status = TransactionStatus.CANCELLED
-        
         await session.commit()
-        await session.refresh(transaction)
         
         return transaction
     
@@ -173,7 +183,7 @@ class TransactionCRUD:
         transaction_id: UUID
     ) -> Optional[Transaction]:
         """Get transaction by ID"""
-        stmt = select(Transaction).where(col(Transaction.id) == transaction_id)
+        stmt = lambda_stmt(lambda: select(Transaction).where(col(Transaction.id) == transaction_id))
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
     
@@ -183,7 +193,7 @@ class TransactionCRUD:
         gig_id: UUID
     ) -> Optional[Transaction]:
         """Get transaction for a specific gig"""
-        stmt = select(Transaction).where(col(Transaction.gig_id) == gig_id)
+        stmt = lambda_stmt(lambda: select(Transaction).where(col(Transaction.gig_id) == gig_id))
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
     
@@ -194,8 +204,8 @@ class TransactionCRUD:
         skip: int = 0,
         limit: int = 20,
         status_filter: Optional[TransactionStatus] = None
-    ) -> Tuple[List[Transaction], int]:
-        """Get user's transactions (both as payer and payee)"""
+    ) -> Tuple[List[Row], int]:
+        """Get user's transactions (both as payer and payee) as read-only rows of TRANSACTION_LIST_COLUMNS"""
         
         # Build query conditions
         conditions = or_(
@@ -208,14 +218,18 @@ class TransactionCRUD:
         
         # Get transactions
         stmt = (
-            select(Transaction)
+            select(*TRANSACTION_LIST_COLUMNS)
+            .select_from(Transaction)
+            .outerjoin(Gig, col(Gig.id) == col(Transaction.gig_id))
+            .outerjoin(Payer, col(Payer.id) == col(Transaction.payer_id))
+            .outerjoin(Payee, col(Payee.id) == col(Transaction.payee_id))
             .where(conditions)
             .order_by(col(Transaction.created_at).desc())
             .offset(skip)
             .limit(limit)
         )
         result = await session.execute(stmt)
-        transactions = result.scalars().all()
+        transactions = result.all()
         
         # Get total count
         count_stmt = select(func.count(col(Transaction.id))).where(conditions)
@@ -325,25 +339,24 @@ class TransactionCRUD:
     ) -> Optional[Transaction]:
         """Update transaction status (admin or authorized user only)"""
         
-        # Get transaction
-        stmt = select(Transaction).where(col(Transaction.id) == transaction_id)
-        result = await session.execute(stmt)
-        transaction = result.scalar_one_or_none()
+        values = {"status": new_status}
+        if new_status == TransactionStatus.COMPLETED:
+            values["completed_at"] = datetime.utcnow()
+        
+        # Only users involved in the transaction
+        transaction = await update_returning(
+            session,
+            Transaction,
+            [
+                col(Transaction.id) == transaction_id,
+                or_(col(Transaction.payer_id) == user_id, col(Transaction.payee_id) == user_id),
+            ],
+            values,
+        )
         
         if not transaction:
             return None
         
-        # Verify user is involved in the transaction
-        if user_id not in (transaction.payer_id, transaction.payee_id):
-            return None
-        
-        # Update status
-        transaction.status = new_status
-        
-        if new_status == TransactionStatus.COMPLETED:
-            transaction.completed_at = datetime.utcnow()
-        
         await session.commit()
-        await session.refresh(transaction)
         
         return transaction
\ No newline at end of file
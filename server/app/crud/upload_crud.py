@@ -3,20 +3,37 @@ CRUD operations for file upload and image management.
 Handles file storage, metadata tracking, and file serving.
 """
 
+import logging
 import os
-import uuid
-import shutil
 from typing import Optional, List, BinaryIO
 from pathlib import Path
 from uuid import UUID
 from datetime import datetime
 
+from sqlalchemy import Row, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, col
 from fastapi import UploadFile, HTTPException, status
 
 from app.models import UploadedFile, User
 from app.schemas.upload_schemas import ImageValidationConfig
+from app.utils.blob_store import BlobStore
+from app.utils.image_variants import image_variants, variant_dir
+from app.utils.static_files import open_file_cache
+from app.utils.uploads import StoredUpload, stream_to_temp
+
+logger = logging.getLogger(__name__)
+
+# Columns for file listings, returned as read-only rows
+UPLOADED_FILE_ROW_COLUMNS = [
+    col(UploadedFile.id),
+    col(UploadedFile.filename),
+    col(UploadedFile.original_filename),
+    col(UploadedFile.file_size),
+    col(UploadedFile.content_type),
+    col(UploadedFile.upload_category),
+    col(UploadedFile.uploaded_at),
+]
 
 
 class UploadCRUD:
@@ -30,6 +47,85 @@ class UploadCRUD:
         # Create subdirectories
         for category in ["profile", "gig"]:
             (self.upload_dir / category).mkdir(exist_ok=True)
+        
+        # Upload content, shared by every UploadedFile row with the same bytes
+        self.blob_store = BlobStore(self.upload_dir / "blobs")
+    
+    @staticmethod
+    async def _lock_blob(session: AsyncSession, name: str) -> None:
+        """Serialise writers and deleters of one blob until the transaction ends"""
+        await session.execute(
+            select(func.pg_advisory_xact_lock(func.hashtextextended(name, 0)))
+        )
+    
+    async def put_blob(
+        self, session: AsyncSession, file: UploadFile, max_size: int
+    ) -> StoredUpload:
+        """
+        Stream file into the blob store; content already stored is not written again.
+        
+        Holds the blob's lock in session's transaction, so commit the UploadedFile
+        row pointing at it in that same transaction.
+        """
+        staged = await stream_to_temp(file, self.blob_store.temp_path(), max_size)
+        name = BlobStore.blob_name(staged.sha256, Path(file.filename or "").suffix)
+        try:
+            await self._lock_blob(session, name)
+        except BaseException:
+            await self.blob_store.remove(staged.path)
+            raise
+        path, _ = await self.blob_store.commit(staged.path, name)
+        return StoredUpload(path=path, size=staged.size, sha256=staged.sha256)
+    
+    async def release_file(self, session: AsyncSession, file_record: UploadedFile) -> None:
+        """
+        Soft delete file_record and commit. The blob is unlinked afterwards, once
+        no active UploadedFile row references it (reference count from the rows
+        themselves).
+        """
+        file_path = Path(file_record.file_path)
+        file_record.is_active = False
+        await session.commit()
+        
+        await self._remove_if_unreferenced(session, file_path)
+    
+    async def discard_blob(self, session: AsyncSession, file_path: Path) -> None:
+        """
+        Undo put_blob after the row meant to reference it failed to commit:
+        roll back, then remove the blob unless another row references it.
+        """
+        await session.rollback()
+        await self._remove_if_unreferenced(session, file_path)
+    
+    async def _remove_if_unreferenced(self, session: AsyncSession, file_path: Path) -> None:
+        """
+        Unlink the blob and its variants if no committed, active row points at it.
+        
+        Runs in its own transaction after the caller's changes are committed, so a
+        failed commit never leaves a row pointing at a deleted file. The count and
+        unlink happen under the blob's lock, which put_blob holds until the row
+        for a new upload of the same content is committed.
+        """
+        try:
+            await self._lock_blob(session, file_path.name)
+            remaining = await session.scalar(
+                select(func.count()).where(
+                    col(UploadedFile.file_path) == str(file_path),
+                    col(UploadedFile.is_active) == True
+                )
+            )
+            if not remaining:
+                # Stop serving from cached descriptors, which would outlive the unlink
+                open_file_cache.evict(file_path)
+                open_file_cache.evict_under(variant_dir(file_path))
+                await self.blob_store.remove(file_path)
+                await image_variants.remove_all(file_path)
+            await session.commit()
+        except Exception as e:
+            # Can't count references (database down?) or unlink: keep the blob.
+            # An orphan only wastes space and is reused by the next identical upload
+            await session.rollback()
+            logger.warning("Kept unreferenced blob %s: %s", file_path.name, e)
     
     async def save_file(
         self, 
@@ -43,15 +139,13 @@ class UploadCRUD:
         # Validate file
         self._validate_file(file, category)
         
-        # Generate unique filename
-        file_extension = Path(file.filename).suffix if file.filename else ""
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = self.upload_dir / category / unique_filename
-        
-        # Save file to disk
+        # Stream file into the blob store, capped at the configured size
         try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            stored = await self.put_blob(
+                session, file, ImageValidationConfig().max_file_size
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -60,23 +154,23 @@ class UploadCRUD:
         finally:
             await file.close()
         
-        # Get file size
-        file_size = file_path.stat().st_size
-        
         # Create database record
         uploaded_file = UploadedFile(
-            filename=unique_filename,
+            filename=stored.path.name,
             original_filename=file.filename or "unknown",
-            file_path=str(file_path),
-            file_size=file_size,
+            file_path=str(stored.path),
+            file_size=stored.size,
             content_type=file.content_type or "application/octet-stream",
             upload_category=category,
             uploaded_by=user_id
         )
         
         session.add(uploaded_file)
-        await session.commit()
-        await session.refresh(uploaded_file)
+        try:
+            await session.commit()
+        except Exception:
+            await self.discard_blob(session, stored.path)
+            raise
         
         return uploaded_file
     
@@ -98,9 +192,9 @@ class UploadCRUD:
         category: Optional[str] = None,
         limit: int = 20,
         offset: int = 0
-    ) -> List[UploadedFile]:
-        """Get files uploaded by user."""
-        stmt = select(UploadedFile).where(
+    ) -> List[Row]:
+        """Get files uploaded by user as read-only rows."""
+        stmt = select(*UPLOADED_FILE_ROW_COLUMNS).where(
             col(UploadedFile.uploaded_by) == user_id,
             col(UploadedFile.is_active) == True
         )
@@ -112,7 +206,7 @@ class UploadCRUD:
         stmt = stmt.offset(offset).limit(limit)
         
         result = await session.execute(stmt)
-        return list(result.scalars().all())
+        return list(result.all())
     
     async def delete_file(
         self, session: AsyncSession, file_id: UUID, user_id: UUID
@@ -129,19 +223,8 @@ class UploadCRUD:
         if not file_record:
             return False
         
-        # Soft delete - mark as inactive
-        file_record.is_active = False
-        await session.commit()
-        
-        # Optionally, delete physical file
-        try:
-            file_path = Path(file_record.file_path)
-            if file_path.exists():
-                file_path.unlink()
-        except Exception:
-            # Log error but don't fail the operation
-            pass
-        
+        # Soft delete; the file goes with its last reference
+        await self.release_file(session, file_record)
         return True
     
     def get_file_path(self, uploaded_file: UploadedFile) -> Path:
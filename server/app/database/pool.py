@@ -0,0 +1,69 @@
+# database/pool.py
+import time
+from bisect import bisect_left
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds of the checkout wait histogram, in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Checkout counts, wait-time histogram and timeouts for one pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_sum = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe(self, wait_ms: float) -> None:
+        self.checkouts += 1
+        self.wait_ms_sum += wait_ms
+        self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def as_dict(self) -> dict:
+        labels = [f"le_{bound}" for bound in WAIT_BUCKETS_MS] + ["le_inf"]
+        cumulative, histogram = 0, {}
+        for label, count in zip(labels, self.wait_buckets):
+            cumulative += count
+            histogram[label] = cumulative
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_sum": round(self.wait_ms_sum, 3),
+            "wait_ms": histogram,
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every checkout, including the wait for a free slot"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def status_dict(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "idle": self.checkedin(),
+            **self.metrics.as_dict(),
+        }
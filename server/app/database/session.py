@@ -1,24 +1,254 @@
 # database/session.py
+import asyncio
+import time
+from sqlalchemy import event, text
+from sqlalchemy.engine.interfaces import CacheStats
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
+from starlette.responses import Response
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 from app.configs.app_config import app_config
+from app.database.pool import InstrumentedPool
 
 DATABASE_URL = str(app_config.SQLALCHEMY_DATABASE_URI)
-
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
+REPLICA_DATABASE_URL = (
+    str(app_config.SQLALCHEMY_REPLICA_DATABASE_URI)
+    if app_config.SQLALCHEMY_REPLICA_DATABASE_URI else None
 )
 
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedPool,
+        pool_size=app_config.DB_POOL_SIZE,
+        max_overflow=app_config.DB_MAX_OVERFLOW,
+        pool_timeout=app_config.DB_POOL_TIMEOUT,
+        pool_recycle=app_config.DB_POOL_RECYCLE,
+        pool_pre_ping=app_config.DB_POOL_PRE_PING,
+        query_cache_size=app_config.DB_QUERY_CACHE_SIZE,
+        connect_args={
+            "prepared_statement_cache_size": app_config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                "statement_timeout": str(app_config.DB_STATEMENT_TIMEOUT_MS),
+                "idle_in_transaction_session_timeout": str(app_config.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS),
+            },
+        },
+    )
+
+
+engine = _create_engine(DATABASE_URL)
+replica_engine = _create_engine(REPLICA_DATABASE_URL) if REPLICA_DATABASE_URL else None
+
+# session.info flags
+USE_REPLICA = "use_replica"
+RESPONSE = "response"
+WROTE = "wrote"
+
+# Read-your-writes marker: commit time (epoch seconds) carried by the client, so
+# it holds whichever worker serves the next request. Sent back as both a cookie
+# and a header; clients that don't keep cookies echo the header
+WROTE_AT_COOKIE = "db_wrote_at"
+WROTE_AT_HEADER = "X-DB-Wrote-At"
+
+# Pass as bind_arguments= for reads that must see the primary, e.g. shared cache loads
+PRIMARY_BIND = {"use_primary": True}
+
+
+class RoutingSession(Session):
+    """Sends SELECTs to the replica while session.info[USE_REPLICA] is set.
+
+    Flushes and DML always go to the primary, and after the first write the rest
+    of the session reads from the primary as well so it sees its own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info[WROTE] = True
+            self.info.pop(USE_REPLICA, None)
+        elif (
+            replica_engine is not None
+            and self.info.get(USE_REPLICA)
+            and not kw.get("use_primary")
+            and getattr(clause, "is_select", False)
+        ):
+            return replica_engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
 AsyncSessionLocal = async_sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+    autocommit=False,
+    autoflush=False,
+    # Committed objects keep their state; write paths return them without a refresh SELECT
+    expire_on_commit=False,
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
 )
 
+@event.listens_for(RoutingSession, "after_commit")
+def _mark_writer(session):
+    response = session.info.get(RESPONSE)
+    if session.info.pop(WROTE, False) and response is not None:
+        wrote_at = f"{time.time():.3f}"
+        response.headers[WROTE_AT_HEADER] = wrote_at
+        response.set_cookie(
+            WROTE_AT_COOKIE,
+            wrote_at,
+            max_age=max(1, int(app_config.DB_READ_YOUR_WRITES_SECONDS)),
+            httponly=True,
+            samesite="lax",
+        )
+
+
+def wrote_recently(connection: Optional[HTTPConnection]) -> bool:
+    """True while the caller's read-your-writes marker is within DB_READ_YOUR_WRITES_SECONDS"""
+    if connection is None:
+        return False
+    marker = connection.headers.get(WROTE_AT_HEADER) or connection.cookies.get(WROTE_AT_COOKIE)
+    try:
+        age = time.time() - float(marker)
+    except (TypeError, ValueError):
+        return False
+    # Markers from the future are forged (or badly skewed); ignore them
+    return -1.0 <= age <= app_config.DB_READ_YOUR_WRITES_SECONDS
+
+
+class ReplicaMonitor:
+    """Measures replica replay lag from a background task.
+
+    Requests only read the last measurement, so an unreachable replica never
+    holds one up for the probe timeout.
+    """
+
+    LAG_SQL = text(
+        "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+    )
+
+    def __init__(
+        self,
+        max_lag: float = app_config.DB_REPLICA_MAX_LAG_SECONDS,
+        interval: float = app_config.DB_REPLICA_LAG_CHECK_INTERVAL,
+    ):
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+
+    async def _measure(self) -> float:
+        async with replica_engine.connect() as conn:
+            return float((await conn.execute(self.LAG_SQL)).scalar())
+
+    async def check(self) -> None:
+        try:
+            self.lag_seconds = await asyncio.wait_for(self._measure(), self.interval)
+        except Exception:
+            # Unreachable or too slow to answer: treat as lagging
+            self.lag_seconds = None
+        self.checked_at = time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if replica_engine is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def is_usable(self) -> bool:
+        if replica_engine is None:
+            return False
+        # A stalled probe says nothing about the replica now
+        if time.monotonic() - self.checked_at > 3 * self.interval:
+            return False
+        return self.lag_seconds is not None and self.lag_seconds <= self.max_lag
+
+    def as_dict(self) -> Optional[dict]:
+        if replica_engine is None:
+            return None
+        return {
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag,
+            "usable": self.is_usable(),
+        }
+
+
+replica_monitor = ReplicaMonitor()
+
+
+class CompileCacheStats:
+    """Counts SQLAlchemy compiled-statement cache hits for executed statements"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def record(self, cache_hit) -> None:
+        if cache_hit is CacheStats.CACHE_HIT:
+            self.hits += 1
+        elif cache_hit is CacheStats.CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
+
+    def as_dict(self) -> dict:
+        cached = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_rate": round(self.hits / cached, 4) if cached else None,
+        }
+
+
+compile_cache_stats = CompileCacheStats()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _record_compile_cache(conn, cursor, statement, parameters, context, executemany):
+    compile_cache_stats.record(getattr(context, "cache_hit", None))
+
+
+if replica_engine is not None:
+    event.listen(replica_engine.sync_engine, "after_cursor_execute", _record_compile_cache)
+
+
+async def get_db(
+    connection: HTTPConnection = None, response: Response = None
+) -> AsyncGenerator[AsyncSession, None]:
+    """Primary session for endpoints that write; a commit marks response for read-your-writes"""
+    async with AsyncSessionLocal() as session:
+        session.info[RESPONSE] = response
+        yield session
+
+
+async def get_read_db(
+    connection: HTTPConnection = None, response: Response = None
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints.
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    SELECTs go to the replica when one is configured, its lag is within
+    DB_REPLICA_MAX_LAG_SECONDS and the caller's read-your-writes marker is
+    older than DB_READ_YOUR_WRITES_SECONDS; otherwise this behaves like get_db.
+    """
     async with AsyncSessionLocal() as session:
+        session.info[RESPONSE] = response
+        if not wrote_recently(connection) and replica_monitor.is_usable():
+            session.info[USE_REPLICA] = True
         yield session
@@ -1,15 +1,19 @@
 import logging
-from fastapi import FastAPI, status
+import sys
+from fastapi import FastAPI, Request, status
 from fastapi.routing import APIRoute
 from fastapi.responses import JSONResponse
 from fastapi.openapi.utils import get_openapi
 from starlette.middleware.cors import CORSMiddleware
-from sqlalchemy import text
+from sqlalchemy import exc, text
 from contextlib import asynccontextmanager
 
 from app.api import api_router
 from app.configs.app_config import app_config
-from app.database.session import engine
+from app.database.session import compile_cache_stats, engine, replica_engine, replica_monitor
+from app.security import password_hash_pool
+from app.utils.image_variants import image_variants
+from app.utils.static_files import open_file_cache
 
 
 logger = logging.getLogger(__name__)
@@ -31,10 +35,22 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("❌ Failed to connect to SQLite: %s", e)
         raise e
+    replica_monitor.start()
 
     yield
 
+    # Chat is loaded only with its routes; flush messages already broadcast but
+    # still queued for the database
+    websocket_manager = sys.modules.get("app.websocket_manager")
+    if websocket_manager is not None:
+        await websocket_manager.manager.stop()
+    password_hash_pool.shutdown()
+    image_variants.shutdown()
+    open_file_cache.clear()
+    await replica_monitor.stop()
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
     logger.info("🧹 Async engine disposed")
 
 
@@ -59,6 +75,17 @@ if app_config.all_cors_origins:
 app.include_router(api_router, prefix=app_config.API_STR)
 
 
+@app.exception_handler(exc.TimeoutError)
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError):
+    # No pooled connection freed up within DB_POOL_TIMEOUT
+    logger.warning("Database pool exhausted: %s", error)
+    return JSONResponse(
+        content={"detail": "Service busy, please retry"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/", tags=["Default"])
 async def root():
     return {"message": "Welcome to HOURZ API"}
@@ -69,7 +96,15 @@ async def health_check():
     try:
         async with engine.begin() as conn:
             await conn.execute(text("SELECT 1"))
-        return {"status": "ok"}
+        return {
+            "status": "ok",
+            "statement_cache": compile_cache_stats.as_dict(),
+            "replica": replica_monitor.as_dict(),
+            "pool": {
+                "primary": engine.pool.status_dict(),
+                "replica": replica_engine.pool.status_dict() if replica_engine is not None else None,
+            },
+        }
     except Exception:
         return JSONResponse(
             content={"status": "unhealthy"},
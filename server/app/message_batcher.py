@@ -0,0 +1,134 @@
+"""
+Write-behind persistence for WebSocket chat messages.
+
+Messages get their id and timestamp in-process and are broadcast right away.
+Inserts are queued here and group-committed in micro-batches, flushed when the
+batch is full or after a few milliseconds, whichever comes first. Each submit
+returns a future that resolves once the row is durable. A batch that fails is
+retried row by row, so one bad row fails alone.
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configs.app_config import app_config
+from app.crud.chat_crud_async import ChatCRUD
+from app.database.session import AsyncSessionLocal
+from app.models import ChatRoom, Message
+
+logger = logging.getLogger(__name__)
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class MessageBatchWriter:
+    """Group-commits chat message inserts in micro-batches"""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        max_batch: int = app_config.CHAT_WRITE_BATCH_SIZE,
+        flush_interval_ms: float = app_config.CHAT_WRITE_FLUSH_MS,
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._batch_full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def submit(self, row: Dict[str, Any]) -> asyncio.Future:
+        """Queue a message row; the returned future resolves when it is committed"""
+        if self._stopping:
+            raise RuntimeError("MessageBatchWriter is stopping")
+
+        if self._task is None or self._task.done():
+            # Bind the event to the running loop each time the flusher restarts
+            self._batch_full = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        # Failures are logged by _write_batch; callers that don't wait on the future
+        # must not trigger "exception was never retrieved"
+        future.add_done_callback(_retrieve_exception)
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+        return future
+
+    async def stop(self):
+        """Flush everything still queued and stop the background task"""
+        self._stopping = True
+        if self._task is not None:
+            self._batch_full.set()
+            await self._task
+            self._task = None
+        self._stopping = False
+
+    async def _run(self):
+        # One flush in flight at a time: rows arriving during a commit join the next batch
+        while self._pending:
+            if len(self._pending) < self.max_batch and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[: self.max_batch]
+            self._pending = self._pending[self.max_batch :]
+            if len(self._pending) < self.max_batch and not self._stopping:
+                self._batch_full.clear()
+
+            await self._write_batch(batch)
+
+    async def _write_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            await self._persist([row for row, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            # One bad row (e.g. its room was deleted) must not lose the others:
+            # retry row by row so only the offending rows fail
+            logger.warning("⚠️ Chat batch of %d failed, retrying row by row: %s", len(batch), e)
+            for entry in batch:
+                await self._write_batch([entry])
+            return
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(True)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Dict[str, Any], asyncio.Future]], error: Exception):
+        logger.error("❌ Failed to persist %d chat messages: %s", len(batch), error)
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _persist(self, rows: List[Dict[str, Any]]):
+        """Insert rows and bump unread counters and room activity in one transaction"""
+        async with self.session_factory() as db:
+            await db.execute(insert(Message), rows)
+
+            # Per (room, sender) unread bumps, then one updated_at touch per batch
+            increments = Counter((row["chat_room_id"], row["sender_id"]) for row in rows)
+            for (room_id, sender_id), amount in increments.items():
+                await ChatCRUD.increment_unread_counts(db, room_id, sender_id, amount)
+
+            room_ids = {row["chat_room_id"] for row in rows}
+            await db.execute(
+                update(ChatRoom)
+                .where(ChatRoom.id.in_(room_ids))
+                .values(updated_at=datetime.utcnow())
+            )
+            await db.commit()
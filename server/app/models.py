@@ -2,7 +2,7 @@ import enum
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column
+from sqlalchemy import Column, Index, func
 from geoalchemy2 import Geometry
 from sqlalchemy import String, Integer, Float, Boolean, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
@@ -113,7 +113,19 @@ class Address(Base):
 
     user = relationship("User", back_populates="address", uselist=False)
 
+    # Radius search casts to geography for metres (app/utils/geo.py)
+    __table_args__ = (
+        Index(
+            "ix_address_location_geography",
+            func.geography(location),
+            postgresql_using="gist",
+        ),
+    )
 
+
+# Parked models below. Their schema (ChatParticipant.unread_count, the message
+# keyset index, the gig geography index, UploadedFile.file_path index) only
+# reaches the database once they are uncommented and init_db recreates tables.
 # class Gig(Base):
 #     """Gigs/Requests posted by Seekers"""
 
@@ -139,6 +151,11 @@ class Address(Base):
 #     reviews = relationship("Review", back_populates="gig")
 #     transaction = relationship("Transaction", back_populates="gig", uselist=False)
 
+#     # Radius search casts to geography for metres (app/utils/geo.py)
+#     __table_args__ = (
+#         Index("ix_gig_location_geography", func.geography(location), postgresql_using="gist"),
+#     )
+
 
 # class ChatRoom(Base):
 #     """Chat rooms created when gigs are accepted"""
@@ -161,6 +178,7 @@ class Address(Base):
 #     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
 #     joined_at = Column(DateTime, default=datetime.utcnow)
 #     last_read_at = Column(DateTime, nullable=True)
+#     unread_count = Column(Integer, default=0, nullable=False)
 #     chat_room_id = Column(String, ForeignKey("chatroom.id"), index=True)
 #     user_id = Column(String, ForeignKey("user.id"), index=True)
 #     chat_room = relationship("ChatRoom", back_populates="participants")
@@ -182,6 +200,11 @@ class Address(Base):
 #     chat_room = relationship("ChatRoom", back_populates="messages")
 #     sender = relationship("User", back_populates="messages_sent")
 
+#     # Backs keyset pagination of chat history on (timestamp, id) within a room
+#     __table_args__ = (
+#         Index("ix_message_chat_room_id_timestamp_id", "chat_room_id", "timestamp", "id"),
+#     )
+
 
 # class BuddyList(Base):
 #     """Favorite helpers/seekers (buddy system)"""
@@ -241,7 +264,7 @@ class Address(Base):
 #     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
 #     filename = Column(String, index=True, nullable=False)
 #     original_filename = Column(String, nullable=False)
-#     file_path = Column(String, nullable=False)
+#     file_path = Column(String, nullable=False, index=True)  # shared by rows with the same content
 #     file_size = Column(Integer, nullable=False)
 #     content_type = Column(String, nullable=False)
 #     upload_category = Column(String, index=True, nullable=False)
@@ -1,5 +1,4 @@
 # routes/auth_route.py
-import re
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,8 +7,9 @@ from app.models import User
 from app.schemas.api_schema import CreateOut
 from app.database.session import get_db
 from app.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
+    verify_dummy_password,
     create_refresh_token,
     create_access_token,
     get_current_user_with_refresh_token,
@@ -24,18 +24,8 @@ router = APIRouter(prefix="/auth", tags=["Authorization"])
 
 @router.post("/register", response_model=CreateOut, status_code=status.HTTP_201_CREATED)
 async def register(user_create: UserCreate, db: AsyncSession = Depends(get_db)):
-    existing_user_by_email = await user_crud.get_user_by_email(db, user_create.email)
-    if existing_user_by_email:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-
-    existing_user_by_phone = await user_crud.get_user_by_phone_number(db, user_create.phone_number)
-    if existing_user_by_phone:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Phone number already registered",
-        )
-
-    hashed_password = get_password_hash(user_create.password)
+    # * Duplicate email/phone surfaces as IntegrityError from create_user
+    hashed_password = await get_password_hash_async(user_create.password)
     result = await user_crud.create_user(db, user_create, hashed_password)
     return result
 
@@ -46,24 +36,28 @@ async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
-    user: User | None = None
-    input_identifier = form_data.username.strip().lower()
+    user = await user_crud.get_user_by_identifier(db, form_data.username)
 
-    # * Email
-    if re.fullmatch(r"[^@\s]+@[^@\s]+\.[^@\s]+", input_identifier):
-        user = await user_crud.get_user_by_email(db, input_identifier)
-
-    # * Phone Number
-    elif input_identifier.isdigit():
-        user = await user_crud.get_user_by_phone_number(db, input_identifier)
+    is_valid, new_hash = False, None
+    if user:
+        is_valid, new_hash = await verify_password_async(
+            form_data.password, str(user.hashed_password)
+        )
+    else:
+        await verify_dummy_password(form_data.password)
 
-    if not user or not verify_password(form_data.password, str(user.hashed_password)):
+    if not user or not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # * Stored hash uses an outdated scheme or cost factor
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
     access_token = create_access_token(data={"sub": str(user.id)})
     return {
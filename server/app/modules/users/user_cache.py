@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.configs.app_config import app_config
+from app.database.session import PRIMARY_BIND
+from app.models import User
+from app.utils.cache import AsyncLRUCache
+
+
+@dataclass(frozen=True)
+class UserProfileSummary:
+    """Public profile fields shown next to messages, buddies and gigs.
+
+    Only fields that change with explicit profile edits; availability and
+    reputation move on their own and are read with get_user_statuses.
+    """
+
+    id: str
+    full_name: str
+    email: str
+    profile_image_url: Optional[str]
+
+
+@dataclass(frozen=True)
+class UserStatus:
+    """Volatile profile fields, never cached"""
+
+    is_available: bool
+    reputation_score: float
+
+
+# Per-process: other workers see a profile change once their entry expires (TTL).
+# Loads read the primary so an invalidated entry is not refilled from a lagging replica
+user_summary_cache: AsyncLRUCache[UserProfileSummary] = AsyncLRUCache(
+    max_size=app_config.USER_CACHE_SIZE,
+    ttl=app_config.USER_CACHE_TTL,
+)
+
+
+# Authenticated users keyed by (user id, token iat). Values are detached snapshots
+# that are merged into each request's session, never shared instances
+principal_cache: AsyncLRUCache[User] = AsyncLRUCache(
+    max_size=app_config.USER_CACHE_SIZE,
+    ttl=app_config.AUTH_USER_CACHE_TTL,
+)
+
+
+def _to_summary(row) -> UserProfileSummary:
+    full_name = f"{row.first_name or ''} {row.last_name or ''}".strip()
+    return UserProfileSummary(
+        id=str(row.id),
+        full_name=full_name or "Incomplete Profile",
+        email=row.email,
+        profile_image_url=row.profile_image_url,
+    )
+
+
+def full_name_expression(user=User):
+    """SQL for the display name _to_summary builds, for queries that join users"""
+    name = func.trim(func.concat_ws(" ", user.first_name, user.last_name))
+    return func.coalesce(func.nullif(name, ""), "Incomplete Profile")
+
+
+def to_user_status(row) -> UserStatus:
+    return UserStatus(is_available=bool(row.is_available), reputation_score=row.reputation_score)
+
+
+async def _load_summaries(db: AsyncSession, user_ids: list) -> Dict[str, UserProfileSummary]:
+    result = await db.execute(
+        select(
+            User.id,
+            User.first_name,
+            User.last_name,
+            User.email,
+            User.profile_image_url,
+        ).where(User.id.in_(user_ids)),
+        bind_arguments=PRIMARY_BIND,
+    )
+    return {str(row.id): _to_summary(row) for row in result}
+
+
+async def get_user_summary(db: AsyncSession, user_id) -> Optional[UserProfileSummary]:
+    key = str(user_id)
+
+    async def load():
+        return (await _load_summaries(db, [key])).get(key)
+
+    return await user_summary_cache.get_or_load(key, load)
+
+
+async def get_user_summaries(
+    db: AsyncSession, user_ids: Iterable
+) -> Dict[str, UserProfileSummary]:
+    """Summaries keyed by str(user_id); one query covers every id not cached"""
+    return await user_summary_cache.get_many_or_load(
+        (str(user_id) for user_id in user_ids),
+        lambda missing: _load_summaries(db, missing),
+    )
+
+
+async def get_user_statuses(db: AsyncSession, user_ids: Iterable) -> Dict[str, UserStatus]:
+    """Availability and reputation keyed by str(user_id), straight from the database"""
+    keys = list({str(user_id) for user_id in user_ids})
+    if not keys:
+        return {}
+    result = await db.execute(
+        select(User.id, User.is_available, User.reputation_score).where(User.id.in_(keys))
+    )
+    return {str(row.id): to_user_status(row) for row in result}
+
+
+def _detached_copy(instance):
+    state = inspect(instance)
+    loaded = {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+    return state.mapper.class_(**loaded)
+
+
+def snapshot_user(user: User) -> User:
+    """Detached copy of a loaded user and its address, safe to keep across sessions"""
+    copy = _detached_copy(user)
+    if user.address is not None:
+        copy.address = _detached_copy(user.address)
+        make_transient_to_detached(copy.address)
+    make_transient_to_detached(copy)
+    return copy
+
+
+async def get_principal(db: AsyncSession, user_id: str, issued_at, loader) -> Optional[User]:
+    """Authenticated user bound to db, loading through loader(db, user_id) on a miss"""
+
+    async def load():
+        user = await loader(db, user_id)
+        return snapshot_user(user) if user is not None else None
+
+    snapshot = await principal_cache.get_or_load((str(user_id), issued_at), load)
+    if snapshot is None:
+        return None
+    # load=False copies the snapshot into this session without a SELECT
+    return await db.merge(snapshot, load=False)
+
+
+def invalidate_user_caches(user_id) -> None:
+    """Drop the cached summary and every cached principal of a user"""
+    key = str(user_id)
+    user_summary_cache.invalidate(key)
+    principal_cache.invalidate_where(lambda cached: cached[0] == key)
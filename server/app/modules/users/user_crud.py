@@ -1,11 +1,13 @@
 from fastapi import HTTPException
 from geoalchemy2 import WKTElement
+from sqlalchemy import lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
 
 from app.models import User, Address
+from app.modules.users.user_cache import invalidate_user_caches
 from app.schemas.api_schema import CreateOut, UpdateOut
 
 from app.modules.users.user_schema import (
@@ -14,20 +16,47 @@ from app.modules.users.user_schema import (
 )
 
 
+# * Hot lookups are lambda statements: the construct is built and cache-keyed once,
+# * later calls only bind new parameter values
+
+
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
-    result = await db.execute(select(User).where(User.email == email.lower()))
+    email = email.lower()
+    stmt = lambda_stmt(lambda: select(User).where(User.email == email))
+    result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
 
 async def get_user_by_phone_number(db: AsyncSession, phone_number: str) -> User | None:
-    result = await db.execute(select(User).filter(User.phone_number == phone_number))
+    stmt = lambda_stmt(lambda: select(User).where(User.phone_number == phone_number))
+    result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
 
+async def get_user_by_identifier(db: AsyncSession, identifier: str) -> User | None:
+    """Login lookup by email or phone number: one indexed query, whatever the input"""
+    identifier = identifier.strip().lower()
+    if "@" in identifier:
+        return await get_user_by_email(db, identifier)
+    return await get_user_by_phone_number(db, identifier)
+
+
+def _duplicate_field(exc: IntegrityError) -> str | None:
+    """Which unique column a failed insert collided with, if any"""
+    # asyncpg exposes the constraint on the original error; fall back to the message
+    cause = getattr(exc.orig, "__cause__", None)
+    detail = getattr(cause, "constraint_name", None) or str(exc.orig)
+    for field in ("email", "phone_number"):
+        if field in detail:
+            return field
+    return None
+
+
 async def get_user_by_id(db: AsyncSession, user_id: str) -> User | None:
-    result = await db.execute(
-        select(User).options(selectinload(User.address)).where(User.id == user_id)
+    stmt = lambda_stmt(
+        lambda: select(User).options(selectinload(User.address)).where(User.id == user_id)
     )
+    result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
 
@@ -66,9 +95,11 @@ async def create_user(db: AsyncSession, user: UserCreate, password_hash: str) ->
         return CreateOut(success=True)
     except IntegrityError as exc:
         await db.rollback()
-        raise HTTPException(
-            status_code=409, detail="Email or Phone number already registered"
-        ) from exc
+        detail = {
+            "email": "Email already registered",
+            "phone_number": "Phone number already registered",
+        }.get(_duplicate_field(exc), "Email or Phone number already registered")
+        raise HTTPException(status_code=409, detail=detail) from exc
     except Exception as exc:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Internal server error: {exc}") from exc
@@ -100,6 +131,7 @@ async def update_user(db: AsyncSession, id: str, user_update: UserUpdate) -> Upd
                 address.location = point  # type: ignore
     try:
         await db.commit()
+        invalidate_user_caches(id)
         return UpdateOut(success=True)
     except IntegrityError as exc:
         await db.rollback()
@@ -4,7 +4,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User
 from app.schemas.api_schema import UpdateOut
 from app.database.session import get_db
-from app.security import get_current_user_with_access_token
+from app.security import (
+    TokenClaims,
+    get_current_user_claims,
+    get_current_user_with_access_token,
+)
 
 from app.modules.users.user_schema import (
     UserOut,
@@ -23,10 +27,10 @@ async def read_me(current_user: User = Depends(get_current_user_with_access_toke
 @router.put("/me", response_model=UpdateOut)
 async def update_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user_with_access_token),
+    claims: TokenClaims = Depends(get_current_user_claims),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await user_crud.update_user(db, str(current_user.id), user_update)
+    result = await user_crud.update_user(db, claims.user_id, user_update)
     return result
 
 
@@ -8,9 +8,9 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.session import get_db
+from app.database.session import get_db, get_read_db
 from app.crud.buddy_crud import buddy_crud
-from app.modules.users import user_crud
+from app.modules.users.user_cache import get_user_statuses, get_user_summaries, get_user_summary
 from app.schemas.buddy_schemas import (
     BuddyCreate,
     BuddyResponse,
@@ -32,7 +32,7 @@ async def add_buddy(
 ):
     """Add a user to current user's buddy list."""
     # Check if buddy user exists
-    buddy_user = await user_crud.get_user_by_id(db, buddy_create.buddy_id)
+    buddy_user = await get_user_summary(db, buddy_create.buddy_id)
     if not buddy_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,10 +54,11 @@ async def add_buddy(
         )
 
     # Store buddy user details before CRUD operation
+    buddy_status = (await get_user_statuses(db, [buddy_create.buddy_id]))[buddy_user.id]
     buddy_full_name = buddy_user.full_name
     buddy_email = buddy_user.email
-    buddy_is_available = buddy_user.is_available
-    buddy_reputation_score = buddy_user.reputation_score
+    buddy_is_available = buddy_status.is_available
+    buddy_reputation_score = buddy_status.reputation_score
     buddy_profile_image_url = buddy_user.profile_image_url
 
     # Add buddy
@@ -82,17 +83,18 @@ async def add_buddy(
 async def get_buddy_list(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get current user's buddy list."""
     buddies = await buddy_crud.get_buddy_list(db, current_user.id, skip, limit)
 
-    # Convert to response format with user details
+    # Convert to response format with user details, one cached lookup for the page
+    buddy_users = await get_user_summaries(db, (row.BuddyList.buddy_id for row in buddies))
     buddy_responses = []
-    for buddy_entry in buddies:
-        # Get buddy user details
-        buddy_user = await user_crud.get_user_by_id(db, buddy_entry.buddy_id)
+    # Availability and reputation come from the list query itself
+    for buddy_entry, is_available, reputation_score in buddies:
+        buddy_user = buddy_users.get(str(buddy_entry.buddy_id))
         if buddy_user:  # Skip if user was deleted
             buddy_responses.append(
                 BuddyResponse(
@@ -103,8 +105,8 @@ async def get_buddy_list(
                     notes=buddy_entry.notes,
                     buddy_full_name=buddy_user.full_name,
                     buddy_email=buddy_user.email,
-                    buddy_is_available=buddy_user.is_available,
-                    buddy_reputation_score=buddy_user.reputation_score,
+                    buddy_is_available=is_available,
+                    buddy_reputation_score=reputation_score,
                     buddy_profile_image_url=buddy_user.profile_image_url,
                 )
             )
@@ -121,7 +123,7 @@ async def get_buddy_list(
 async def get_available_buddies(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get buddies who are currently available (is_available=True)."""
@@ -129,11 +131,12 @@ async def get_available_buddies(
         db, current_user.id, skip, limit
     )
 
-    # Convert to response format with user details
+    # Convert to response format with user details, one cached lookup for the page
+    buddy_users = await get_user_summaries(db, (row.BuddyList.buddy_id for row in available_buddies))
     buddy_responses = []
-    for buddy_entry in available_buddies:
-        # Get buddy user details
-        buddy_user = await user_crud.get_user_by_id(db, buddy_entry.buddy_id)
+    # Availability and reputation come from the list query itself
+    for buddy_entry, is_available, reputation_score in available_buddies:
+        buddy_user = buddy_users.get(str(buddy_entry.buddy_id))
         if buddy_user:  # Skip if user was deleted
             buddy_responses.append(
                 BuddyResponse(
@@ -144,8 +147,8 @@ async def get_available_buddies(
                     notes=buddy_entry.notes,
                     buddy_full_name=buddy_user.full_name,
                     buddy_email=buddy_user.email,
-                    buddy_is_available=buddy_user.is_available,
-                    buddy_reputation_score=buddy_user.reputation_score,
+                    buddy_is_available=is_available,
+                    buddy_reputation_score=reputation_score,
                     buddy_profile_image_url=buddy_user.profile_image_url,
                 )
             )
@@ -176,7 +179,7 @@ async def remove_buddy(
 @router.get("/{buddy_id}", response_model=BuddyResponse)
 async def get_buddy_details(
     buddy_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get details of a specific buddy."""
@@ -188,12 +191,13 @@ async def get_buddy_details(
         )
 
     # Get buddy user details
-    buddy_user = await user_crud.get_user_by_id(db, buddy_entry.buddy_id)
+    buddy_user = await get_user_summary(db, buddy_entry.buddy_id)
     if not buddy_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Buddy user not found",
         )
+    buddy_status = (await get_user_statuses(db, [buddy_entry.buddy_id]))[buddy_user.id]
 
     return BuddyResponse(
         id=buddy_entry.id,
@@ -203,8 +207,8 @@ async def get_buddy_details(
         notes=buddy_entry.notes,
         buddy_full_name=buddy_user.full_name,
         buddy_email=buddy_user.email,
-        buddy_is_available=buddy_user.is_available,
-        buddy_reputation_score=buddy_user.reputation_score,
+        buddy_is_available=buddy_status.is_available,
+        buddy_reputation_score=buddy_status.reputation_score,
         buddy_profile_image_url=buddy_user.profile_image_url,
     )
 
@@ -227,15 +231,15 @@ async def update_buddy_notes(
     # Update notes
     buddy_entry.notes = buddy_update.notes
     await db.commit()
-    await db.refresh(buddy_entry)
 
     # Get buddy user details for response
-    buddy_user = await user_crud.get_user_by_id(db, buddy_entry.buddy_id)
+    buddy_user = await get_user_summary(db, buddy_entry.buddy_id)
     if not buddy_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Buddy user not found",
         )
+    buddy_status = (await get_user_statuses(db, [buddy_entry.buddy_id]))[buddy_user.id]
 
     return BuddyResponse(
         id=buddy_entry.id,
@@ -245,7 +249,7 @@ async def update_buddy_notes(
         notes=buddy_entry.notes,
         buddy_full_name=buddy_user.full_name,
         buddy_email=buddy_user.email,
-        buddy_is_available=buddy_user.is_available,
-        buddy_reputation_score=buddy_user.reputation_score,
+        buddy_is_available=buddy_status.is_available,
+        buddy_reputation_score=buddy_status.reputation_score,
         buddy_profile_image_url=buddy_user.profile_image_url,
     )
\ No newline at end of file
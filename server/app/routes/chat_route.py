@@ -3,10 +3,11 @@ Chat REST API routes - Full implementation
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from app.database.session import get_db
+from app.database.session import get_db, get_read_db
 from app.security import get_current_user_with_access_token
 from app.models import User
 from app.schemas.chat_schema import (
@@ -14,15 +15,23 @@ from app.schemas.chat_schema import (
     MessageHistoryOut, ChatRoomDetailOut, UserSummary
 )
 from app.crud.chat_crud_async import ChatCRUD
+from app.utils.pagination import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
+
+def message_key(cursor: str) -> Tuple[datetime, str]:
+    """(timestamp, id) from a message cursor; ValueError unless it has exactly that shape"""
+    timestamp, message_id = decode_cursor(cursor, datetime, (str, UUID))
+    return timestamp, str(message_id)
+
+
 @router.get("/rooms", response_model=List[ChatRoomSummary])
 async def get_user_chat_rooms(
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user_with_access_token)
 ):
     """
@@ -90,7 +99,7 @@ async def get_user_chat_rooms(
 @router.get("/rooms/{room_id}", response_model=ChatRoomDetailOut)
 async def get_chat_room(
     room_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user_with_access_token)
 ):
     """
@@ -169,29 +178,60 @@ async def get_chat_room(
 @router.get("/rooms/{room_id}/messages", response_model=MessageHistoryOut)
 async def get_chat_messages(
     room_id: UUID,
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
     per_page: int = Query(50, ge=1, le=100, description="Messages per page"),
-    db: AsyncSession = Depends(get_db),
+    before: Optional[str] = Query(None, description="Cursor: fetch messages older than this"),
+    after: Optional[str] = Query(None, description="Cursor: fetch messages newer than this"),
+    since_last_read: bool = Query(False, description="Only fetch messages since last read"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user_with_access_token)
 ):
     """
     Get message history for chat room with pagination (newest first)
+
+    Pass ``before``/``after`` cursors (or ``since_last_read``) for keyset pagination;
+    plain ``page`` requests keep working for older clients.
     """
     try:
         print(f"📱 Messages for room {room_id} requested by user: {current_user.full_name}")
-        
-        messages_data, total = await ChatCRUD.get_chat_messages(
-            db, room_id, current_user.id, page, per_page
-        )
-        
-        if not messages_data and page == 1:
-            # Check if room exists and user has access
-            room_data = await ChatCRUD.get_chat_room_by_id(db, room_id, current_user.id)
-            if not room_data:
+
+        cursor_mode = before is not None or after is not None or since_last_read
+        if cursor_mode:
+            try:
+                before_key = message_key(before) if before else None
+                after_key = message_key(after) if after else None
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+            keyset_result = await ChatCRUD.get_chat_messages_keyset(
+                db,
+                room_id,
+                current_user.id,
+                before=before_key,
+                after=after_key,
+                since_last_read=since_last_read,
+                limit=per_page,
+            )
+            if keyset_result is None:
                 raise HTTPException(
-                    status_code=404, 
+                    status_code=404,
                     detail="Chat room not found or access denied"
                 )
+            messages_data, has_more, has_older = keyset_result
+            total = None
+        else:
+            messages_data, total = await ChatCRUD.get_chat_messages(
+                db, room_id, current_user.id, page, per_page
+            )
+
+            if not messages_data and page == 1:
+                # Check if room exists and user has access
+                room_data = await ChatCRUD.get_chat_room_by_id(db, room_id, current_user.id)
+                if not room_data:
+                    raise HTTPException(
+                        status_code=404, 
+                        detail="Chat room not found or access denied"
+                    )
         
         # Convert to response format
         messages = []
@@ -211,18 +251,41 @@ async def get_chat_messages(
                     profile_image_url=msg_data["sender"]["profile_image_url"]
                 )
             ))
-        
-        has_next = (page * per_page) < total
-        has_prev = page > 1
-        
-        result = MessageHistoryOut(
-            messages=messages,
-            total_count=total,
-            page=page,
-            per_page=per_page,
-            has_next=has_next,
-            has_prev=has_prev
-        )
+
+        # Cursors point at the oldest / newest message on this page
+        next_before = None
+        next_after = None
+        if messages_data:
+            next_before = encode_cursor(messages_data[-1]["timestamp"], messages_data[-1]["id"])
+            next_after = encode_cursor(messages_data[0]["timestamp"], messages_data[0]["id"])
+
+        if cursor_mode:
+            # "next" pages go back in time, "prev" pages towards the newest message
+            paging_forward = after is not None or since_last_read
+            has_next = has_older
+            has_prev = has_more if paging_forward else before is not None
+            if not messages_data:
+                # Nothing new: keep the client's cursor so it can poll again
+                next_after = after
+            result = MessageHistoryOut(
+                messages=messages,
+                per_page=per_page,
+                has_next=has_next,
+                has_prev=has_prev,
+                next_before=next_before,
+                next_after=next_after
+            )
+        else:
+            result = MessageHistoryOut(
+                messages=messages,
+                total_count=total,
+                page=page,
+                per_page=per_page,
+                has_next=(page * per_page) < total,
+                has_prev=page > 1,
+                next_before=next_before,
+                next_after=next_after
+            )
         
         print(f"✅ Retrieved {len(messages)} messages for room {room_id}")
         return result
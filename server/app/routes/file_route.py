@@ -1,15 +1,23 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
-import uuid
 import shutil
 from pathlib import Path
 from typing import Optional
 
+from app.crud.upload_crud import UploadCRUD
 from app.models import User, UploadedFile
 from app.database.session import get_db
 from app.security import get_current_user_with_access_token
+from app.modules.users.user_cache import invalidate_user_caches
+from app.utils.image_variants import VARIANT_FORMATS, image_variants, variant_path
+from app.utils.static_files import (
+    IMMUTABLE_CACHE_CONTROL,
+    MUTABLE_CACHE_CONTROL,
+    file_etag,
+    file_response,
+    not_modified,
+)
 
 router = APIRouter(prefix="/files", tags=["File Management"])
 
@@ -24,6 +32,10 @@ GENERAL_DIR = UPLOAD_DIR / "general"
 for directory in [UPLOAD_DIR, PROFILE_DIR, GIG_DIR, GENERAL_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
+# New uploads are content-addressed under UPLOAD_DIR/blobs; the category
+# directories above hold files uploaded before that
+file_store = UploadCRUD(str(UPLOAD_DIR))
+
 # Allowed file types
 ALLOWED_IMAGE_TYPES = {
     "image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp"
@@ -34,6 +46,7 @@ MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 @router.post("/upload/{category}")
 async def upload_file(
     category: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user_with_access_token),
     db: AsyncSession = Depends(get_db)
@@ -53,37 +66,22 @@ async def upload_file(
             detail=f"File type {file.content_type} not allowed. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}"
         )
     
-    # Check file size
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large. Max size: 5MB")
-    
     # Generate unique filename
     if not file.filename:
         raise HTTPException(status_code=400, detail="Filename is required")
     
-    file_extension = Path(file.filename).suffix.lower()
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    
-    # Determine upload directory
-    if category == "profile":
-        upload_path = PROFILE_DIR / unique_filename
-    elif category == "gig":
-        upload_path = GIG_DIR / unique_filename
-    else:
-        upload_path = GENERAL_DIR / unique_filename
+    # Stream into the blob store; stops at MAX_FILE_SIZE without reading the rest,
+    # and content that is already stored is not written again
+    stored = await file_store.put_blob(db, file, MAX_FILE_SIZE)
+    stored_filename = stored.path.name
     
-    # Save file
     try:
-        with open(upload_path, "wb") as buffer:
-            buffer.write(content)
-        
         # Save file metadata to database
         uploaded_file = UploadedFile(
-            filename=unique_filename,
+            filename=stored_filename,
             original_filename=file.filename or "unknown",
-            file_path=str(upload_path),
-            file_size=len(content),
+            file_path=str(stored.path),
+            file_size=stored.size,
             content_type=file.content_type or "application/octet-stream",
             upload_category=category,
             uploaded_by=current_user.id
@@ -91,58 +89,103 @@ async def upload_file(
         
         db.add(uploaded_file)
         await db.commit()
-        await db.refresh(uploaded_file)
+        background_tasks.add_task(image_variants.pregenerate, stored.path)
         
         # Return file URL for frontend
-        file_url = f"/api/files/serve/{category}/{unique_filename}"
+        file_url = f"/api/files/serve/{category}/{stored_filename}"
         
         return {
             "file_id": uploaded_file.id,
-            "filename": unique_filename,
+            "filename": stored_filename,
             "original_filename": file.filename or "unknown",
             "file_url": file_url,
-            "file_size": len(content),
+            "file_size": stored.size,
+            "sha256": stored.sha256,
             "category": category
         }
         
     except Exception as e:
-        # Clean up file if database save fails
-        if upload_path.exists():
-            upload_path.unlink()
+        # Removes the blob unless another row already shares it
+        await file_store.discard_blob(db, stored.path)
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
 
 @router.get("/serve/{category}/{filename}")
-async def serve_file(category: str, filename: str):
+async def serve_file(
+    category: str,
+    filename: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=4096, description="Preferred image width in pixels")
+):
     """
     Serve uploaded files to frontend
     Public endpoint - no authentication required for serving
+
+    Images are resized to the nearest configured width for ``?w=`` and sent as
+    WebP to clients that accept it; variants are rendered once and cached.
     """
     # Validate category
     if category not in ["profile", "gig", "general"]:
         raise HTTPException(status_code=400, detail="Invalid category")
     
     # Construct file path
-    if category == "profile":
+    content_addressed = file_store.blob_store.is_blob_name(filename)
+    if content_addressed:
+        file_path = file_store.blob_store.path_for(filename)
+    elif category == "profile":
         file_path = PROFILE_DIR / filename
     elif category == "gig":
         file_path = GIG_DIR / filename
     else:
         file_path = GENERAL_DIR / filename
+    content_key = Path(filename).stem if content_addressed else None
     
-    # Check if file exists
-    if not file_path.exists():
+    headers = {
+        # Content-addressed URLs never change meaning; others are revalidated hourly
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if content_addressed else MUTABLE_CACHE_CONTROL,
+        "Access-Control-Allow-Origin": "*"  # Allow CORS for images
+    }
+    if image_variants.source_extension(file_path):
+        headers["Vary"] = "Accept"
+
+    variant = image_variants.negotiate(file_path, w, request.headers.get("accept", ""))
+    if variant:
+        width, extension = variant
+        etag = await file_etag(file_path, content_key, variant_path(file_path, width, extension).name)
+        if etag is None:
+            raise HTTPException(status_code=404, detail="File not found")
+        cached = not_modified(request, etag, headers)
+        if cached:
+            return cached
+        
+        media_type = VARIANT_FORMATS[extension][1]
+        variant_name = f"{Path(filename).stem}.{extension}"
+        rendered = variant_path(file_path, width, extension)
+        response = await file_response(rendered, etag, headers, media_type=media_type, filename=variant_name)
+        if response is None:
+            try:
+                await image_variants.ensure(file_path, width, extension)
+                response = await file_response(
+                    rendered, etag, headers, media_type=media_type, filename=variant_name
+                )
+            except Exception:
+                # Missing, or not decodable as an image: fall back to the original bytes
+                response = None
+        if response:
+            return response
+
+    etag = await file_etag(file_path, content_key)
+    if etag is None:
         raise HTTPException(status_code=404, detail="File not found")
+    cached = not_modified(request, etag, headers)
+    if cached:
+        return cached
     
-    # Serve file
-    return FileResponse(
-        path=str(file_path),
-        filename=filename,
-        headers={
-            "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
-            "Access-Control-Allow-Origin": "*"  # Allow CORS for images
-        }
-    )
+    # Serve file from the open-file cache; Range / If-Range requests get 206 partial content
+    response = await file_response(file_path, etag, headers, filename=filename)
+    if response is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return response
 
 
 @router.get("/list/{category}")
@@ -154,13 +197,19 @@ async def list_user_files(
     """List all files uploaded by current user in specific category"""
     from sqlmodel import select
     
-    stmt = select(UploadedFile).where(
+    stmt = select(
+        UploadedFile.id,
+        UploadedFile.filename,
+        UploadedFile.original_filename,
+        UploadedFile.file_size,
+        UploadedFile.uploaded_at
+    ).where(
         UploadedFile.uploaded_by == current_user.id,
         UploadedFile.upload_category == category,
         UploadedFile.is_active == True
     )
     result = await db.execute(stmt)
-    files = result.scalars().all()
+    files = result.all()
     
     return [
         {
@@ -194,20 +243,15 @@ async def delete_file(
     if not file_record:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Soft delete - mark as inactive
-    file_record.is_active = False
-    await db.commit()
-    
-    # Optionally, delete physical file
-    file_path = Path(file_record.file_path)
-    if file_path.exists():
-        file_path.unlink()
+    # Soft delete; the file goes with its last reference
+    await file_store.release_file(db, file_record)
     
     return {"message": "File deleted successfully"}
 
 
 @router.put("/profile-image")
 async def update_profile_image(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user_with_access_token),
     db: AsyncSession = Depends(get_db)
@@ -226,32 +270,22 @@ async def update_profile_image(
             detail=f"File type {file.content_type} not allowed. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}"
         )
     
-    # Check file size
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large. Max size: 5MB")
-    
     # Generate unique filename
     if not file.filename:
         raise HTTPException(status_code=400, detail="Filename is required")
     
-    file_extension = Path(file.filename).suffix.lower()
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
+    # Stream into the blob store; stops at MAX_FILE_SIZE without reading the rest,
+    # and content that is already stored is not written again
+    stored = await file_store.put_blob(db, file, MAX_FILE_SIZE)
+    stored_filename = stored.path.name
     
-    # Determine upload directory
-    upload_path = PROFILE_DIR / unique_filename
-    
-    # Save file
     try:
-        with open(upload_path, "wb") as buffer:
-            buffer.write(content)
-        
         # Save file metadata to database
         uploaded_file = UploadedFile(
-            filename=unique_filename,
+            filename=stored_filename,
             original_filename=file.filename or "unknown",
-            file_path=str(upload_path),
-            file_size=len(content),
+            file_path=str(stored.path),
+            file_size=stored.size,
             content_type=file.content_type or "application/octet-stream",
             upload_category=category,
             uploaded_by=current_user.id
@@ -260,28 +294,28 @@ async def update_profile_image(
         db.add(uploaded_file)
         
         # Update user's profile_image_url
-        file_url = f"/api/files/serve/{category}/{unique_filename}"
+        file_url = f"/api/files/serve/{category}/{stored_filename}"
         current_user.profile_image_url = file_url
         
         await db.commit()
-        await db.refresh(current_user)
-        await db.refresh(uploaded_file)
+        invalidate_user_caches(current_user.id)
+        background_tasks.add_task(image_variants.pregenerate, stored.path)
         
         return {
             "message": "Profile image updated successfully",
             "profile_image_url": current_user.profile_image_url,
             "file_details": {
                 "file_id": uploaded_file.id,
-                "filename": unique_filename,
+                "filename": stored_filename,
                 "original_filename": file.filename or "unknown",
                 "file_url": file_url,
-                "file_size": len(content),
+                "file_size": stored.size,
+                "sha256": stored.sha256,
                 "category": category
             }
         }
         
     except Exception as e:
-        # Clean up file if database save fails
-        if upload_path.exists():
-            upload_path.unlink()
+        # Removes the blob unless another row already shares it
+        await file_store.discard_blob(db, stored.path)
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
\ No newline at end of file
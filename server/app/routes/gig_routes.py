@@ -10,7 +10,7 @@ from fastapi import status as http_status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.gig_crud import GigCRUD
-from app.database.session import get_db
+from app.database.session import get_db, get_read_db
 from app.models import User, GigStatus
 from app.schemas.gig_schema import (
     GigCreateSchema, 
@@ -27,7 +27,11 @@ router = APIRouter(prefix="/gigs", tags=["gigs"])
 
 
 def gig_to_response(gig, distance_km: Optional[float] = None) -> GigResponseSchema:
-    """Convert Gig model to response schema"""
+    """Convert Gig model or a projected search row to response schema"""
+    distance = getattr(gig, "distance", None)
+    if distance_km is None and distance is not None:
+        distance_km = round(distance / 1000, 3)
+
     return GigResponseSchema(
         id=gig.id,
         title=gig.title,
@@ -43,8 +47,8 @@ def gig_to_response(gig, distance_km: Optional[float] = None) -> GigResponseSche
         completed_at=gig.completed_at,
         seeker_id=gig.seeker_id,
         helper_id=gig.helper_id,
-        latitude=None,
-        longitude=None,
+        latitude=getattr(gig, "latitude", None),
+        longitude=getattr(gig, "longitude", None),
         distance_km=distance_km
     )
 
@@ -80,11 +84,13 @@ async def search_gigs(
     status: GigStatus = Query(GigStatus.PENDING, description="Gig status filter"),
     limit: int = Query(20, ge=1, le=100, description="Maximum results"),
     offset: int = Query(0, ge=0, description="Results offset"),
-    session: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    session: AsyncSession = Depends(get_read_db)
 ):
     """
     Search gigs with optional geospatial and other filters.
     If latitude/longitude provided, results are ordered by distance.
+    Follow next_cursor for further pages; total_count is only sent on the first.
     """
     search_params = GigSearchSchema(
         latitude=latitude,
@@ -95,33 +101,37 @@ async def search_gigs(
         max_duration=max_duration,
         status=status,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
     
     try:
-        gigs, total_count = await GigCRUD.search_gigs(session, search_params)
-        
-        gig_responses = [gig_to_response(gig) for gig in gigs]
-        
-        return GigListResponseSchema(
-            gigs=gig_responses,
-            total_count=total_count,
-            limit=limit,
-            offset=offset,
-            has_more=offset + len(gigs) < total_count
-        )
-    except Exception as e:
+        search_params.cursor_key()
+    except ValueError:
         raise HTTPException(
             status_code=http_status.HTTP_400_BAD_REQUEST,
-            detail=f"Search failed: {str(e)}"
+            detail="Invalid cursor"
         )
 
+    gigs, total_count, next_cursor = await GigCRUD.search_gigs(session, search_params)
+    gig_responses = [gig_to_response(gig) for gig in gigs]
+    
+    return GigListResponseSchema(
+        gigs=gig_responses,
+        total_count=total_count,
+        limit=limit,
+        offset=offset,
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor
+    )
+
 
 @router.get("/", response_model=GigListResponseSchema)
 async def list_gigs(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    session: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    session: AsyncSession = Depends(get_read_db)
 ):
     """
     List all pending gigs (no geospatial filtering).
@@ -136,10 +146,19 @@ async def list_gigs(
         max_duration=None,
         status=GigStatus.PENDING,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
     
-    gigs, total_count = await GigCRUD.search_gigs(session, search_params)
+    try:
+        search_params.cursor_key()
+    except ValueError:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    gigs, total_count, next_cursor = await GigCRUD.search_gigs(session, search_params)
     gig_responses = [gig_to_response(gig) for gig in gigs]
     
     return GigListResponseSchema(
@@ -147,7 +166,8 @@ async def list_gigs(
         total_count=total_count,
         limit=limit,
         offset=offset,
-        has_more=offset + len(gigs) < total_count
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor
     )
 
 
@@ -157,7 +177,7 @@ async def get_my_gigs(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user_with_access_token),
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """
     Get current user's gigs.
@@ -182,7 +202,7 @@ async def get_my_gigs(
 @router.get("/{gig_id}", response_model=GigResponseSchema)
 async def get_gig(
     gig_id: UUID,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Get specific gig by ID"""
     gig = await GigCRUD.get_gig_by_id(session, gig_id)
@@ -247,12 +267,14 @@ async def accept_gig(
     Accept a gig as a helper.
     Changes status from PENDING to ACCEPTED and assigns the current user as helper.
     """
-    gig = await GigCRUD.accept_gig(session, gig_id, current_user.id)
+    gig, current_status = await GigCRUD.accept_gig(session, gig_id, current_user.id)
     
     if not gig:
+        if current_status is None:
+            raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Gig not found")
         raise HTTPException(
-            status_code=http_status.HTTP_400_BAD_REQUEST,
-            detail="Gig not found, already assigned, or not in pending status"
+            status_code=http_status.HTTP_409_CONFLICT,
+            detail="Gig is already assigned or no longer pending"
         )
     
     return gig_to_response(gig)
@@ -269,14 +291,25 @@ async def update_gig_status(
     Update gig status.
     Only seeker or assigned helper can update status.
     """
-    gig = await GigCRUD.update_gig_status(
+    if status_data.status == GigStatus.ACCEPTED:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="Gigs are accepted through the accept endpoint"
+        )
+    
+    gig, current_status = await GigCRUD.update_gig_status(
         session, gig_id, status_data.status, current_user.id
     )
     
     if not gig:
+        if current_status is None:
+            raise HTTPException(
+                status_code=http_status.HTTP_404_NOT_FOUND,
+                detail="Gig not found or you don't have permission to update its status"
+            )
         raise HTTPException(
-            status_code=http_status.HTTP_404_NOT_FOUND,
-            detail="Gig not found or you don't have permission to update its status"
+            status_code=http_status.HTTP_409_CONFLICT,
+            detail=f"Gig cannot move from {current_status.value} to {status_data.status.value}"
         )
     
     return gig_to_response(gig)
\ No newline at end of file
@@ -7,7 +7,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.session import get_db
+from app.database.session import get_db, get_read_db
 from app.security import get_current_user_with_access_token as get_current_user
 from app.models import User, Review, Gig
 from app.schemas.review_schema import (
@@ -81,7 +81,7 @@ async def get_user_reviews(
     user_id: UUID,
     skip: int = Query(0, ge=0, description="Number of reviews to skip"),
     limit: int = Query(10, ge=1, le=50, description="Number of reviews to return"),
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user reviews (paginated) with summary statistics"""
@@ -98,15 +98,11 @@ async def get_user_reviews(
     # Convert reviews to response format
     review_responses = []
     for review in reviews:
-        # Get reviewer and gig info
-        reviewer = await UserCRUD.get_user_by_id(session, review.reviewer_id)
-        gig = await GigCRUD.get_gig_by_id(session, review.gig_id)
-        
         review_responses.append(review_to_response(
             review,
-            reviewer_name=reviewer.full_name if reviewer else None,
-            reviewee_name=user.full_name,
-            gig_title=gig.title if gig else None
+            reviewer_name=review.reviewer_name,
+            reviewee_name=review.reviewee_name,
+            gig_title=review.gig_title
         ))
     
     return UserReviewSummarySchema(
@@ -122,7 +118,7 @@ async def get_user_reviews(
 @router.get("/gig/{gig_id}", response_model=GigReviewsSchema)
 async def get_gig_reviews(
     gig_id: UUID,
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all reviews for a specific gig"""
@@ -138,14 +134,11 @@ async def get_gig_reviews(
     # Convert to response format
     review_responses = []
     for review in reviews:
-        reviewer = await UserCRUD.get_user_by_id(session, review.reviewer_id)
-        reviewee = await UserCRUD.get_user_by_id(session, review.reviewee_id)
-        
         review_responses.append(review_to_response(
             review,
-            reviewer_name=reviewer.full_name if reviewer else None,
-            reviewee_name=reviewee.full_name if reviewee else None,
-            gig_title=gig.title
+            reviewer_name=review.reviewer_name,
+            reviewee_name=review.reviewee_name,
+            gig_title=review.gig_title
         ))
     
     return GigReviewsSchema(
@@ -209,7 +202,7 @@ async def delete_review(
 async def get_my_reviews(
     skip: int = Query(0, ge=0, description="Number of reviews to skip"),
     limit: int = Query(20, ge=1, le=50, description="Number of reviews to return"),
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get reviews written by the current user"""
@@ -221,14 +214,11 @@ async def get_my_reviews(
     # Convert to response format
     review_responses = []
     for review in reviews:
-        reviewee = await UserCRUD.get_user_by_id(session, review.reviewee_id)
-        gig = await GigCRUD.get_gig_by_id(session, review.gig_id)
-        
         review_responses.append(review_to_response(
             review,
-            reviewer_name=current_user.full_name,
-            reviewee_name=reviewee.full_name if reviewee else None,
-            gig_title=gig.title if gig else None
+            reviewer_name=review.reviewer_name,
+            reviewee_name=review.reviewee_name,
+            gig_title=review.gig_title
         ))
     
     return review_responses
@@ -238,7 +228,7 @@ async def get_my_reviews(
 async def can_review_user(
     gig_id: UUID,
     reviewee_id: UUID,
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Check if current user can review another user for a specific gig"""
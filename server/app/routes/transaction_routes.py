@@ -7,7 +7,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.session import get_db
+from app.database.session import get_db, get_read_db
 from app.security import get_current_user_with_access_token as get_current_user
 from app.models import User, Transaction, TransactionStatus, Gig
 from app.schemas.transaction_schema import (
@@ -156,7 +156,7 @@ async def cancel_transaction(
 @router.get("/{transaction_id}", response_model=TransactionResponseSchema)
 async def get_transaction(
     transaction_id: UUID,
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get transaction details by ID"""
@@ -189,7 +189,7 @@ async def get_transaction(
 @router.get("/gig/{gig_id}", response_model=TransactionResponseSchema)
 async def get_gig_transaction(
     gig_id: UUID,
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get transaction for a specific gig"""
@@ -224,7 +224,7 @@ async def get_my_transaction_history(
     skip: int = Query(0, ge=0, description="Number of transactions to skip"),
     limit: int = Query(20, ge=1, le=50, description="Number of transactions to return"),
     status: Optional[TransactionStatus] = Query(None, description="Filter by transaction status"),
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's transaction history"""
@@ -239,16 +239,11 @@ async def get_my_transaction_history(
     total_received = 0.0
     
     for transaction in transactions:
-        # Get additional data
-        gig = await GigCRUD.get_gig_by_id(session, transaction.gig_id)
-        payer = await UserCRUD.get_user_by_id(session, transaction.payer_id)
-        payee = await UserCRUD.get_user_by_id(session, transaction.payee_id)
-        
         transaction_responses.append(transaction_to_response(
             transaction,
-            gig_title=gig.title if gig else None,
-            payer_name=payer.full_name if payer else None,
-            payee_name=payee.full_name if payee else None
+            gig_title=transaction.gig_title,
+            payer_name=transaction.payer_name,
+            payee_name=transaction.payee_name
         ))
         
         # Calculate totals for completed transactions
@@ -268,7 +263,7 @@ async def get_my_transaction_history(
 
 @router.get("/summary/my", response_model=PaymentSummarySchema)
 async def get_my_payment_summary(
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's payment summary statistics"""
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.websocket_manager import manager
 from app.database.session import get_db
 from app.models import User, ChatRoom, Gig, GigStatus
+from app.schemas.chat_schema import IMAGE_URL_MAX_LENGTH, MESSAGE_MAX_LENGTH
 from app.security import decode_access_token
 
 router = APIRouter()
@@ -17,12 +18,9 @@ router = APIRouter()
 async def get_user_from_token(token: str, db: AsyncSession) -> User:
     """Authenticate user from JWT token for WebSocket"""
     try:
-        payload = decode_access_token(token)
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        claims = decode_access_token(token)
         
-        user = await db.get(User, UUID(user_id))
+        user = await db.get(User, UUID(claims.user_id))
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         
@@ -70,14 +68,31 @@ async def websocket_endpoint(
                     content = message_data.get("content", "")
                     image_url = message_data.get("image_url")
                     
-                    if content.strip() or image_url:
+                    if len(content) > MESSAGE_MAX_LENGTH or len(image_url or "") > IMAGE_URL_MAX_LENGTH:
+                        await manager.send_personal_message(websocket, {
+                            "type": "error",
+                            "client_id": message_data.get("client_id"),
+                            "message": f"Message content cannot exceed {MESSAGE_MAX_LENGTH} characters"
+                        })
+                    elif content.strip() or image_url:
                         # Save and broadcast message
-                        await manager.save_and_broadcast_message(
-                            room_id=room_id,
-                            sender_id=user.id,
-                            content=content,
-                            image_url=image_url
-                        )
+                        try:
+                            await manager.save_and_broadcast_message(
+                                room_id=room_id,
+                                sender_id=user.id,
+                                content=content,
+                                image_url=image_url,
+                                sender_name=user.full_name,
+                                sender_websocket=websocket,
+                                client_id=message_data.get("client_id")
+                            )
+                        except ValueError as e:
+                            # Rejected by the broker (too large); nothing was saved
+                            await manager.send_personal_message(websocket, {
+                                "type": "error",
+                                "client_id": message_data.get("client_id"),
+                                "message": str(e)
+                            })
                 
                 elif message_type == "typing":
                     # Broadcast typing indicator
@@ -8,6 +8,10 @@ from datetime import datetime
 from uuid import UUID
 from app.models import MessageType
 
+MESSAGE_MAX_LENGTH = 1000
+# Uploaded image URLs are short; the cap keeps chat events within the broker's payload limit
+IMAGE_URL_MAX_LENGTH = 512
+
 
 # Base schemas
 class MessageBase(SQLModel):
@@ -20,8 +24,8 @@ class MessageBase(SQLModel):
     def validate_content(cls, v: str) -> str:
         if not v or len(v.strip()) == 0:
             raise ValueError("Message content cannot be empty")
-        if len(v) > 1000:
-            raise ValueError("Message content cannot exceed 1000 characters")
+        if len(v) > MESSAGE_MAX_LENGTH:
+            raise ValueError(f"Message content cannot exceed {MESSAGE_MAX_LENGTH} characters")
         return v.strip()
 
 
@@ -78,13 +82,19 @@ class ChatRoomDetailOut(ChatRoomOut):
 
 
 class MessageHistoryOut(SQLModel):
-    """Paginated message history response"""
+    """Paginated message history response
+
+    Page-number requests fill total_count/page. Cursor requests leave them empty;
+    next_before continues towards older messages and next_after fetches newer ones.
+    """
     messages: List[MessageOut]
-    total_count: int
-    page: int
+    total_count: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
     has_next: bool
     has_prev: bool
+    next_before: Optional[str] = None
+    next_after: Optional[str] = None
 
 
 # Chat room summary for listing user's chats
@@ -3,13 +3,14 @@ Pydantic schemas for Gig-related operations.
 These schemas define the structure for API requests and responses.
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict
 from geoalchemy2 import Geometry
 
 from app.models import GigStatus
+from app.utils.pagination import decode_cursor
 
 
 class GigLocationSchema(BaseModel):
@@ -85,12 +86,27 @@ class GigSearchSchema(BaseModel):
     status: Optional[GigStatus] = Field(GigStatus.PENDING, description="Gig status filter")
     limit: int = Field(20, ge=1, le=100, description="Maximum number of results")
     offset: int = Field(0, ge=0, description="Results offset for pagination")
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page; overrides offset")
+
+    @property
+    def is_nearby(self) -> bool:
+        """Ordered by distance around a point rather than newest first"""
+        return bool(self.latitude and self.longitude)
+
+    def cursor_key(self) -> Optional[Tuple[Any, str]]:
+        """(distance, id) or (created_at, id) from cursor; ValueError if malformed"""
+        if not self.cursor:
+            return None
+        sort_type = (float, int) if self.is_nearby else datetime
+        sort_value, gig_id = decode_cursor(self.cursor, sort_type, (str, UUID))
+        return sort_value, str(gig_id)
 
 
 class GigListResponseSchema(BaseModel):
     """Schema for paginated gig list response"""
     gigs: List[GigResponseSchema]
-    total_count: int
+    total_count: Optional[int] = Field(None, description="Only on the first page of a cursor search")
     limit: int
     offset: int
-    has_more: bool
\ No newline at end of file
+    has_more: bool
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page")
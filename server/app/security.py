@@ -1,22 +1,34 @@
 # security.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+from pydantic import BaseModel
 
 from app.database.session import get_db
 from app.models import User
+from app.modules.users.user_cache import get_principal
 from app.modules.users.user_crud import get_user_by_id
 from app.configs.app_config import app_config
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=app_config.BCRYPT_ROUNDS
+)
 
 refresh_token_scheme = OAuth2PasswordBearer(tokenUrl="/auth/refresh")
 access_token_scheme = OAuth2PasswordBearer(tokenUrl="/auth/access")
 
 
+class TokenClaims(BaseModel):
+    user_id: str
+    issued_at: Optional[int] = None
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -25,12 +37,79 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
     return pwd_context.verify(plain_password, password_hash)
 
 
+class PasswordHashPool:
+    """Bounded thread pool for bcrypt so hashing never blocks the event loop.
+
+    bcrypt releases the GIL, so threads give real parallelism. Work beyond
+    max_workers waits in the executor queue; beyond max_queue more it is
+    rejected with 503 instead of piling up behind a login burst.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, fn: Callable, *args):
+        if self.in_flight >= self.max_workers + self.max_queue:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=app_config.PASSWORD_HASH_WORKERS,
+    max_queue=app_config.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run(pwd_context.hash, password)
+
+
+async def verify_password_async(
+    plain_password: str, password_hash: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a new hash when the stored one is outdated"""
+    return await password_hash_pool.run(
+        pwd_context.verify_and_update, plain_password, password_hash
+    )
+
+
+# Hashed at import so no login request pays for it
+_DUMMY_PASSWORD_HASH = pwd_context.hash("hourz-dummy-password")
+
+
+async def verify_dummy_password(plain_password: str) -> None:
+    """Spend the same bcrypt time as a real check, so unknown identifiers don't leak via timing"""
+    await password_hash_pool.run(pwd_context.verify, plain_password, _DUMMY_PASSWORD_HASH)
+
+
 def create_refresh_token(
     data: dict, expires_delta: timedelta = timedelta(days=app_config.REFRESH_TOKEN_EXPIRE)
 ) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    to_encode.update({"exp": now + expires_delta, "iat": now})
     return jwt.encode(to_encode, app_config.REFRESH_SECRET_KEY, algorithm=app_config.ALGORITHM)
 
 
@@ -39,8 +118,8 @@ def create_access_token(
     expires_delta: timedelta = timedelta(minutes=app_config.ACCESS_TOKEN_EXPIRE),
 ) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    to_encode.update({"exp": now + expires_delta, "iat": now})
     return jwt.encode(to_encode, app_config.ACCESS_SECRET_KEY, algorithm=app_config.ALGORITHM)
 
 
@@ -72,9 +151,7 @@ async def get_current_user_with_refresh_token(
     return user
 
 
-async def get_current_user_with_access_token(
-    access_token: str = Depends(access_token_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
+def decode_access_token(access_token: str) -> TokenClaims:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -91,8 +168,32 @@ async def get_current_user_with_access_token(
     except (JWTError, ValueError):
         raise credentials_exception
 
-    user = await get_user_by_id(db, user_id)
+    return TokenClaims(user_id=user_id, issued_at=payload.get("iat"))
+
+
+async def get_current_user_claims(
+    access_token: str = Depends(access_token_scheme),
+) -> TokenClaims:
+    """Verified token claims only, for endpoints that just need the caller's id.
+
+    Skips the user lookup entirely, so a deleted user keeps access until the
+    access token expires.
+    """
+    return decode_access_token(access_token)
+
+
+async def get_current_user_with_access_token(
+    access_token: str = Depends(access_token_scheme), db: AsyncSession = Depends(get_db)
+) -> User:
+    claims = decode_access_token(access_token)
+
+    # Cached per (user id, iat) for a few seconds; profile updates invalidate it
+    user = await get_principal(db, claims.user_id, claims.issued_at, get_user_by_id)
 
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
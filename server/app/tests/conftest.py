@@ -37,7 +37,7 @@ TestingSessionLocal = async_sessionmaker(bind=engine_test, class_=AsyncSession,
 # Now import the app and the production get_db so we can override it.
 from app.database import session as prod_session
 from app.main import app
-from app.database.session import get_db
+from app.database.session import get_db, get_read_db
 
 
 # Patch the application's DB session objects to use the test engine/sessionmaker
@@ -76,6 +76,7 @@ async def override_get_db():
 
 # Apply dependency override so routes use the test DB
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 
 @pytest_asyncio.fixture
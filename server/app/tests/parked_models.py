@@ -0,0 +1,145 @@
+"""
+Test stand-ins for the models parked (commented out) in app/models.py
+
+The chat, gig, review, transaction and upload code imports these models at
+module scope, so its unit tests can't even be imported while they are
+parked. install() puts copies of the parked definitions on app.models,
+without relationships and on their own metadata so no table is ever
+created from them. Models that exist for real are left alone, so once the
+definitions are un-parked the tests run against them unchanged.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+from geoalchemy2 import Geometry
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import DeclarativeBase
+
+from app import models
+from app.models import GigStatus, MessageType, TransactionStatus, User
+
+
+class ParkedBase(DeclarativeBase):
+    pass
+
+
+class Gig(ParkedBase):
+    __tablename__ = "gig"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    title = Column(String, index=True, nullable=False)
+    description = Column(String, nullable=False)
+    duration_hours = Column(Integer, nullable=False)
+    budget = Column(Float, index=True, nullable=False)
+    location = Column(Geometry("POINT", srid=4326), nullable=False)
+    address_text = Column(String, nullable=False)
+    status = Column(String, default=GigStatus.PENDING.value, index=True)
+    image_urls = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    starts_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    seeker_id = Column(String, ForeignKey(User.id), index=True, nullable=False)
+    helper_id = Column(String, ForeignKey(User.id), index=True, nullable=True)
+
+    __table_args__ = (
+        Index("ix_gig_location_geography", func.geography(location), postgresql_using="gist"),
+    )
+
+
+class ChatRoom(ParkedBase):
+    __tablename__ = "chatroom"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    is_active = Column(Boolean, default=True)
+    gig_id = Column(String, ForeignKey("gig.id"), unique=True, index=True)
+
+
+class ChatParticipant(ParkedBase):
+    __tablename__ = "chatparticipant"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    joined_at = Column(DateTime, default=datetime.utcnow)
+    last_read_at = Column(DateTime, nullable=True)
+    unread_count = Column(Integer, default=0, nullable=False)
+    chat_room_id = Column(String, ForeignKey("chatroom.id"), index=True)
+    user_id = Column(String, ForeignKey(User.id), index=True)
+
+
+class Message(ParkedBase):
+    __tablename__ = "message"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    content = Column(String, nullable=False)
+    message_type = Column(String, default=MessageType.TEXT.value)
+    image_url = Column(String, nullable=True)
+    is_read = Column(Boolean, default=False, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    chat_room_id = Column(String, ForeignKey("chatroom.id"), index=True)
+    sender_id = Column(String, ForeignKey(User.id), index=True)
+
+    __table_args__ = (
+        Index("ix_message_chat_room_id_timestamp_id", "chat_room_id", "timestamp", "id"),
+    )
+
+
+class BuddyList(ParkedBase):
+    __tablename__ = "buddylist"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    notes = Column(String, nullable=True)
+    user_id = Column(String, ForeignKey(User.id), index=True)
+    buddy_id = Column(String, ForeignKey(User.id), index=True)
+
+
+class Review(ParkedBase):
+    __tablename__ = "review"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    rating = Column(Integer, nullable=False)
+    comment = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    gig_id = Column(String, ForeignKey("gig.id"), index=True)
+    reviewer_id = Column(String, ForeignKey(User.id))
+    reviewee_id = Column(String, ForeignKey(User.id))
+
+
+class Transaction(ParkedBase):
+    __tablename__ = "transaction"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    amount = Column(Float, nullable=False)
+    service_fee = Column(Float, nullable=False)
+    net_amount = Column(Float, nullable=False)
+    currency = Column(String, default="THB")
+    status = Column(String, default=TransactionStatus.PENDING.value, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    payment_method = Column(String, nullable=True)
+    transaction_ref = Column(String, nullable=True)
+    gig_id = Column(String, ForeignKey("gig.id"), unique=True, index=True)
+    payer_id = Column(String, ForeignKey(User.id), index=True)
+    payee_id = Column(String, ForeignKey(User.id), index=True)
+
+
+class UploadedFile(ParkedBase):
+    __tablename__ = "uploadedfile"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    filename = Column(String, index=True, nullable=False)
+    original_filename = Column(String, nullable=False)
+    file_path = Column(String, nullable=False, index=True)
+    file_size = Column(Integer, nullable=False)
+    content_type = Column(String, nullable=False)
+    upload_category = Column(String, index=True, nullable=False)
+    uploaded_at = Column(DateTime, default=datetime.utcnow, index=True)
+    is_active = Column(Boolean, default=True, index=True)
+    uploaded_by = Column(String, ForeignKey(User.id), index=True)
+
+
+PARKED_MODELS = (Gig, ChatRoom, ChatParticipant, Message, BuddyList, Review, Transaction, UploadedFile)
+
+
+def install() -> None:
+    """Expose each parked model on app.models unless it is defined there for real"""
+    for model in PARKED_MODELS:
+        if not hasattr(models, model.__name__):
+            setattr(models, model.__name__, model)
+
+
+install()
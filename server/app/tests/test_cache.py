@@ -0,0 +1,120 @@
+"""
+Test the async LRU/TTL cache used for profile lookups
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+from app.utils.cache import AsyncLRUCache
+
+
+class TestAsyncLRUCache:
+    """Test AsyncLRUCache behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        cache = AsyncLRUCache(max_size=10, ttl=60)
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "alice"
+
+        results = await asyncio.gather(*(cache.get_or_load("u1", load) for _ in range(5)))
+
+        assert results == ["alice"] * 5
+        assert len(calls) == 1
+        assert cache.get("u1") == "alice"
+
+    @pytest.mark.asyncio
+    async def test_batch_load_only_fetches_missing_keys(self):
+        cache = AsyncLRUCache(max_size=10, ttl=60)
+        cache.set("u1", "alice")
+        requested = []
+
+        async def load(keys):
+            requested.append(keys)
+            return {key: key.upper() for key in keys if key != "ghost"}
+
+        found = await cache.get_many_or_load(["u1", "u2", "u2", "ghost"], load)
+
+        assert requested == [["u2", "ghost"]]
+        assert found == {"u1": "alice", "u2": "U2"}
+        # Missing rows are not cached
+        assert cache.get("ghost") is None
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_size_bounds(self):
+        cache = AsyncLRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        # "b" was least recently used
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+        expiring = AsyncLRUCache(max_size=2, ttl=0)
+        expiring.set("a", 1)
+        await asyncio.sleep(0.001)
+        assert expiring.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_load_skips_caching(self):
+        cache = AsyncLRUCache(max_size=10, ttl=60)
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def load():
+            started.set()
+            await release.wait()
+            return "old name"
+
+        task = asyncio.create_task(cache.get_or_load("u1", load))
+        await started.wait()
+        cache.invalidate("u1")
+        release.set()
+
+        assert await task == "old name"
+        assert cache.get("u1") is None
+
+
+class FakeReputationSession:
+    """Answers the average-rating query and accepts the UPDATE"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return SimpleNamespace(scalar=lambda: 4.5)
+
+    async def commit(self):
+        pass
+
+
+class TestUserCacheInvalidation:
+    """Test writes that change cached user fields drop the cached copies"""
+
+    @pytest.mark.asyncio
+    async def test_reputation_update_drops_cached_principals(self):
+        # Parked models must be on app.models before the review code is imported
+        from app.tests import parked_models  # noqa: F401
+        from app.crud.review_crud import ReviewCRUD
+        from app.modules.users.user_cache import principal_cache, user_summary_cache
+
+        principal_cache.set(("user-1", 1700000000), object())
+        user_summary_cache.set("user-1", object())
+
+        await ReviewCRUD._update_user_reputation(FakeReputationSession(), "user-1")
+
+        assert principal_cache.get(("user-1", 1700000000)) is None
+        assert user_summary_cache.get("user-1") is None
+
+    def test_summary_holds_no_volatile_fields(self):
+        from app.modules.users.user_cache import UserProfileSummary
+
+        fields = set(UserProfileSummary.__dataclass_fields__)
+        assert not fields & {"is_available", "reputation_score"}
@@ -0,0 +1,40 @@
+"""
+Test the set-based chat inbox queries
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+# Parked models must be on app.models before the chat code is imported
+from app.tests import parked_models  # noqa: F401
+from app.crud.chat_crud_async import ChatCRUD
+
+
+class FakeResult:
+    def all(self):
+        return []
+
+
+class FakeSession:
+    """Records compiled statements; every query comes back empty"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return FakeResult()
+
+
+class TestRoomSummaries:
+    """Test ChatCRUD._get_room_summaries"""
+
+    @pytest.mark.asyncio
+    async def test_page_is_one_query_with_names_built_in_sql(self):
+        session = FakeSession()
+
+        assert await ChatCRUD._get_room_summaries(session, "user-1", limit=20) == []
+
+        assert len(session.statements) == 1
+        statement = session.statements[0]
+        assert "LATERAL" in statement
+        assert "concat_ws" in statement
@@ -0,0 +1,115 @@
+"""
+Test keyset message history paging flags
+"""
+import pytest
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Parked models must be on app.models before the chat code is imported
+from app.tests import parked_models  # noqa: F401
+from app.crud.chat_crud_async import ChatCRUD
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def all(self):
+        return list(self.rows)
+
+
+class FakeSession:
+    """Answers queries in order: participant, page, then the older-message probe"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0))
+
+
+def message_row(minutes_ago):
+    message = SimpleNamespace(
+        id=f"m-{minutes_ago}",
+        content="hi",
+        message_type="text",
+        image_url=None,
+        timestamp=datetime(2025, 1, 1, 12, 0) - timedelta(minutes=minutes_ago),
+        is_read=False,
+        sender_id="u-1",
+        chat_room_id="r-1",
+    )
+    return (message, "Somchai", None)
+
+
+class TestSinceLastRead:
+    """Test since_last_read reports older history like before mode"""
+
+    @pytest.mark.asyncio
+    async def test_older_messages_below_the_page(self):
+        participant = SimpleNamespace(last_read_at=datetime(2025, 1, 1, 11, 0))
+        session = FakeSession([participant], [message_row(5), message_row(1)], [("m-old",)])
+
+        messages, has_more, has_older = await ChatCRUD.get_chat_messages_keyset(
+            session, "r-1", "u-1", since_last_read=True
+        )
+
+        assert [message["id"] for message in messages] == ["m-1", "m-5"]
+        assert has_more is False
+        assert has_older is True
+        assert len(session.statements) == 3
+
+    @pytest.mark.asyncio
+    async def test_nothing_new_and_nothing_read(self):
+        participant = SimpleNamespace(last_read_at=None)
+        session = FakeSession([participant], [])
+
+        messages, _, has_older = await ChatCRUD.get_chat_messages_keyset(
+            session, "r-1", "u-1", since_last_read=True
+        )
+
+        assert messages == []
+        assert has_older is False
+
+
+class UpdateSession:
+    """Records UPDATE statements and reports one matched row"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(rowcount=1)
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def bangkok_host(monkeypatch):
+    """Local clock seven hours ahead of UTC"""
+    monkeypatch.setenv("TZ", "Asia/Bangkok")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+class TestReadMarker:
+    """Test the read marker is on the same clock as message timestamps"""
+
+    @pytest.mark.asyncio
+    async def test_last_read_at_is_utc(self, bangkok_host):
+        session = UpdateSession()
+
+        assert await ChatCRUD.mark_messages_as_read(session, "r-1", "u-1")
+
+        values = {column.key: bind.value for column, bind in session.statements[0]._values.items()}
+        assert abs(values["last_read_at"] - datetime.utcnow()) < timedelta(minutes=1)
@@ -0,0 +1,148 @@
+"""
+Test the geohash tile cache behind nearby gig search
+"""
+import pytest
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+# Parked models must be on app.models before the gig code is imported
+from app.tests import parked_models  # noqa: F401
+from app.crud.gig_tile_cache import GigTileCache
+from app.models import Gig, GigStatus
+from app.schemas.gig_schema import GigSearchSchema
+from app.utils.geo import distance_m
+from app.utils.pagination import encode_cursor
+
+GigRow = namedtuple("GigRow", "id budget duration_hours latitude longitude")
+
+CENTRE = (13.7563, 100.5018)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Returns a fixed candidate set and counts queries"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, statement, **kwargs):
+        self.queries += 1
+        return FakeResult(self.rows)
+
+
+def nearby_rows():
+    # Roughly 0.1 km, 1.1 km, 2.2 km and 30 km from the centre
+    return [
+        GigRow("g1", 100.0, 2, 13.7572, 100.5018),
+        GigRow("g2", 500.0, 4, 13.7663, 100.5018),
+        GigRow("g3", 50.0, 1, 13.7763, 100.5018),
+        GigRow("far", 50.0, 1, 14.0263, 100.5018),
+    ]
+
+
+def search(**params):
+    return GigSearchSchema(latitude=CENTRE[0], longitude=CENTRE[1], **params)
+
+
+class TestGigTileCache:
+    """Test GigTileCache behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_searches_in_a_cell_hit_the_database_once(self):
+        cache = GigTileCache()
+        session = FakeSession(nearby_rows())
+
+        first, total, _ = await cache.search(session, search(radius_km=5), [])
+        again, _, _ = await cache.search(session, search(radius_km=3, max_budget=200), [])
+
+        assert session.queries == 1
+        assert [gig.id for gig in first] == ["g1", "g2", "g3"]
+        assert total == 3
+        assert [gig.id for gig in again] == ["g1", "g3"]
+        assert first[0].distance < first[1].distance
+
+    @pytest.mark.asyncio
+    async def test_cursor_pages_follow_distance_order(self):
+        cache = GigTileCache()
+        session = FakeSession(nearby_rows())
+
+        page, total, cursor = await cache.search(session, search(radius_km=5, limit=2), [])
+        rest, rest_total, rest_cursor = await cache.search(
+            session, search(radius_km=5, limit=2, cursor=cursor), []
+        )
+
+        assert [gig.id for gig in page] == ["g1", "g2"]
+        assert total == 3
+        assert [gig.id for gig in rest] == ["g3"]
+        assert rest_total is None and rest_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_invalidation_by_gig_and_by_location(self):
+        cache = GigTileCache()
+        session = FakeSession(nearby_rows())
+        await cache.search(session, search(radius_km=5), [])
+
+        cache.invalidate("g2")
+        await cache.search(session, search(radius_km=5), [])
+        assert session.queries == 2
+
+        # A new gig far outside the tile leaves it alone, one nearby drops it
+        cache.invalidate("new-far", 18.79, 98.98)
+        await cache.search(session, search(radius_km=5), [])
+        assert session.queries == 2
+
+        cache.invalidate("new-near", 13.7600, 100.5000)
+        await cache.search(session, search(radius_km=5), [])
+        assert session.queries == 3
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_not_cacheable(self):
+        cache = GigTileCache(max_candidates=2)
+        session = FakeSession(nearby_rows())
+
+        assert await cache.search(session, search(radius_km=5), []) is None
+        assert await cache.search(session, search(status=GigStatus.ACCEPTED), []) is None
+
+    @pytest.mark.asyncio
+    async def test_dense_tile_is_remembered(self):
+        cache = GigTileCache(max_candidates=2)
+        session = FakeSession(nearby_rows())
+
+        assert await cache.search(session, search(radius_km=5), []) is None
+        assert await cache.search(session, search(radius_km=4), []) is None
+        assert session.queries == 1
+
+    @pytest.mark.asyncio
+    async def test_distances_use_the_sql_sort_key_precision(self):
+        cache = GigTileCache()
+        session = FakeSession(nearby_rows())
+
+        page, _, _ = await cache.search(session, search(radius_km=5), [])
+
+        assert all(gig.distance == round(gig.distance, 3) for gig in page)
+        sql = str(distance_m(Gig.location, *CENTRE).compile(dialect=postgresql.dialect()))
+        assert "round(" in sql and "ST_Distance(" in sql
+
+
+class TestSearchCursor:
+    """Test GigSearchSchema.cursor_key validation"""
+
+    def test_cursor_must_match_the_sort_order(self):
+        nearby_cursor = encode_cursor(125.5, "g1")
+        newest_cursor = encode_cursor(datetime(2025, 1, 1), "g1")
+
+        assert search(cursor=nearby_cursor).cursor_key() == (125.5, "g1")
+        assert GigSearchSchema(cursor=newest_cursor).cursor_key() == (datetime(2025, 1, 1), "g1")
+        for bad in (newest_cursor, encode_cursor(125.5), encode_cursor("far", "g1"), "garbage"):
+            with pytest.raises(ValueError):
+                search(cursor=bad).cursor_key()
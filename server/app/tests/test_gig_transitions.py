@@ -0,0 +1,167 @@
+"""
+Test the gig status transition table and its conditional UPDATE
+"""
+import pytest
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm.evaluator import _EvaluatorCompiler
+
+# Parked models must be on app.models before the gig code is imported
+from app.tests import parked_models  # noqa: F401
+from app.crud.gig_crud import GIG_TRANSITIONS, GigCRUD, allowed_sources
+from app.crud.transaction_crud import TransactionCRUD
+from app.models import Gig, GigStatus
+
+
+class FakeResult:
+    def __init__(self, row=None, scalar=None):
+        self.row = row
+        self.scalar = scalar
+
+    def scalar_one_or_none(self):
+        return self.scalar
+
+    def first(self):
+        return self.row
+
+
+class FakeSession:
+    """Records statements; every UPDATE matches no row, the locking SELECT returns locked"""
+
+    def __init__(self, locked=None):
+        self.statements = []
+        self.locked = locked
+
+    async def execute(self, statement, **kwargs):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return FakeResult(self.locked)
+
+
+class GigRowSession:
+    """Holds one gig in memory; each UPDATE applies only if its WHERE clause matches it.
+
+    The WHERE clause is evaluated the way the ORM's "evaluate" synchronisation
+    does, so the conditions under test are the ones sent to the database.
+    """
+
+    def __init__(self, **row):
+        self.gig = Gig(**row)
+
+    def _matches(self, statement) -> bool:
+        return _EvaluatorCompiler(Gig).process(statement.whereclause)(self.gig) is True
+
+    async def execute(self, statement, **kwargs):
+        matched = self._matches(statement)
+        if statement.is_dml:
+            if matched:
+                for column, value in statement._values.items():
+                    setattr(self.gig, column.key, value.value)
+            return FakeResult(scalar=self.gig if matched else None)
+        # The failure-path lock probe; report the row as not allowed
+        return FakeResult(SimpleNamespace(status=self.gig.status, allowed=False) if matched else None)
+
+    async def commit(self):
+        pass
+
+
+class TestGigTransitions:
+    """Test GigCRUD.transition"""
+
+    def test_table_covers_every_status(self):
+        assert set(GIG_TRANSITIONS) == set(GigStatus)
+        assert allowed_sources(GigStatus.ACCEPTED) == [GigStatus.PENDING]
+        assert set(allowed_sources(GigStatus.COMPLETED)) == {GigStatus.ACCEPTED, GigStatus.IN_PROGRESS}
+
+    @pytest.mark.asyncio
+    async def test_transition_is_one_conditional_update(self):
+        session = FakeSession()
+
+        gig, current_status = await GigCRUD.accept_gig(session, "gig-1", "helper-1")
+
+        assert (gig, current_status) == (None, None)
+        statement = session.statements[0]
+        assert statement.startswith("UPDATE gig SET")
+        assert "gig.status IN" in statement
+        assert "gig.helper_id IS NULL" in statement
+        assert "RETURNING" in statement
+
+    @pytest.mark.asyncio
+    async def test_failure_reason_comes_from_the_locked_row(self):
+        session = FakeSession(locked=SimpleNamespace(status=GigStatus.ACCEPTED, allowed=False))
+
+        gig, current_status = await GigCRUD.accept_gig(session, "gig-1", "helper-1")
+
+        assert gig is None and current_status == GigStatus.ACCEPTED
+        assert len(session.statements) == 2
+        assert session.statements[1].endswith("FOR UPDATE")
+
+    @pytest.mark.asyncio
+    async def test_missing_gig_is_reported_without_status(self):
+        session = FakeSession(locked=None)
+
+        result = await GigCRUD.update_gig_status(session, "gig-1", GigStatus.COMPLETED, "user-1")
+
+        assert result == (None, None)
+        assert "gig.seeker_id" in session.statements[1]
+
+    @pytest.mark.asyncio
+    async def test_status_endpoint_cannot_accept(self):
+        session = FakeSession()
+
+        assert await GigCRUD.update_gig_status(session, "gig-1", GigStatus.ACCEPTED, "user-1") == (None, None)
+        assert session.statements == []
+
+    @pytest.mark.asyncio
+    async def test_released_gig_can_be_accepted_again(self):
+        session = GigRowSession(
+            id="gig-1", seeker_id="seeker-1", helper_id="helper-1", status=GigStatus.ACCEPTED
+        )
+
+        released, _ = await GigCRUD.update_gig_status(session, "gig-1", GigStatus.PENDING, "seeker-1")
+        assert released.status == GigStatus.PENDING and released.helper_id is None
+
+        accepted, _ = await GigCRUD.accept_gig(session, "gig-1", "helper-2")
+        assert accepted.status == GigStatus.ACCEPTED and accepted.helper_id == "helper-2"
+
+
+class ReleaseSession(FakeSession):
+    """Transaction UPDATE matches; the gig has been cancelled meanwhile"""
+
+    def __init__(self):
+        super().__init__(locked=SimpleNamespace(status=GigStatus.CANCELLED, allowed=False))
+        self.rolled_back = False
+        self.committed = False
+
+    async def execute(self, statement, **kwargs):
+        result = await super().execute(statement, **kwargs)
+        if len(self.statements) == 1:
+            result.scalar_one_or_none = lambda: SimpleNamespace(gig_id="gig-1")
+        return result
+
+    async def rollback(self):
+        self.rolled_back = True
+
+    async def commit(self):
+        self.committed = True
+
+
+class TestReleasePayment:
+    """Test release_payment guards the gig in the same UPDATE"""
+
+    @pytest.mark.asyncio
+    async def test_gig_state_is_checked_in_the_update(self):
+        session = FakeSession()
+
+        assert await TransactionCRUD.release_payment(session, "txn-1", "user-1") is None
+        assert len(session.statements) == 1
+        statement = session.statements[0]
+        assert statement.startswith("UPDATE transaction SET")
+        assert "EXISTS (SELECT gig.id" in statement
+        assert "gig.status IN" in statement
+
+    @pytest.mark.asyncio
+    async def test_cancelled_gig_releases_nothing(self):
+        session = ReleaseSession()
+
+        assert await TransactionCRUD.release_payment(session, "txn-1", "user-1") is None
+        assert session.rolled_back and not session.committed
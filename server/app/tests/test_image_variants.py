@@ -0,0 +1,63 @@
+"""
+Test resized / WebP image variants
+"""
+import asyncio
+import pytest
+from PIL import Image
+
+from app.utils.image_variants import ImageVariantPool, variant_path
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (1000, 500), "orange").save(path, "JPEG")
+    return path
+
+
+@pytest.fixture
+def pool():
+    pool = ImageVariantPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+class TestImageVariantPool:
+    """Test ImageVariantPool negotiation and rendering"""
+
+    def test_negotiate_snaps_width_and_prefers_webp(self, pool, photo, tmp_path):
+        assert pool.negotiate(photo, 150, "image/avif,image/webp,*/*") == (160, "webp")
+        assert pool.negotiate(photo, 150, "image/jpeg") == (160, "jpg")
+        assert pool.negotiate(photo, 5000, "image/webp") == (None, "webp")
+        assert pool.negotiate(photo, None, "*/*") is None
+        assert pool.negotiate(tmp_path / "anim.gif", 150, "image/webp") is None
+
+    @pytest.mark.asyncio
+    async def test_renders_once_and_caches_to_disk(self, pool, photo):
+        paths = await asyncio.gather(*(pool.ensure(photo, 320, "webp") for _ in range(3)))
+
+        assert set(paths) == {variant_path(photo, 320, "webp")}
+        with Image.open(paths[0]) as variant:
+            assert variant.format == "WEBP"
+            assert variant.size == (320, 160)
+
+        modified = paths[0].stat().st_mtime_ns
+        await pool.ensure(photo, 320, "webp")
+        assert paths[0].stat().st_mtime_ns == modified
+
+        await pool.remove_all(photo)
+        assert not paths[0].exists()
+
+    @pytest.mark.asyncio
+    async def test_failed_render_is_remembered(self, pool, tmp_path):
+        bogus = tmp_path / "bogus.jpg"
+        bogus.write_bytes(b"not an image")
+
+        with pytest.raises(Exception):
+            await pool.ensure(bogus, 320, "webp")
+
+        # Negotiation now falls back to the original and nothing is resubmitted
+        assert pool.negotiate(bogus, 320, "image/webp") is None
+        pool._executor.shutdown()
+        with pytest.raises(ValueError):
+            await pool.ensure(bogus, 320, "webp")
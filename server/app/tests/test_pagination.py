@@ -0,0 +1,48 @@
+"""
+Tests for opaque keyset pagination cursors
+"""
+import pytest
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+class TestCursorEncoding:
+    """Test cursor round trips and validation"""
+
+    def test_roundtrip_timestamp_and_id(self):
+        """Cursor decodes back to the original sort key"""
+        timestamp = datetime(2025, 1, 31, 8, 15, 30, 123456)
+        message_id = uuid4()
+
+        cursor = encode_cursor(timestamp, message_id)
+
+        assert decode_cursor(cursor) == [timestamp, message_id]
+
+    def test_roundtrip_plain_values(self):
+        """Numbers and strings pass through unchanged"""
+        cursor = encode_cursor(1234.5, "abc")
+        assert decode_cursor(cursor) == [1234.5, "abc"]
+
+    def test_cursor_is_url_safe(self):
+        """Cursor can be used as a query parameter without escaping"""
+        cursor = encode_cursor(datetime.now(), uuid4())
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W3sidCI6ImR0In1d"])
+    def test_malformed_cursor_raises_value_error(self, cursor):
+        """Tampered cursors are rejected with ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    def test_shape_is_enforced(self):
+        """A well-formed cursor with the wrong arity or types is rejected"""
+        timestamp, message_id = datetime.now(), uuid4()
+        shape = (datetime, (str, UUID))
+
+        assert decode_cursor(encode_cursor(timestamp, message_id), *shape) == [timestamp, message_id]
+        assert decode_cursor(encode_cursor(timestamp, "m-1"), *shape) == [timestamp, "m-1"]
+        for values in [(timestamp,), (timestamp, message_id, 1), ("yesterday", message_id), (timestamp, 7)]:
+            with pytest.raises(ValueError):
+                decode_cursor(encode_cursor(*values), *shape)
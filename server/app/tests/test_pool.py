@@ -0,0 +1,54 @@
+"""
+Test connection pool instrumentation
+"""
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.pool import InstrumentedPool, PoolMetrics
+
+
+class TestPoolMetrics:
+    """Test PoolMetrics histogram"""
+
+    def test_histogram_is_cumulative(self):
+        metrics = PoolMetrics()
+        for wait_ms in (0.2, 3, 40, 9000):
+            metrics.observe(wait_ms)
+
+        histogram = metrics.as_dict()["wait_ms"]
+
+        assert histogram["le_1"] == 1
+        assert histogram["le_5"] == 2
+        assert histogram["le_50"] == 3
+        assert histogram["le_5000"] == 3
+        assert histogram["le_inf"] == 4
+
+
+class TestInstrumentedPool:
+    """Test InstrumentedPool checkout accounting"""
+
+    @pytest.mark.asyncio
+    async def test_counts_checkouts_and_timeouts(self):
+        engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            poolclass=InstrumentedPool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                assert engine.pool.status_dict()["checked_out"] == 1
+
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+
+            status = engine.pool.status_dict()
+            assert status["checked_out"] == 0
+            assert status["checkouts"] == 1
+            assert status["timeouts"] == 1
+        finally:
+            await engine.dispose()
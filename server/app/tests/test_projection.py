@@ -0,0 +1,66 @@
+"""
+Test schema-driven column projections
+"""
+import asyncio
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql
+
+# Parked models must be on app.models before the review code is imported
+from app.tests import parked_models  # noqa: F401
+from app.crud.review_crud import _review_rows
+from app.crud.transaction_crud import TransactionCRUD
+from app.models import Address
+from app.utils.projection import schema_columns
+
+
+class AddressCard(BaseModel):
+    province: str
+    id: str
+    distance_km: Optional[float] = None
+
+
+def test_schema_columns_follow_schema_fields():
+    columns = schema_columns(Address, AddressCard)
+
+    # Non-column fields are left for the caller to fill in
+    assert [column.key for column in columns] == ["province", "id"]
+
+
+def test_list_queries_join_names_instead_of_per_row_lookups():
+    statement = str(_review_rows().compile(dialect=postgresql.dialect()))
+
+    assert statement.count("LEFT OUTER JOIN") == 3
+    assert "reviewer.first_name, reviewer.last_name" in statement
+    assert "reviewee.first_name, reviewee.last_name" in statement
+    assert "gig.title AS gig_title" in statement
+
+
+class FakeResult:
+    def all(self):
+        return []
+
+    def scalar(self):
+        return 0
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return FakeResult()
+
+
+def test_transaction_history_joins_gig_and_party_names():
+    session = FakeSession()
+
+    asyncio.run(TransactionCRUD.get_user_transactions(session, "user-1"))
+
+    statement = session.statements[0]
+    assert statement.count("LEFT OUTER JOIN") == 3
+    assert "gig.title AS gig_title" in statement
+    assert "payer.first_name, payer.last_name" in statement
+    assert "payee.first_name, payee.last_name" in statement
@@ -0,0 +1,137 @@
+"""
+Test replica routing for read-only sessions
+"""
+import asyncio
+import time
+
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import column, create_engine, select, table, update
+from starlette.responses import Response
+
+from app.database import session as db_session
+from app.database.session import (
+    PRIMARY_BIND,
+    RESPONSE,
+    USE_REPLICA,
+    WROTE_AT_COOKIE,
+    WROTE_AT_HEADER,
+    ReplicaMonitor,
+    RoutingSession,
+)
+
+items = table("items", column("id"))
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    primary = create_engine("sqlite://")
+    replica = create_engine("sqlite://")
+    monkeypatch.setattr(db_session, "replica_engine", SimpleNamespace(sync_engine=replica))
+    return primary, replica
+
+
+class FakeMonitor:
+    def __init__(self, usable):
+        self.usable = usable
+
+    def is_usable(self):
+        return self.usable
+
+
+def request_from(cookies=None, headers=None):
+    return SimpleNamespace(headers=headers or {}, cookies=cookies or {})
+
+
+class TestRoutingSession:
+    """Test RoutingSession.get_bind"""
+
+    def test_selects_use_replica_until_the_session_writes(self, engines):
+        primary, replica = engines
+        session = RoutingSession(bind=primary)
+        session.info[USE_REPLICA] = True
+
+        assert session.get_bind(clause=select(items)) is replica
+        assert session.get_bind(clause=select(items), **PRIMARY_BIND) is primary
+
+        assert session.get_bind(clause=update(items).values(id=1)) is primary
+        assert session.get_bind(clause=select(items)) is primary
+
+    def test_plain_sessions_stay_on_primary(self, engines):
+        primary, _ = engines
+        session = RoutingSession(bind=primary)
+
+        assert session.get_bind(clause=select(items)) is primary
+
+
+class TestGetReadDb:
+    """Test get_read_db replica selection"""
+
+    @pytest.mark.asyncio
+    async def test_recent_writer_and_lagging_replica_read_primary(self, engines, monkeypatch):
+        monkeypatch.setattr(db_session, "replica_monitor", FakeMonitor(usable=True))
+        now = f"{time.time():.3f}"
+
+        async for session in db_session.get_read_db(request_from()):
+            assert session.info.get(USE_REPLICA) is True
+        async for session in db_session.get_read_db(request_from(cookies={WROTE_AT_COOKIE: now})):
+            assert USE_REPLICA not in session.info
+        async for session in db_session.get_read_db(request_from(headers={WROTE_AT_HEADER: now})):
+            assert USE_REPLICA not in session.info
+
+        expired = f"{time.time() - 60:.3f}"
+        async for session in db_session.get_read_db(request_from(cookies={WROTE_AT_COOKIE: expired})):
+            assert session.info.get(USE_REPLICA) is True
+
+        monkeypatch.setattr(db_session, "replica_monitor", FakeMonitor(usable=False))
+        async for session in db_session.get_read_db(request_from()):
+            assert USE_REPLICA not in session.info
+
+    def test_commit_after_a_write_marks_the_response(self, engines):
+        primary, _ = engines
+        session = RoutingSession(bind=primary)
+        response = Response()
+        session.info[RESPONSE] = response
+
+        session.get_bind(clause=update(items).values(id=1))
+        session.dispatch.after_commit(session)
+
+        assert WROTE_AT_COOKIE in response.headers["set-cookie"]
+        assert db_session.wrote_recently(
+            request_from(headers={WROTE_AT_HEADER: response.headers[WROTE_AT_HEADER]})
+        )
+
+
+class TestReplicaMonitor:
+    """Test lag probing stays off the request path"""
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_is_probed_in_background(self, engines):
+        monitor = ReplicaMonitor(max_lag=5, interval=0.05)
+        probes = []
+
+        async def hanging_probe():
+            probes.append(1)
+            await asyncio.sleep(10)
+
+        monitor._measure = hanging_probe
+        assert monitor.is_usable() is False
+
+        monitor.start()
+        await asyncio.sleep(0.12)
+        assert monitor.is_usable() is False
+        assert len(probes) >= 2
+        await monitor.stop()
+
+    @pytest.mark.asyncio
+    async def test_fresh_measurement_within_max_lag_is_usable(self, engines):
+        monitor = ReplicaMonitor(max_lag=5, interval=1)
+
+        async def probe():
+            return 0.5
+
+        monitor._measure = probe
+        await monitor.check()
+
+        assert monitor.is_usable() is True
+        assert monitor.as_dict()["usable"] is True
@@ -0,0 +1,65 @@
+"""
+Test UPDATE ... RETURNING write helper
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, Integer, String, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+
+from app.utils.returning import update_returning
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String, nullable=False)
+
+
+@pytest_asyncio.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(Job(id=1, status="pending"))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+class TestUpdateReturning:
+    """Test update_returning"""
+
+    @pytest.mark.asyncio
+    async def test_conditional_update_in_one_statement(self, session):
+        statements = []
+        event.listen(
+            session.bind.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        loaded = await session.get(Job, 1)
+        statements.clear()
+
+        job = await update_returning(
+            session, Job, [Job.id == 1, Job.status == "pending"], {"status": "accepted"}
+        )
+        await session.commit()
+
+        assert job is loaded
+        assert job.status == "accepted"
+        assert len(statements) == 1 and "RETURNING" in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_returns_none_when_condition_fails(self, session):
+        job = await update_returning(
+            session, Job, [Job.id == 1, Job.status == "accepted"], {"status": "completed"}
+        )
+
+        assert job is None
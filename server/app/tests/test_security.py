@@ -83,3 +83,81 @@ def test_get_current_user_with_access_token_coerces_uuid_and_loads_user():
     assert user.email == "t@example.com"
     # Ensure the key we passed to db.get was coerced to a UUID
     assert isinstance(captured['key'], UUID)
+
+
+def test_get_current_user_claims_skips_user_lookup():
+    token = security.create_access_token({"sub": "user-1"})
+
+    claims = asyncio.run(security.get_current_user_claims(access_token=token))
+
+    assert claims.user_id == "user-1"
+    assert isinstance(claims.issued_at, int)
+
+
+def test_get_current_user_claims_rejects_bad_token():
+    with pytest.raises(security.HTTPException) as exc:
+        asyncio.run(security.get_current_user_claims(access_token="not-a-token"))
+    assert exc.value.status_code == 401
+
+
+def test_profile_update_invalidates_cached_principals():
+    from app.modules.users.user_cache import invalidate_user_caches, principal_cache
+
+    principal_cache.set(("user-1", 100), object())
+    principal_cache.set(("user-1", 200), object())
+    principal_cache.set(("user-2", 100), object())
+
+    invalidate_user_caches("user-1")
+
+    assert principal_cache.get(("user-1", 100)) is None
+    assert principal_cache.get(("user-1", 200)) is None
+    assert principal_cache.get(("user-2", 100)) is not None
+    principal_cache.clear()
+
+
+def test_async_hash_and_verify_roundtrip():
+    async def roundtrip():
+        hashed = await security.get_password_hash_async("pw-async")
+        return await security.verify_password_async("pw-async", hashed)
+
+    is_valid, new_hash = asyncio.run(roundtrip())
+    assert is_valid is True
+    assert new_hash is None
+
+
+def test_verify_password_async_rehashes_outdated_cost():
+    weak_hash = security.pwd_context.hash("pw", rounds=4)
+
+    is_valid, new_hash = asyncio.run(security.verify_password_async("pw", weak_hash))
+
+    assert is_valid is True
+    assert new_hash is not None and new_hash != weak_hash
+    assert security.verify_password("pw", new_hash)
+
+
+def test_password_hash_pool_rejects_when_saturated():
+    pool = security.PasswordHashPool(max_workers=1, max_queue=0)
+
+    async def saturate():
+        busy = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(security.HTTPException) as exc:
+                await pool.run(time.sleep, 0)
+            return exc.value
+        finally:
+            await busy
+
+    exc = asyncio.run(saturate())
+    pool.shutdown()
+    assert exc.status_code == 503
+    assert exc.headers["Retry-After"] == "1"
+
+
+def test_dummy_verify_never_hashes(monkeypatch):
+    def no_hash(*args, **kwargs):
+        raise AssertionError("dummy check must not hash on the request path")
+
+    monkeypatch.setattr(security.pwd_context, "hash", no_hash)
+
+    asyncio.run(security.verify_dummy_password("whatever"))
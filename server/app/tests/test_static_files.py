@@ -0,0 +1,151 @@
+"""
+Test ETag, conditional GET, Range handling and the open-file cache for served files
+"""
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.utils.static_files import (
+    IMMUTABLE_CACHE_CONTROL,
+    OpenFileCache,
+    etag_matches,
+    file_etag,
+    file_response,
+    not_modified,
+)
+
+
+def make_client(path, content_key=None):
+    app = FastAPI()
+
+    @app.api_route("/file", methods=["GET", "HEAD"])
+    async def serve(request: Request):
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        etag = await file_etag(path, content_key)
+        return not_modified(request, etag, headers) or await file_response(path, etag, headers)
+
+    return TestClient(app)
+
+
+class TestStaticFiles:
+    """Test static file validators"""
+
+    def test_etag_matching(self):
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches('"a"', '"b"')
+
+    @pytest.mark.asyncio
+    async def test_content_addressed_etag_needs_no_file(self, tmp_path):
+        assert await file_etag(tmp_path / "missing", "abc123", "w320.webp") == '"abc123-w320.webp"'
+
+    @pytest.mark.asyncio
+    async def test_stat_etag_is_cached(self, tmp_path):
+        path = tmp_path / "legacy.jpg"
+        path.write_bytes(b"one")
+        first = await file_etag(path)
+
+        path.write_bytes(b"three")
+        assert await file_etag(path) == first
+        assert await file_etag(tmp_path / "missing.jpg") is None
+
+    def test_revalidation_and_ranges(self, tmp_path):
+        path = tmp_path / "blob.jpg"
+        path.write_bytes(b"0123456789")
+        client = make_client(path, content_key="d1g3st")
+
+        full = client.get("/file")
+        assert full.status_code == 200
+        assert full.headers["etag"] == '"d1g3st"'
+        assert "immutable" in full.headers["cache-control"]
+
+        revalidated = client.get("/file", headers={"If-None-Match": full.headers["etag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+        partial = client.get("/file", headers={"Range": "bytes=2-5"})
+        assert partial.status_code == 206
+        assert partial.content == b"2345"
+
+        stale_range = client.get("/file", headers={"Range": "bytes=2-5", "If-Range": '"other"'})
+        assert stale_range.status_code == 200
+
+    def test_head_sends_headers_only(self, tmp_path):
+        path = tmp_path / "blob.jpg"
+        path.write_bytes(b"0123456789")
+        client = make_client(path, content_key="d1g3st")
+
+        response = client.head("/file")
+
+        assert response.status_code == 200
+        assert response.headers["content-length"] == "10"
+        assert response.content == b""
+
+    @pytest.mark.asyncio
+    async def test_pathsend_when_server_supports_it(self, tmp_path):
+        path = tmp_path / "blob.jpg"
+        path.write_bytes(b"0123456789")
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        response = await file_response(path, '"d1g3st"', {})
+        scope = {"type": "http", "method": "GET", "headers": [], "extensions": {"http.response.pathsend": {}}}
+        await response(scope, None, send)
+
+        assert messages[0]["type"] == "http.response.start"
+        assert messages[1] == {"type": "http.response.pathsend", "path": str(path)}
+        assert response.file.users == 0
+
+
+class TestOpenFileCache:
+    """Test OpenFileCache"""
+
+    @pytest.mark.asyncio
+    async def test_hit_reuses_descriptor(self, tmp_path):
+        cache = OpenFileCache(max_size=4, ttl=60)
+        path = tmp_path / "a.jpg"
+        path.write_bytes(b"abc")
+
+        first = await cache.acquire(path)
+        cache.release(first)
+        second = await cache.acquire(path)
+        cache.release(second)
+
+        assert second is first
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert await cache.acquire(tmp_path) is None
+        cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_eviction_waits_for_last_user(self, tmp_path):
+        cache = OpenFileCache(max_size=1, ttl=60)
+        (tmp_path / "a.jpg").write_bytes(b"abc")
+        (tmp_path / "b.jpg").write_bytes(b"def")
+
+        pinned = await cache.acquire(tmp_path / "a.jpg")
+        cache.release(await cache.acquire(tmp_path / "b.jpg"))
+
+        assert pinned.evicted
+        assert await pinned.read(0, 3) == b"abc"
+        cache.release(pinned)
+        with pytest.raises(OSError):
+            os.fstat(pinned.fd)
+        cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_evict_under_directory(self, tmp_path):
+        cache = OpenFileCache(max_size=4, ttl=60)
+        variants = tmp_path / ".variants" / "a.jpg"
+        variants.mkdir(parents=True)
+        (variants / "w64.webp").write_bytes(b"abc")
+
+        entry = await cache.acquire(variants / "w64.webp")
+        cache.release(entry)
+        cache.evict_under(variants)
+
+        assert entry.evicted
+        assert await cache.stat(tmp_path / "missing.jpg") is None
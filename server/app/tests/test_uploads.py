@@ -0,0 +1,159 @@
+"""
+Test streaming upload ingestion and the content-addressed blob store
+"""
+import hashlib
+import io
+import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+# Parked models must be on app.models before the upload code is imported
+from app.tests import parked_models  # noqa: F401
+from app.crud.upload_crud import UploadCRUD
+from app.utils import uploads
+from app.utils.blob_store import BlobStore
+from app.utils.uploads import persist_file, stream_to_temp
+
+
+class CountingFile(io.BytesIO):
+    """Tracks how many bytes were pulled from the upload"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class FakeSession:
+    """Accepts the advisory lock and answers reference counts"""
+
+    def __init__(self, remaining: int = 0, fail_commit: bool = False):
+        self.remaining = remaining
+        self.fail_commit = fail_commit
+        self.committed = False
+        self.rolled_back = False
+
+    async def execute(self, statement, **kwargs):
+        return None
+
+    async def flush(self):
+        pass
+
+    async def scalar(self, statement):
+        return self.remaining
+
+    async def commit(self):
+        if self.fail_commit:
+            self.fail_commit = False
+            raise RuntimeError("database unavailable")
+        self.committed = True
+
+    async def rollback(self):
+        self.rolled_back = True
+
+    def add(self, instance):
+        pass
+
+
+def upload(data: bytes, filename: str = "photo.JPG") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+class TestStreamToTemp:
+    """Test stream_to_temp behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_writes_and_hashes_then_persists(self, tmp_path):
+        data = b"x" * (uploads.CHUNK_SIZE * 2 + 10)
+        staged = await stream_to_temp(upload(data), tmp_path / "upload.part", len(data))
+        persist_file(staged.path, tmp_path / "photo.jpg")
+
+        assert staged.size == len(data)
+        assert staged.sha256 == hashlib.sha256(data).hexdigest()
+        assert (tmp_path / "photo.jpg").read_bytes() == data
+        assert [path.name for path in tmp_path.iterdir()] == ["photo.jpg"]
+
+    @pytest.mark.asyncio
+    async def test_stops_reading_once_over_the_limit(self, tmp_path):
+        source = CountingFile(b"x" * (uploads.CHUNK_SIZE * 10))
+
+        with pytest.raises(HTTPException) as error:
+            await stream_to_temp(UploadFile(file=source), tmp_path / "huge.part", uploads.CHUNK_SIZE)
+
+        assert error.value.status_code == 413
+        assert source.bytes_read == uploads.CHUNK_SIZE * 2
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestBlobStore:
+    """Test content-addressed storage through UploadCRUD"""
+
+    @pytest.mark.asyncio
+    async def test_identical_uploads_share_one_sharded_blob(self, tmp_path):
+        store = UploadCRUD(str(tmp_path))
+        data = b"same photo"
+        digest = hashlib.sha256(data).hexdigest()
+
+        first = await store.put_blob(FakeSession(), upload(data), 1024)
+        again = await store.put_blob(FakeSession(), upload(data, "copy.jpg"), 1024)
+
+        assert first.path == again.path
+        assert first.path == tmp_path / "blobs" / digest[:2] / digest[2:4] / f"{digest}.jpg"
+        assert BlobStore.is_blob_name(first.path.name)
+        assert list(store.blob_store.incoming.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_blob_is_removed_with_its_last_reference(self, tmp_path):
+        store = UploadCRUD(str(tmp_path))
+        stored = await store.put_blob(FakeSession(), upload(b"gig image"), 1024)
+        record = SimpleNamespace(file_path=str(stored.path), is_active=True)
+
+        still_used = FakeSession(remaining=1)
+        await store.release_file(still_used, record)
+        assert stored.path.exists() and still_used.committed
+        assert record.is_active is False
+
+        await store.release_file(FakeSession(remaining=0), record)
+        assert not stored.path.exists()
+
+    @pytest.mark.asyncio
+    async def test_failed_soft_delete_keeps_blob(self, tmp_path):
+        store = UploadCRUD(str(tmp_path))
+        stored = await store.put_blob(FakeSession(), upload(b"still referenced"), 1024)
+        record = SimpleNamespace(file_path=str(stored.path), is_active=True)
+
+        with pytest.raises(RuntimeError):
+            await store.release_file(FakeSession(remaining=0, fail_commit=True), record)
+
+        # The row was never marked inactive in the database, so the file stays
+        assert stored.path.exists()
+
+    @pytest.mark.asyncio
+    async def test_failed_row_commit_removes_unreferenced_blob(self, tmp_path):
+        store = UploadCRUD(str(tmp_path))
+        session = FakeSession(remaining=0, fail_commit=True)
+
+        with pytest.raises(RuntimeError):
+            image = UploadFile(
+                file=io.BytesIO(b"orphan"),
+                filename="photo.jpg",
+                headers=Headers({"content-type": "image/jpeg"}),
+            )
+            await store.save_file(session, image, "user-1", "gig")
+
+        assert session.rolled_back and session.committed
+        assert [path for path in store.blob_store.root.rglob("*") if path.is_file()] == []
+
+    @pytest.mark.asyncio
+    async def test_failed_row_commit_keeps_shared_blob(self, tmp_path):
+        store = UploadCRUD(str(tmp_path))
+        stored = await store.put_blob(FakeSession(), upload(b"shared"), 1024)
+
+        await store.discard_blob(FakeSession(remaining=1), stored.path)
+
+        assert stored.path.exists()
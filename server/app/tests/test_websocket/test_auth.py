@@ -0,0 +1,51 @@
+"""
+Test WebSocket token authentication
+"""
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+# Parked models must be on app.models before the chat code is imported
+from app.tests import parked_models  # noqa: F401
+from app.routes.websocket_routes import get_user_from_token
+from app.security import create_access_token
+
+
+class FakeSession:
+    """Returns user for any primary key and records the keys asked for"""
+
+    def __init__(self, user=None):
+        self.user = user
+        self.keys = []
+
+    async def get(self, model, key):
+        self.keys.append(key)
+        return self.user
+
+
+class TestGetUserFromToken:
+    """Test get_user_from_token"""
+
+    @pytest.mark.asyncio
+    async def test_valid_token_loads_its_user(self):
+        user_id = uuid4()
+        user = SimpleNamespace(id=user_id)
+        session = FakeSession(user)
+
+        token = create_access_token({"sub": str(user_id)})
+
+        assert await get_user_from_token(token, session) is user
+        assert session.keys == [user_id]
+
+    @pytest.mark.asyncio
+    async def test_bad_token_or_unknown_user_is_rejected(self):
+        with pytest.raises(HTTPException) as error:
+            await get_user_from_token("not-a-token", FakeSession())
+        assert error.value.status_code == 401
+
+        token = create_access_token({"sub": str(uuid4())})
+        with pytest.raises(HTTPException) as error:
+            await get_user_from_token(token, FakeSession(user=None))
+        assert error.value.status_code == 401
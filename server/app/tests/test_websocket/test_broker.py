@@ -0,0 +1,243 @@
+"""
+Test cross-worker fan-out of chat events through the broker backends
+"""
+import asyncio
+import json
+import pytest
+from uuid import uuid4
+
+# Parked models must be on app.models before the chat code is imported
+from app.tests import parked_models  # noqa: F401
+from app.websocket_broker import InMemoryBroker, PostgresBroker
+from app.websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket"""
+
+    def __init__(self, fail: bool = False):
+        self.sent = []
+        self.fail = fail
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(json.loads(text))
+
+
+async def drain(manager: ConnectionManager):
+    """Wait for every writer task to flush its queue"""
+    for connection in list(manager.connections.values()):
+        await connection.drain()
+    await asyncio.sleep(0)
+
+
+class TestInMemoryBroker:
+    """Test fan-out between managers sharing one broker (simulated workers)"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_sockets_on_other_workers(self):
+        broker = InMemoryBroker()
+        worker_a = ConnectionManager(broker=broker)
+        worker_b = ConnectionManager(broker=broker)
+        room_id = str(uuid4())
+
+        sender, receiver = FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(sender, room_id, uuid4())
+        await worker_b.connect(receiver, room_id, uuid4())
+
+        await worker_a.broadcast_to_room(room_id, {"type": "message", "content": "hi"})
+        await drain(worker_a)
+        await drain(worker_b)
+
+        assert {"type": "message", "content": "hi"} in receiver.sent
+        assert {"type": "message", "content": "hi"} in sender.sent
+
+    @pytest.mark.asyncio
+    async def test_exclude_websocket_applies_across_workers(self):
+        broker = InMemoryBroker()
+        worker_a = ConnectionManager(broker=broker)
+        worker_b = ConnectionManager(broker=broker)
+        room_id = str(uuid4())
+
+        typist, other = FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(typist, room_id, uuid4())
+        await worker_b.connect(other, room_id, uuid4())
+
+        await worker_a.broadcast_to_room(
+            room_id, {"type": "typing", "is_typing": True}, exclude_websocket=typist
+        )
+        await drain(worker_a)
+        await drain(worker_b)
+
+        assert {"type": "typing", "is_typing": True} in other.sent
+        assert {"type": "typing", "is_typing": True} not in typist.sent
+
+    @pytest.mark.asyncio
+    async def test_failed_socket_is_removed(self):
+        manager = ConnectionManager(broker=InMemoryBroker())
+        room_id = str(uuid4())
+
+        healthy, broken = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(healthy, room_id, uuid4())
+        await manager.connect(broken, room_id, uuid4())
+        broken.fail = True
+
+        await manager.broadcast_to_room(room_id, {"type": "message", "content": "ping"})
+        await drain(manager)
+
+        assert manager.get_room_connections_count(room_id) == 1
+        assert broken not in manager.connection_users
+
+
+class TestPostgresBroker:
+    """Test Postgres broker guards that do not need a database"""
+
+    @pytest.mark.asyncio
+    async def test_publish_rejects_oversized_payload(self):
+        broker = PostgresBroker(dsn="postgresql://unused")
+        with pytest.raises(ValueError):
+            await broker.publish("room", {"message": {"content": "x" * 9000}})
+
+    @pytest.mark.asyncio
+    async def test_limit_counts_utf8_bytes_not_escapes(self):
+        broker = PostgresBroker(dsn="postgresql://unused")
+        # 1000 emoji: 4000 bytes of UTF-8, 12000 as \u escapes
+        with pytest.raises(RuntimeError):
+            await broker.publish("room", {"message": {"content": "\U0001F600" * 1000}})
+
+    @pytest.mark.asyncio
+    async def test_malformed_notify_is_ignored(self):
+        broker = PostgresBroker(dsn="postgresql://unused")
+        received = []
+
+        async def handler(room_id, envelope):
+            received.append(room_id)
+
+        broker.subscribe(handler)
+        for payload in ("not json", "[]", '{"room_id": "r"}', '{"room_id": 1, "envelope": {}}'):
+            broker._on_notify(None, 0, broker.channel, payload)
+        broker._on_notify(None, 0, broker.channel, '{"room_id": "r", "envelope": {}}')
+        await asyncio.sleep(0)
+
+        assert received == ["r"]
+
+    @pytest.mark.asyncio
+    async def test_publish_requires_start(self):
+        broker = PostgresBroker(dsn="postgresql://unused")
+        with pytest.raises(RuntimeError):
+            await broker.publish("room", {"message": {"content": "hi"}})
+
+
+class CountingBroker(InMemoryBroker):
+    """Broker whose start() yields, so concurrent callers overlap"""
+
+    def __init__(self):
+        super().__init__()
+        self.starts = 0
+
+    async def start(self):
+        self.starts += 1
+        await asyncio.sleep(0.01)
+
+
+class TestManagerStart:
+    """Test the broker is started once per manager"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_connections_start_broker_once(self):
+        broker = CountingBroker()
+        manager = ConnectionManager(broker=broker)
+        room_id = str(uuid4())
+
+        await asyncio.gather(
+            manager.connect(FakeWebSocket(), room_id, uuid4()),
+            manager.connect(FakeWebSocket(), room_id, uuid4()),
+        )
+
+        assert broker.starts == 1
+
+
+class SlowWebSocket(FakeWebSocket):
+    """Socket whose sends block until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+        self.close_code = None
+
+    async def send_text(self, text: str):
+        await self.release.wait()
+        await super().send_text(text)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+class TestBackpressure:
+    """Test per-connection queues keep slow clients from stalling a room"""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_block_broadcast(self):
+        manager = ConnectionManager(broker=InMemoryBroker())
+        room_id = str(uuid4())
+
+        slow, fast = SlowWebSocket(), FakeWebSocket()
+        await manager.connect(slow, room_id, uuid4())
+        await manager.connect(fast, room_id, uuid4())
+
+        await asyncio.wait_for(
+            manager.broadcast_to_room(room_id, {"type": "message", "content": "hi"}), 1
+        )
+        await manager.connections[fast].drain()
+
+        assert {"type": "message", "content": "hi"} in fast.sent
+        assert slow.sent == []
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds_typing_then_disconnects(self):
+        manager = ConnectionManager(broker=InMemoryBroker())
+        room_id = str(uuid4())
+
+        slow = SlowWebSocket()
+        await manager.connect(slow, room_id, uuid4())
+        connection = manager.connections[slow]
+        connection.max_queue = 2
+
+        # Writer holds one frame; fill the queue with a typing event and a message
+        await manager.broadcast_to_room(room_id, {"type": "message", "content": "1"})
+        await asyncio.sleep(0)
+        await manager.broadcast_to_room(room_id, {"type": "typing", "is_typing": True})
+        await manager.broadcast_to_room(room_id, {"type": "message", "content": "2"})
+
+        # Queue full: typing indicators are dropped, messages evict queued typing
+        await manager.broadcast_to_room(room_id, {"type": "typing", "is_typing": False})
+        await manager.broadcast_to_room(room_id, {"type": "message", "content": "3"})
+        assert connection.dropped == 2
+        assert manager.get_room_connections_count(room_id) == 1
+
+        # Nothing left to shed: the client is disconnected
+        await manager.broadcast_to_room(room_id, {"type": "message", "content": "4"})
+        assert manager.get_room_connections_count(room_id) == 0
+        assert slow.close_code == 1013
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy_drops_client_immediately(self):
+        manager = ConnectionManager(broker=InMemoryBroker())
+        room_id = str(uuid4())
+
+        slow = SlowWebSocket()
+        await manager.connect(slow, room_id, uuid4())
+        connection = manager.connections[slow]
+        connection.max_queue = 1
+        connection.overflow_policy = "disconnect"
+
+        await manager.broadcast_to_room(room_id, {"type": "message", "content": "1"})
+        await asyncio.sleep(0)
+        await manager.broadcast_to_room(room_id, {"type": "typing", "is_typing": True})
+        await manager.broadcast_to_room(room_id, {"type": "typing", "is_typing": False})
+
+        assert manager.get_room_connections_count(room_id) == 0
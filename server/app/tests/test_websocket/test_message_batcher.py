@@ -0,0 +1,180 @@
+"""
+Test write-behind batching of WebSocket chat messages
+"""
+import asyncio
+import gc
+import json
+import pytest
+from datetime import datetime
+from uuid import uuid4
+
+# Parked models must be on app.models before the chat code is imported
+from app.tests import parked_models  # noqa: F401
+from app.message_batcher import MessageBatchWriter
+from app.models import MessageType
+from app.websocket_broker import InMemoryBroker
+from app.websocket_manager import ConnectionManager
+
+
+class RecordingSession:
+    """Async session stand-in that records executed statements"""
+
+    def __init__(self, log: list, fail: bool = False):
+        self.log = log
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.log.append((statement, params))
+
+    async def commit(self):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.log.append(("commit", None))
+
+
+class DeletedRoomSession(RecordingSession):
+    """Commit fails whenever a row for the deleted room was inserted (FK violation)"""
+
+    async def execute(self, statement, params=None):
+        await super().execute(statement, params)
+        if isinstance(params, list) and any(row["chat_room_id"] == "deleted" for row in params):
+            self.fail = True
+
+
+def make_row(room_id=None, sender_id=None):
+    return {
+        "id": str(uuid4()),
+        "chat_room_id": room_id or str(uuid4()),
+        "sender_id": sender_id or str(uuid4()),
+        "content": "hello",
+        "message_type": MessageType.TEXT,
+        "image_url": None,
+        "is_read": False,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+def commits(log: list) -> int:
+    return sum(1 for statement, _ in log if statement == "commit")
+
+
+class TestMessageBatchWriter:
+    """Test group commit by size and by time"""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_committed_once(self):
+        log = []
+        writer = MessageBatchWriter(lambda: RecordingSession(log), max_batch=50, flush_interval_ms=5)
+        room_id, sender_id = str(uuid4()), str(uuid4())
+
+        futures = [writer.submit(make_row(room_id, sender_id)) for _ in range(20)]
+        await asyncio.gather(*futures)
+
+        assert commits(log) == 1
+        inserted_rows = log[0][1]
+        assert len(inserted_rows) == 20
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self):
+        log = []
+        writer = MessageBatchWriter(
+            lambda: RecordingSession(log), max_batch=10, flush_interval_ms=10_000
+        )
+
+        futures = [writer.submit(make_row()) for _ in range(25)]
+        await asyncio.wait_for(asyncio.gather(*futures[:20]), 1)
+        await writer.stop()
+
+        assert all(future.result() is True for future in futures)
+        assert commits(log) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_fails_every_future_in_batch(self):
+        writer = MessageBatchWriter(lambda: RecordingSession([], fail=True), flush_interval_ms=1)
+
+        futures = [writer.submit(make_row()) for _ in range(3)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_bad_row_fails_alone(self):
+        log = []
+        writer = MessageBatchWriter(lambda: DeletedRoomSession(log), flush_interval_ms=1)
+
+        good = [writer.submit(make_row()) for _ in range(3)]
+        bad = writer.submit(make_row(room_id="deleted"))
+        results = await asyncio.gather(*good, bad, return_exceptions=True)
+
+        assert results[:3] == [True, True, True]
+        assert isinstance(results[3], RuntimeError)
+        assert commits(log) == 3
+
+    @pytest.mark.asyncio
+    async def test_unawaited_failures_are_not_reported_unretrieved(self):
+        errors = []
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda loop, context: errors.append(context))
+        writer = MessageBatchWriter(lambda: RecordingSession([], fail=True), flush_interval_ms=1)
+
+        writer.submit(make_row())
+        await writer.stop()
+        gc.collect()
+
+        loop.set_exception_handler(None)
+        assert errors == []
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.sent.append(json.loads(text))
+
+
+class TestSaveAndBroadcast:
+    """Test messages are broadcast before they are persisted"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_then_ack_after_commit(self):
+        log = []
+        manager = ConnectionManager(broker=InMemoryBroker())
+        manager.message_writer = MessageBatchWriter(
+            lambda: RecordingSession(log), flush_interval_ms=5
+        )
+        room_id = str(uuid4())
+        sender = FakeWebSocket()
+        await manager.connect(sender, room_id, uuid4())
+
+        result = await manager.save_and_broadcast_message(
+            room_id, uuid4(), "hi", sender_name="Somchai",
+            sender_websocket=sender, client_id="c-1"
+        )
+        assert commits(log) == 0
+
+        await result["persisted"]
+        await asyncio.sleep(0)
+        await manager.connections[sender].drain()
+
+        events = [event["type"] for event in sender.sent]
+        assert events == ["message", "message_ack"]
+        assert isinstance(result["id"], str)
+        assert log[0][1][0]["id"] == result["id"]
+        assert isinstance(log[0][1][0]["chat_room_id"], str)
+        assert sender.sent[0]["message_id"] == str(result["id"])
+        assert sender.sent[1] == {
+            "type": "message_ack",
+            "message_id": str(result["id"]),
+            "client_id": "c-1",
+            "status": "persisted",
+        }
@@ -0,0 +1,62 @@
+"""
+Content-addressed file storage
+
+Files are named by the SHA-256 of their bytes and sharded two levels deep by
+hash prefix (root/ab/cd/abcd...), so identical uploads share one file and no
+directory grows past a few thousand entries.
+"""
+
+import re
+import uuid
+from pathlib import Path
+from typing import Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.uploads import persist_file
+
+_BLOB_NAME = re.compile(r"^[0-9a-f]{64}(\.[a-z0-9]{1,10})?$")
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+class BlobStore:
+    """SHA-256 addressed files under root, staged through root/.incoming"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.incoming = root / ".incoming"
+        self.incoming.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def blob_name(sha256: str, extension: str = "") -> str:
+        """Digest plus a sanitised extension, kept so content types can be guessed"""
+        extension = extension.lower()
+        return sha256 + (extension if _EXTENSION.match(extension) else "")
+
+    @staticmethod
+    def is_blob_name(name: str) -> bool:
+        return bool(_BLOB_NAME.match(name))
+
+    def path_for(self, name: str) -> Path:
+        return self.root / name[:2] / name[2:4] / name
+
+    def temp_path(self) -> Path:
+        # Same filesystem as the blobs, so the final rename is atomic
+        return self.incoming / f"{uuid.uuid4().hex}.part"
+
+    async def commit(self, temp_path: Path, name: str) -> Tuple[Path, bool]:
+        """Move a staged file into place unless the same content is already stored.
+
+        Returns the blob path and whether it was written. A duplicate is
+        dropped without fsync or rename.
+        """
+        path = self.path_for(name)
+        if await run_in_threadpool(path.exists):
+            await run_in_threadpool(temp_path.unlink, missing_ok=True)
+            return path, False
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        await run_in_threadpool(persist_file, temp_path, path)
+        return path, True
+
+    async def remove(self, path: Path) -> None:
+        await run_in_threadpool(path.unlink, missing_ok=True)
@@ -0,0 +1,163 @@
+"""
+In-process async caches
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class AsyncLRUCache(Generic[V]):
+    """Bounded LRU cache with per-entry TTL and single-flight loading.
+
+    Concurrent misses for the same key share one loader call. Loaders returning
+    None are not cached so a missing row is retried on the next lookup.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Loads invalidated mid-flight: their result is returned but not cached
+        self._stale: Set[asyncio.Future] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return a fresh cached value without loading"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        # A load already in flight may carry stale data; do not let it populate
+        future = self._inflight.pop(key, None)
+        if future is not None:
+            self._stale.add(future)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Invalidate every key matching predicate, e.g. all tokens of one user"""
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+        for key in [key for key in self._inflight if predicate(key)]:
+            self._stale.add(self._inflight.pop(key))
+
+    def items(self) -> List[Tuple[Hashable, V]]:
+        """Snapshot of unexpired entries, oldest first"""
+        now = time.monotonic()
+        return [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at >= now]
+
+    def discard_inflight(self) -> None:
+        """Let loads already running finish without caching their result"""
+        self._stale.update(self._inflight.values())
+        self._inflight.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._stale.update(self._inflight.values())
+        self._inflight.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Optional[V]]]) -> Optional[V]:
+        """Return cached value or load it, collapsing concurrent misses into one call"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure does not log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if value is not None and future not in self._stale:
+                self.set(key, value)
+            return value
+        finally:
+            self._stale.discard(future)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def get_many_or_load(
+        self,
+        keys: Iterable[Hashable],
+        loader: Callable[[list], Awaitable[Dict[Hashable, V]]],
+    ) -> Dict[Hashable, V]:
+        """Batch variant of get_or_load: one loader call for every key not cached"""
+        found: Dict[Hashable, V] = {}
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        owned: Dict[Hashable, asyncio.Future] = {}
+
+        for key in dict.fromkeys(keys):
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                found[key] = value
+            elif key in self._inflight:
+                self.hits += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.misses += 1
+                owned[key] = asyncio.get_running_loop().create_future()
+                self._inflight[key] = owned[key]
+
+        if owned:
+            try:
+                loaded = await loader(list(owned))
+            except BaseException as exc:
+                for future in owned.values():
+                    self._stale.discard(future)
+                    future.set_exception(exc)
+                    future.exception()
+                raise
+            finally:
+                for key, future in owned.items():
+                    if self._inflight.get(key) is future:
+                        del self._inflight[key]
+
+            for key, future in owned.items():
+                value = loaded.get(key)
+                future.set_result(value)
+                if value is not None:
+                    found[key] = value
+                    if future not in self._stale:
+                        self.set(key, value)
+                self._stale.discard(future)
+
+        for key, future in waiting.items():
+            value = await asyncio.shield(future)
+            if value is not None:
+                found[key] = value
+
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
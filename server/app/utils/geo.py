@@ -0,0 +1,82 @@
+"""
+Geography helpers for radius search on Geometry(POINT, 4326) columns
+
+Points are stored as geometry in degrees. Casting both sides to geography gives
+distances in metres, and geography(column) matches the expression GiST indexes
+declared on Address.location and Gig.location, so radius filters stay indexed.
+
+SQL distances use PostGIS's sphere (use_spheroid false) and are rounded to the
+millimetre, exactly like haversine_m + round_distance in memory, so a keyset
+cursor from one path pages correctly on the other.
+"""
+
+import math
+from typing import Tuple
+
+from geoalchemy2.functions import ST_DWithin, ST_Distance, ST_MakePoint, ST_SetSRID
+from sqlalchemy import Float, Numeric, cast, func
+
+
+def as_geography(location):
+    """geography(location), the exact expression the GiST indexes are built on"""
+    return func.geography(location)
+
+
+def geography_point(latitude: float, longitude: float):
+    return func.geography(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326))
+
+
+def within_radius(location, latitude: float, longitude: float, radius_m: float):
+    """Index-backed filter for points within radius_m metres"""
+    return ST_DWithin(as_geography(location), geography_point(latitude, longitude), radius_m, False)
+
+
+def distance_m(location, latitude: float, longitude: float):
+    """Distance in metres from the given point, rounded like round_distance"""
+    distance = ST_Distance(as_geography(location), geography_point(latitude, longitude), False)
+    return cast(func.round(cast(distance, Numeric), DISTANCE_DECIMALS), Float)
+
+
+# Mean radius of WGS 84, the sphere PostGIS uses when use_spheroid is false
+EARTH_RADIUS_M = 6371008.7714
+DISTANCE_DECIMALS = 3
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres, for in-memory filtering"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def round_distance(distance: float) -> float:
+    """Sort-key precision shared with distance_m"""
+    return round(distance, DISTANCE_DECIMALS)
+
+
+def geohash_cell(latitude: float, longitude: float, precision: int) -> Tuple[str, float, float, float]:
+    """Geohash of a point, with its cell centre (lat, lon) and half-diagonal in metres"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+
+    centre_lat = (lat_range[0] + lat_range[1]) / 2
+    centre_lon = (lon_range[0] + lon_range[1]) / 2
+    half_diagonal = haversine_m(centre_lat, centre_lon, lat_range[1], lon_range[1])
+    return "".join(chars), centre_lat, centre_lon, half_diagonal
@@ -0,0 +1,155 @@
+"""
+Resized and WebP derivatives of uploaded images
+
+Variants live beside their source as <dir>/.variants/<name>/w<width>.<ext>, so
+a content-addressed blob gets one set shared by every row that references it
+and the set is removed together with the blob. Rendering runs on a process
+pool; each variant is written once and served from disk afterwards.
+"""
+
+import asyncio
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.configs.app_config import app_config
+from app.utils.cache import AsyncLRUCache
+from app.utils.uploads import persist_file
+
+# Pillow format name and media type per variant extension
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+SAVE_OPTIONS = {
+    "WEBP": {"quality": 80, "method": 4},
+    "JPEG": {"quality": 82, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+}
+SOURCE_EXTENSIONS = {".jpg": "jpg", ".jpeg": "jpg", ".png": "png", ".webp": "webp"}
+
+
+def variant_dir(source: Path) -> Path:
+    return source.parent / ".variants" / source.name
+
+
+def variant_path(source: Path, width: Optional[int], extension: str) -> Path:
+    label = f"w{width}" if width else "full"
+    return variant_dir(source) / f"{label}.{extension}"
+
+
+def render_variant(source: str, destination: str, width: Optional[int], extension: str) -> None:
+    """Runs in a worker process: resize to at most width and encode"""
+    from PIL import Image, ImageOps
+
+    pillow_format = VARIANT_FORMATS[extension][0]
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if width and image.width > width:
+            # Bounded by width only; thumbnail keeps the aspect ratio
+            image.thumbnail((width, image.height), Image.LANCZOS)
+        if pillow_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        target = Path(destination)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.part")
+        try:
+            image.save(temp_path, pillow_format, **SAVE_OPTIONS.get(pillow_format, {}))
+            persist_file(temp_path, target)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+
+class ImageVariantPool:
+    """Renders variants on a process pool; concurrent requests for one share a render"""
+
+    def __init__(self, max_workers: int, failure_ttl: float = app_config.IMAGE_VARIANT_FAILURE_TTL):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[Path, asyncio.Future] = {}
+        # Variant paths whose render failed; not retried until the entry expires
+        self._failed: AsyncLRUCache[bool] = AsyncLRUCache(max_size=10_000, ttl=failure_ttl)
+
+    @staticmethod
+    def source_extension(source: Path) -> Optional[str]:
+        """Variant extension matching the source format, None if not resizable (e.g. GIF)"""
+        return SOURCE_EXTENSIONS.get(source.suffix.lower())
+
+    def negotiate(
+        self, source: Path, requested_width: Optional[int], accept: str
+    ) -> Optional[Tuple[Optional[int], str]]:
+        """(width, extension) of the variant to serve, or None for the original.
+
+        Widths snap up to IMAGE_VARIANT_WIDTHS so the cache stays small; beyond
+        the largest, only the format may change.
+        """
+        source_extension = self.source_extension(source)
+        if source_extension is None:
+            return None
+        width = None
+        if requested_width:
+            width = next(
+                (w for w in sorted(app_config.IMAGE_VARIANT_WIDTHS) if w >= requested_width), None
+            )
+        extension = "webp" if "image/webp" in accept else source_extension
+        if width is None and extension == source_extension:
+            return None
+        if self._failed.get(variant_path(source, width, extension)):
+            return None
+        return width, extension
+
+    async def ensure(self, source: Path, width: Optional[int], extension: str) -> Path:
+        """Path of the variant, rendering it first if it is not on disk yet"""
+        path = variant_path(source, width, extension)
+        if await run_in_threadpool(path.exists):
+            return path
+
+        if self._failed.get(path):
+            raise ValueError(f"Rendering {path.name} failed recently")
+
+        future = self._inflight.get(path)
+        if future is None:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, render_variant, str(source), str(path), width, extension
+            )
+            self._inflight[path] = future
+            future.add_done_callback(lambda done: self._settle(path, done))
+        await asyncio.shield(future)
+        return path
+
+    def _settle(self, path: Path, future: asyncio.Future) -> None:
+        self._inflight.pop(path, None)
+        if not future.cancelled() and future.exception() is not None:
+            self._failed.set(path, True)
+
+    async def pregenerate(self, source: Path) -> None:
+        """Render the widths lists and cards ask for, after the upload has been answered"""
+        if self.source_extension(source) is None:
+            return
+        for width in app_config.IMAGE_PREGENERATE_WIDTHS:
+            try:
+                await self.ensure(source, width, "webp")
+            except Exception:
+                # Served on demand instead
+                return
+
+    @staticmethod
+    async def remove_all(source: Path) -> None:
+        await run_in_threadpool(shutil.rmtree, variant_dir(source), ignore_errors=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_variants = ImageVariantPool(max_workers=app_config.IMAGE_VARIANT_WORKERS)
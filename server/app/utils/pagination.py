@@ -0,0 +1,57 @@
+"""
+Opaque cursor helpers for keyset pagination
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List
+from uuid import UUID
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor"""
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            payload.append({"t": "dt", "v": value.isoformat()})
+        elif isinstance(value, UUID):
+            payload.append({"t": "uuid", "v": str(value)})
+        else:
+            payload.append({"t": "raw", "v": value})
+
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *shape: Any) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed.
+
+    shape, if given, lists the type (or tuple of types) expected at each position;
+    a cursor of another length or with values of other types is malformed too.
+    """
+    values = _decode_values(cursor)
+    if shape and (
+        len(values) != len(shape)
+        or not all(isinstance(value, types) for value, types in zip(values, shape))
+    ):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _decode_values(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = []
+        for item in payload:
+            if item["t"] == "dt":
+                values.append(datetime.fromisoformat(item["v"]))
+            elif item["t"] == "uuid":
+                values.append(UUID(item["v"]))
+            else:
+                values.append(item["v"])
+        return values
+    except (binascii.Error, json.JSONDecodeError, KeyError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
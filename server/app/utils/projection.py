@@ -0,0 +1,19 @@
+"""
+Read-only column projections for list endpoints
+"""
+
+from typing import List, Type
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> List:
+    """Columns of model backing the fields of schema, in schema field order.
+
+    Selecting these instead of the entity returns plain Row tuples: no identity
+    map, no attribute instrumentation. Schema fields that aren't columns of
+    the model (names joined in by the route, computed values) are skipped.
+    """
+    column_attrs = inspect(model).column_attrs
+    return [getattr(model, name) for name in schema.model_fields if name in column_attrs]
@@ -0,0 +1,29 @@
+"""
+Single-statement writes with RETURNING
+"""
+
+from typing import Optional, Type, TypeVar
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+M = TypeVar("M")
+
+
+async def update_returning(session: AsyncSession, model: Type[M], criteria, values: dict) -> Optional[M]:
+    """UPDATE model SET values WHERE criteria RETURNING model.
+
+    One round trip replaces SELECT, flush and refresh. Returns the updated
+    instance, or None when no row matched; an instance already in the session
+    is overwritten with the returned row. Conditions in criteria are checked
+    atomically with the write.
+    """
+    statement = (
+        update(model)
+        .where(*criteria)
+        .values(**values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(statement)
+    return result.scalar_one_or_none()
@@ -0,0 +1,272 @@
+"""
+Static file responses with strong validators
+
+Content-addressed files take their ETag straight from the digest in their
+name and are marked immutable, so a conditional request is answered without
+touching the disk. Other files get an ETag from inode, mtime and size.
+
+Hot files stay open in a bounded LRU of descriptors and stat results, so a
+cache hit costs no open/stat/close. Whole-file bodies go out through the ASGI
+pathsend extension (the server sendfile()s them) when the server offers it;
+otherwise, and for byte ranges, they are pread from the cached descriptor.
+"""
+
+import os
+import stat
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+from app.configs.app_config import app_config
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MUTABLE_CACHE_CONTROL = "public, max-age=3600"
+
+
+class OpenFile:
+    """A regular file held open; shared by concurrent responses"""
+
+    __slots__ = ("path", "fd", "stat_result", "expires_at", "users", "evicted")
+
+    def __init__(self, path: str, fd: int, stat_result: os.stat_result, expires_at: float):
+        self.path = path
+        self.fd = fd
+        self.stat_result = stat_result
+        self.expires_at = expires_at
+        self.users = 0
+        self.evicted = False
+
+    async def read(self, offset: int, size: int) -> bytes:
+        # pread leaves the shared file offset alone, so responses don't interfere
+        return await run_in_threadpool(os.pread, self.fd, size, offset)
+
+
+def _open_regular(path: str) -> Optional[tuple[int, os.stat_result]]:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        return None
+    stat_result = os.fstat(fd)
+    if not stat.S_ISREG(stat_result.st_mode):
+        os.close(fd)
+        return None
+    return fd, stat_result
+
+
+class OpenFileCache:
+    """Bounded LRU of open descriptors with their stat results.
+
+    acquire() pins an entry until release(); an entry evicted while pinned is
+    closed by its last user, so a descriptor number is never reused under a
+    response still reading from it.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, OpenFile]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def acquire(self, path: Path) -> Optional[OpenFile]:
+        """Pinned open file for path, or None if it isn't a regular file"""
+        key = os.path.abspath(path)
+        entry = self._fresh(key)
+        if entry is None:
+            self.misses += 1
+            opened = await run_in_threadpool(_open_regular, key)
+            if opened is None:
+                return None
+            # A concurrent miss may have opened it meanwhile; keep one descriptor
+            entry = self._fresh(key)
+            if entry is None:
+                entry = OpenFile(key, *opened, expires_at=time.monotonic() + self.ttl)
+                self._entries[key] = entry
+                while len(self._entries) > self.max_size:
+                    self._drop(next(iter(self._entries)))
+            else:
+                os.close(opened[0])
+        else:
+            self.hits += 1
+        entry.users += 1
+        return entry
+
+    def release(self, entry: OpenFile) -> None:
+        entry.users -= 1
+        if entry.evicted and entry.users == 0:
+            os.close(entry.fd)
+
+    async def stat(self, path: Path) -> Optional[os.stat_result]:
+        entry = await self.acquire(path)
+        if entry is None:
+            return None
+        self.release(entry)
+        return entry.stat_result
+
+    def evict(self, path: Path) -> None:
+        self._drop(os.path.abspath(path))
+
+    def evict_under(self, directory: Path) -> None:
+        prefix = os.path.join(os.path.abspath(directory), "")
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._drop(key)
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._drop(key)
+
+    def _fresh(self, key: str) -> Optional[OpenFile]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        entry.evicted = True
+        if entry.users == 0:
+            os.close(entry.fd)
+
+
+open_file_cache = OpenFileCache(
+    max_size=app_config.OPEN_FILE_CACHE_SIZE,
+    ttl=app_config.OPEN_FILE_CACHE_TTL,
+)
+
+
+def _stat_etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+async def file_etag(path: Path, content_key: Optional[str] = None, variant: str = "") -> Optional[str]:
+    """Strong ETag for path, or None if it doesn't exist.
+
+    content_key (the digest of a content-addressed file) needs no I/O at all.
+    variant distinguishes derivatives served from the same URL.
+    """
+    suffix = f"-{variant}" if variant else ""
+    if content_key:
+        return f'"{content_key}{suffix}"'
+
+    stat_result = await open_file_cache.stat(path)
+    if stat_result is None:
+        return None
+    return f'{_stat_etag(stat_result)[:-1]}{suffix}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(request: Request, etag: str, headers: Dict[str, str]) -> Optional[Response]:
+    """304 carrying the validators and caching headers, when the client copy is current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+    return None
+
+
+class MediaFileResponse(FileResponse):
+    """FileResponse over a pinned OpenFile: no stat, open or close per request.
+
+    Range and If-Range handling is FileResponse's; only the body transfer
+    differs. The file is released once the response has been sent.
+    """
+
+    def __init__(
+        self,
+        file: OpenFile,
+        headers: Dict[str, str],
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+    ):
+        super().__init__(
+            path=file.path,
+            headers=headers,
+            media_type=media_type,
+            filename=filename,
+            stat_result=file.stat_result,
+        )
+        self.file = file
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            if self._can_pathsend(scope):
+                await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+                await send({"type": "http.response.pathsend", "path": self.file.path})
+                if self.background is not None:
+                    await self.background()
+            else:
+                await super().__call__(scope, receive, send)
+        finally:
+            open_file_cache.release(self.file)
+
+    def _can_pathsend(self, scope: Scope) -> bool:
+        """Whole-body GET on a server that implements the pathsend extension"""
+        if not app_config.MEDIA_PATHSEND or scope["method"].upper() == "HEAD":
+            return False
+        if "http.response.pathsend" not in (scope.get("extensions") or {}):
+            return False
+        headers = Headers(scope=scope)
+        http_if_range = headers.get("if-range")
+        return headers.get("range") is None or (
+            http_if_range is not None and not self._should_use_range(http_if_range)
+        )
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await self._send_body(send, 0, 0 if send_header_only else self.file.stat_result.st_size)
+
+    async def _handle_single_range(
+        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool
+    ) -> None:
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        await self._send_body(send, start, start if send_header_only else end)
+
+    async def _send_body(self, send: Send, start: int, end: int) -> None:
+        while True:
+            chunk = await self.file.read(start, min(self.chunk_size, end - start)) if start < end else b""
+            start += len(chunk)
+            # A short read means the file shrank underneath us; end the body there
+            more_body = bool(chunk) and start < end
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            if not more_body:
+                return
+
+
+async def file_response(
+    path: Path,
+    etag: str,
+    headers: Dict[str, str],
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> Optional[MediaFileResponse]:
+    """Response streaming path from the open-file cache, None if it doesn't exist"""
+    file = await open_file_cache.acquire(path)
+    if file is None:
+        return None
+    return MediaFileResponse(
+        file,
+        headers={**headers, "ETag": etag},
+        media_type=media_type,
+        filename=filename,
+    )
@@ -0,0 +1,73 @@
+"""
+Streaming upload ingestion: chunked, size-capped, hashed, durable
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+CHUNK_SIZE = 256 * 1024
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+def _write_chunk(handle: BinaryIO, digest, chunk: bytes) -> None:
+    # hashlib releases the GIL on large buffers, so hashing rides along off the loop
+    digest.update(chunk)
+    handle.write(chunk)
+
+
+def persist_file(temp_path: Path, destination: Path) -> None:
+    """fsync temp_path, rename it to destination and persist the rename"""
+    fd = os.open(temp_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(temp_path, destination)
+    dir_fd = os.open(destination.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _discard(handle: BinaryIO, temp_path: Path) -> None:
+    handle.close()
+    temp_path.unlink(missing_ok=True)
+
+
+async def stream_to_temp(file: UploadFile, temp_path: Path, max_size: int) -> StoredUpload:
+    """Copy file to temp_path in CHUNK_SIZE pieces without buffering it whole.
+
+    Aborts with 413 as soon as more than max_size bytes arrive. Writes and
+    hashing run on the thread pool. The result is not yet durable; hand it to
+    persist_file, or discard it, once its digest has been looked at.
+    """
+    handle = await run_in_threadpool(open, temp_path, "xb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File too large. Max size: {max_size // (1024 * 1024)}MB",
+                )
+            await run_in_threadpool(_write_chunk, handle, digest, chunk)
+        await run_in_threadpool(handle.close)
+    except BaseException:
+        await run_in_threadpool(_discard, handle, temp_path)
+        raise
+    return StoredUpload(path=temp_path, size=size, sha256=digest.hexdigest())
@@ -0,0 +1,153 @@
+"""
+Pub/sub backends that fan chat events out to every worker process.
+
+ConnectionManager publishes each room event once; every worker subscribed to the
+broker receives it and delivers it to the sockets it holds locally.
+"""
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from app.configs.app_config import app_config
+
+logger = logging.getLogger(__name__)
+
+# (room_id, envelope) -> None
+BrokerHandler = Callable[[str, dict], Awaitable[None]]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+PG_NOTIFY_MAX_PAYLOAD = 7999
+
+
+class BrokerBackend:
+    """Base class for room event brokers"""
+
+    def __init__(self):
+        self.handlers: List[BrokerHandler] = []
+
+    def subscribe(self, handler: BrokerHandler) -> None:
+        """Register a handler called for every event published to any room"""
+        if handler not in self.handlers:
+            self.handlers.append(handler)
+
+    async def start(self) -> None:
+        """Open connections needed to receive events"""
+
+    async def stop(self) -> None:
+        """Close connections opened by start()"""
+
+    async def publish(self, room_id: str, envelope: dict) -> None:
+        raise NotImplementedError
+
+    async def _dispatch(self, room_id: str, envelope: dict) -> None:
+        for handler in list(self.handlers):
+            try:
+                await handler(room_id, envelope)
+            except Exception:
+                logger.exception("Broker handler failed for room %s", room_id)
+
+
+class InMemoryBroker(BrokerBackend):
+    """Single-process broker; also lets tests share one bus between managers"""
+
+    async def publish(self, room_id: str, envelope: dict) -> None:
+        await self._dispatch(room_id, envelope)
+
+
+class PostgresBroker(BrokerBackend):
+    """Cross-process broker using Postgres LISTEN/NOTIFY through asyncpg"""
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        channel: str = app_config.WEBSOCKET_BROKER_CHANNEL,
+        reconnect_delay: float = 1.0,
+    ):
+        super().__init__()
+        self.dsn = dsn or str(app_config.SQLALCHEMY_DATABASE_URI).replace(
+            "postgresql+asyncpg://", "postgresql://"
+        )
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._listen_conn = None
+        self._publish_pool = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        import asyncpg
+
+        self._stopping = False
+        if self._publish_pool is None:
+            self._publish_pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=2)
+        await self._listen()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._listen_conn is not None:
+            try:
+                await self._listen_conn.remove_listener(self.channel, self._on_notify)
+            finally:
+                await self._listen_conn.close()
+                self._listen_conn = None
+        if self._publish_pool is not None:
+            await self._publish_pool.close()
+            self._publish_pool = None
+
+    async def publish(self, room_id: str, envelope: dict) -> None:
+        # Raw UTF-8 rather than \u escapes: up to 4 bytes a character instead of 12
+        payload = json.dumps({"room_id": room_id, "envelope": envelope}, ensure_ascii=False)
+        if len(payload.encode()) > PG_NOTIFY_MAX_PAYLOAD:
+            raise ValueError("Chat event too large to publish")
+        if self._publish_pool is None:
+            raise RuntimeError("PostgresBroker.publish called before start()")
+        await self._publish_pool.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._listen_conn.add_termination_listener(self._on_terminated)
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+        logger.info("📡 Listening for chat events on channel %s", self.channel)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        # Anything may NOTIFY this channel; never let a bad payload raise in asyncpg's callback
+        try:
+            data = json.loads(payload)
+            room_id, envelope = data["room_id"], data["envelope"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            room_id = envelope = None
+        if not isinstance(room_id, str) or not isinstance(envelope, dict):
+            logger.warning("Ignoring malformed chat event on channel %s", channel)
+            return
+        asyncio.get_running_loop().create_task(self._dispatch(room_id, envelope))
+
+    def _on_terminated(self, connection) -> None:
+        self._listen_conn = None
+        if not self._stopping and self._reconnect_task is None:
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        # Events published while disconnected are lost; clients resync via history
+        try:
+            while not self._stopping:
+                try:
+                    await self._listen()
+                    return
+                except Exception as e:
+                    logger.warning("Chat broker reconnect failed: %s", e)
+                    await asyncio.sleep(self.reconnect_delay)
+        finally:
+            self._reconnect_task = None
+
+
+def create_broker() -> BrokerBackend:
+    """Build the broker selected by WEBSOCKET_BROKER"""
+    if app_config.WEBSOCKET_BROKER == "postgres":
+        return PostgresBroker()
+    return InMemoryBroker()
@@ -1,23 +1,158 @@
 """
 WebSocket connection manager for real-time chat in Hourz app
 """
+import asyncio
 import json
-from typing import Dict, List, Set, Optional
-from uuid import UUID
+import os
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Set, Optional, Tuple
+from uuid import UUID, uuid4
 from fastapi import WebSocket, WebSocketDisconnect
-from app.models import User, ChatRoom, Message, MessageType
-from app.database.session import AsyncSessionLocal
+from app.models import MessageType
+from app.configs.app_config import app_config
+from app.message_batcher import MessageBatchWriter
+from app.websocket_broker import BrokerBackend, create_broker
+
+
+# Event types that may be dropped for a slow client instead of disconnecting it
+DROPPABLE_EVENT_TYPES = {"typing"}
+
+# WebSocket close code for "try again later"
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientConnection:
+    """Bounded outbound queue and writer task for one WebSocket"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        room_id: str,
+        on_failure: Callable[["ClientConnection"], Awaitable[None]],
+        max_queue: int = app_config.WEBSOCKET_SEND_QUEUE_SIZE,
+        send_timeout: float = app_config.WEBSOCKET_SEND_TIMEOUT,
+        overflow_policy: str = app_config.WEBSOCKET_OVERFLOW_POLICY,
+    ):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.overflow_policy = overflow_policy
+        self._on_failure = on_failure
+        self._queue: Deque[Tuple[str, str]] = deque()
+        self._has_items = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.closed = False
+        self.dropped = 0
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, text: str, event_type: str = "") -> bool:
+        """Queue a frame without waiting; returns False if the client must be dropped"""
+        if self.closed:
+            return False
+
+        if len(self._queue) >= self.max_queue:
+            if self.overflow_policy == "disconnect":
+                return False
+            # drop_typing: shed ephemeral events before giving up on the client
+            if event_type in DROPPABLE_EVENT_TYPES:
+                self.dropped += 1
+                return True
+            if not self._evict_droppable():
+                return False
+
+        self._queue.append((event_type, text))
+        self._idle.clear()
+        self._has_items.set()
+        return True
+
+    def _evict_droppable(self) -> bool:
+        for item in self._queue:
+            if item[0] in DROPPABLE_EVENT_TYPES:
+                self._queue.remove(item)
+                self.dropped += 1
+                return True
+        return False
+
+    async def _write_loop(self):
+        try:
+            while True:
+                await self._has_items.wait()
+                while self._queue:
+                    _, text = self._queue.popleft()
+                    await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+                self._has_items.clear()
+                self._idle.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed or timed out: the client is gone or too slow
+            self.closed = True
+            self._idle.set()
+            await self._on_failure(self)
+
+    async def drain(self):
+        """Wait until every queued frame has been written (or the writer stopped)"""
+        await self._idle.wait()
+
+    async def close(self, code: Optional[int] = None):
+        """Stop the writer; optionally close the socket with the given code"""
+        self.closed = True
+        self._queue.clear()
+        self._idle.set()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if code is not None:
+            try:
+                await self.websocket.close(code=code)
+            except Exception:
+                pass
 
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, broker: Optional[BrokerBackend] = None):
         # Room ID -> Set of WebSocket connections
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # WebSocket -> User ID mapping for authentication
         self.connection_users: Dict[WebSocket, UUID] = {}
+        # WebSocket -> outbound queue and writer task
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        # Broker fans room events out to every worker, including this one
+        self.broker = broker or create_broker()
+        self.worker_id = f"{os.getpid()}-{uuid4().hex[:8]}"
+        self.broker.subscribe(self._deliver_local)
+        self._broker_started = False
+        # First connections can arrive together; only one of them starts the broker
+        self._broker_lock = asyncio.Lock()
+        # Group-commits messages saved from WebSocket connections
+        self.message_writer = MessageBatchWriter()
+
+    async def start(self):
+        """Start receiving room events from the broker (called on first connect)"""
+        if self._broker_started:
+            return
+        async with self._broker_lock:
+            if not self._broker_started:
+                await self.broker.start()
+                self._broker_started = True
+
+    async def stop(self):
+        """Flush pending messages and stop receiving room events from the broker"""
+        await self.message_writer.stop()
+        async with self._broker_lock:
+            if self._broker_started:
+                await self.broker.stop()
+                self._broker_started = False
+
+    def connection_key(self, websocket: WebSocket) -> str:
+        """Identify a socket across workers so a publisher can exclude it"""
+        return f"{self.worker_id}:{id(websocket)}"
 
     async def connect(self, websocket: WebSocket, room_id: str, user_id: UUID):
         """Accept WebSocket connection and add to room"""
+        await self.start()
         await websocket.accept()
         
         if room_id not in self.active_connections:
@@ -25,6 +160,9 @@ class ConnectionManager:
         
         self.active_connections[room_id].add(websocket)
         self.connection_users[websocket] = user_id
+        self.connections[websocket] = ClientConnection(
+            websocket, room_id, on_failure=self._drop_connection
+        )
         
         # Notify room that user joined
         await self.broadcast_to_room(room_id, {
@@ -40,6 +178,10 @@ class ConnectionManager:
             if not self.active_connections[room_id]:
                 del self.active_connections[room_id]
         
+        connection = self.connections.pop(websocket, None)
+        if connection:
+            await connection.close()
+
         user_id = self.connection_users.pop(websocket, None)
         if user_id:
             # Notify room that user left
@@ -51,6 +193,12 @@ class ConnectionManager:
 
     async def send_personal_message(self, websocket: WebSocket, message: dict):
         """Send message to a specific WebSocket connection"""
+        connection = self.connections.get(websocket)
+        if connection:
+            if not connection.enqueue(json.dumps(message), message.get("type", "")):
+                await self._drop_connection(connection, SLOW_CONSUMER_CLOSE_CODE)
+            return
+
         try:
             await websocket.send_text(json.dumps(message))
         except Exception:
@@ -58,26 +206,42 @@ class ConnectionManager:
             pass
 
     async def broadcast_to_room(self, room_id: str, message: dict, exclude_websocket: Optional[WebSocket] = None):
-        """Send message to all connections in a room"""
+        """Publish message once; every worker delivers it to its local connections"""
+        envelope = {
+            "message": message,
+            "exclude": self.connection_key(exclude_websocket) if exclude_websocket else None,
+        }
+        await self.broker.publish(room_id, envelope)
+
+    async def _deliver_local(self, room_id: str, envelope: dict):
+        """Queue a broker event on the connections this worker holds for the room"""
         if room_id not in self.active_connections:
             return
         
-        disconnected_websockets = []
+        slow_connections = []
+        message = envelope["message"]
         message_text = json.dumps(message)
+        event_type = message.get("type", "")
+        exclude_key = envelope.get("exclude")
         
-        for websocket in self.active_connections[room_id]:
-            if websocket == exclude_websocket:
+        # Only enqueue here; each connection's writer task does the actual send
+        for websocket in list(self.active_connections[room_id]):
+            if exclude_key and self.connection_key(websocket) == exclude_key:
                 continue
-                
-            try:
-                await websocket.send_text(message_text)
-            except Exception:
-                # Connection is closed, mark for removal
-                disconnected_websockets.append(websocket)
+
+            connection = self.connections.get(websocket)
+            if connection and not connection.enqueue(message_text, event_type):
+                slow_connections.append(connection)
         
-        # Clean up disconnected websockets
-        for websocket in disconnected_websockets:
-            await self.disconnect(websocket, room_id)
+        # Disconnect clients whose queue overflowed
+        for connection in slow_connections:
+            await self._drop_connection(connection, SLOW_CONSUMER_CLOSE_CODE)
+
+    async def _drop_connection(self, connection: ClientConnection, code: Optional[int] = None):
+        """Remove a connection whose send failed or whose queue overflowed"""
+        if code is not None:
+            await connection.close(code=code)
+        await self.disconnect(connection.websocket, connection.room_id)
 
     async def save_and_broadcast_message(
         self, 
@@ -85,39 +249,67 @@ class ConnectionManager:
         sender_id: UUID, 
         content: str, 
         message_type: MessageType = MessageType.TEXT,
-        image_url: Optional[str] = None
+        image_url: Optional[str] = None,
+        sender_name: Optional[str] = None,
+        sender_websocket: Optional[WebSocket] = None,
+        client_id: Optional[str] = None
     ):
-        """Save message to database and broadcast to room"""
-        async with AsyncSessionLocal() as db:
-            # Create and save message
-            message = Message(
-                chat_room_id=UUID(room_id),
-                sender_id=sender_id,
-                content=content,
-                message_type=message_type,
-                image_url=image_url
+        """Broadcast message to room right away and queue it for batched persistence
+
+        The id and timestamp are assigned here so the broadcast does not wait for the
+        database. Once the batch holding the message commits, the sender receives a
+        ``message_ack`` with status ``persisted`` (or ``failed``).
+        """
+        message_id = str(uuid4())
+        timestamp = datetime.utcnow()
+        
+        # Broadcast message to room
+        await self.broadcast_to_room(room_id, {
+            "type": "message",
+            "message_id": message_id,
+            "client_id": client_id,
+            "sender_id": str(sender_id),
+            "sender_name": sender_name or "Unknown",
+            "content": content,
+            "message_type": message_type.value,
+            "image_url": image_url,
+            "timestamp": timestamp.isoformat()
+        })
+
+        persisted = self.message_writer.submit({
+            "id": message_id,
+            "chat_room_id": room_id,
+            "sender_id": str(sender_id),
+            "content": content,
+            "message_type": message_type,
+            "image_url": image_url,
+            "is_read": False,
+            "timestamp": timestamp,
+        })
+        if sender_websocket is not None:
+            persisted.add_done_callback(
+                lambda future: asyncio.create_task(
+                    self._send_ack(sender_websocket, message_id, client_id, future)
+                )
             )
-            
-            db.add(message)
-            await db.commit()
-            await db.refresh(message)
-            
-            # Get sender info for broadcast
-            sender = await db.get(User, sender_id)
-            
-            # Broadcast message to room
-            await self.broadcast_to_room(room_id, {
-                "type": "message",
-                "message_id": str(message.id),
-                "sender_id": str(sender_id),
-                "sender_name": sender.full_name if sender else "Unknown",
-                "content": content,
-                "message_type": message_type.value,
-                "image_url": image_url,
-                "timestamp": message.timestamp.isoformat()
-            })
-            
-            return message
+        
+        return {"id": message_id, "timestamp": timestamp, "persisted": persisted}
+
+    async def _send_ack(
+        self,
+        websocket: WebSocket,
+        message_id: str,
+        client_id: Optional[str],
+        future: asyncio.Future
+    ):
+        """Tell the sender whether their message reached the database"""
+        failed = future.cancelled() or future.exception() is not None
+        await self.send_personal_message(websocket, {
+            "type": "message_ack",
+            "message_id": message_id,
+            "client_id": client_id,
+            "status": "failed" if failed else "persisted"
+        })
 
     def get_room_connections_count(self, room_id: str) -> int:
         """Get number of active connections in a room"""